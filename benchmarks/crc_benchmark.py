@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+"""
+Compares the CRC16 of crownstone_uart with the pure python implementation of crownstone_core.
+
+Both implementations are checked to give the same result before they are timed.
+Sizes are chosen to match real frames: a result packet, an asset report and a power log sample packet.
+"""
+import random
+import timeit
+
+from crownstone_core.util.CRC import crc16ccitt as core_crc16ccitt
+
+from crownstone_uart.util.CRC import crc16ccitt
+
+frameSizes = [10, 32, 209]
+iterations = 2000
+
+random.seed(0)
+for frameSize in frameSizes:
+	frameList = [random.randint(0, 255) for i in range(0, frameSize)]
+	frameBytes = bytes(frameList)
+
+	expected = core_crc16ccitt(frameList)
+	assert crc16ccitt(frameList) == expected
+	assert crc16ccitt(frameBytes) == expected
+	assert crc16ccitt(memoryview(frameBytes)) == expected
+
+	coreTime  = timeit.timeit(lambda: core_crc16ccitt(frameList), number=iterations)
+	listTime  = timeit.timeit(lambda: crc16ccitt(frameList),      number=iterations)
+	bytesTime = timeit.timeit(lambda: crc16ccitt(frameBytes),     number=iterations)
+
+	print(f"{frameSize:4d} bytes: "
+	      f"crownstone_core {coreTime / iterations * 1e6:8.2f} us, "
+	      f"crownstone_uart list {listTime / iterations * 1e6:6.2f} us, "
+	      f"bytes {bytesTime / iterations * 1e6:6.2f} us "
+	      f"(x{coreTime / bytesTime:.0f})")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+"""
+Compares the EventBus of crownstone_core with the CopyOnWriteEventBus of crownstone_uart.
+
+First the cost of a single emit is timed, for different numbers of subscribers.
+Then emitter threads, like the UartBridge thread, emit while other threads subscribe and unsubscribe,
+like a Collector does for every command. Errors raised by emit during the contention are counted.
+"""
+import threading
+import time
+import timeit
+
+from crownstone_core.util.EventBus import EventBus
+
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
+
+subscriberCounts = [1, 10, 100]
+iterations = 20000
+contentionTime = 2.0
+emitterThreadCount = 2
+churnThreadCount = 2
+
+def callback(data):
+	pass
+
+def timeEmit(eventBusClass, subscriberCount):
+	eventBus = eventBusClass()
+	for i in range(0, subscriberCount):
+		eventBus.subscribe("topic", callback)
+	return timeit.timeit(lambda: eventBus.emit("topic", 1), number=iterations) / iterations
+
+def runContention(eventBusClass):
+	eventBus = eventBusClass()
+	for i in range(0, 10):
+		eventBus.subscribe("topic", callback)
+
+	stopEvent = threading.Event()
+	counts = {"emit": 0, "churn": 0, "errors": 0}
+	lock = threading.Lock()
+
+	def emitter():
+		emitCount = 0
+		errorCount = 0
+		while not stopEvent.is_set():
+			try:
+				eventBus.emit("topic", 1)
+			except Exception:
+				errorCount += 1
+			emitCount += 1
+		with lock:
+			counts["emit"] += emitCount
+			counts["errors"] += errorCount
+
+	def churn():
+		churnCount = 0
+		while not stopEvent.is_set():
+			subscriptionId = eventBus.subscribe("topic", callback)
+			eventBus.unsubscribe(subscriptionId)
+			churnCount += 1
+		with lock:
+			counts["churn"] += churnCount
+
+	threads = [threading.Thread(target=emitter) for i in range(0, emitterThreadCount)]
+	threads += [threading.Thread(target=churn) for i in range(0, churnThreadCount)]
+	for thread in threads:
+		thread.start()
+	time.sleep(contentionTime)
+	stopEvent.set()
+	for thread in threads:
+		thread.join()
+	return counts
+
+eventBusClasses = [("crownstone_core", EventBus), ("copy on write", CopyOnWriteEventBus)]
+
+for subscriberCount in subscriberCounts:
+	results = [f"{name} {timeEmit(eventBusClass, subscriberCount) * 1e6:7.2f} us" for name, eventBusClass in eventBusClasses]
+	print(f"emit to {subscriberCount:3d} subscribers: " + ", ".join(results))
+
+for name, eventBusClass in eventBusClasses:
+	counts = runContention(eventBusClass)
+	print(f"{name:>15s} under contention: "
+	      f"{counts['emit'] / contentionTime:9.0f} emits/s, "
+	      f"{counts['churn'] / contentionTime:8.0f} subscribe+unsubscribe/s, "
+	      f"{counts['errors']} errors")
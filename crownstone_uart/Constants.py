@@ -1,3 +1,12 @@
+import os
 
 UART_WRITE_TIMEOUT = 0.1 # seconds
-UART_READ_TIMEOUT  = 0.25 # seconds
\ No newline at end of file
+UART_READ_TIMEOUT  = 0.25 # seconds
+
+# File in which the port of the last connected Crownstone USB can be stored, so it can be tried first the next time.
+# Not used by default, pass it as portCacheFile to initialize_usb.
+UART_PORT_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".crownstone_uart_port.json")
+
+# USB vendor IDs of serial chips that are used by Crownstone USB dongles and dev boards: Silicon Labs CP210x and SEGGER J-Link.
+# Not used by default, as other chips may be used too. Pass it as usbVendorIds to initialize_usb, to skip other USB ports.
+CROWNSTONE_USB_VENDOR_IDS = [0x10C4, 0x1366]
@@ -9,6 +9,10 @@ class UartError(Enum):
 class UartBridgeError(Enum):
     """Error types for Uart Bridge exceptions."""
     CANNOT_OPEN_SERIAL_CONTROLLER       = "CANNOT_OPEN_SERIAL_CONTROLLER"
+    WRITE_QUEUE_STOPPED                 = "WRITE_QUEUE_STOPPED"
+    WRITE_QUEUE_FULL                    = "WRITE_QUEUE_FULL"
+    WRITE_DROPPED                       = "WRITE_DROPPED"
+    WRITE_FAILED                        = "WRITE_FAILED"
 
     def __str__(self) -> str:
         """Return value of the error."""
@@ -1,3 +1,8 @@
 from crownstone_uart.core.CrownstoneUart import CrownstoneUart
+from crownstone_uart.core.CrownstoneUartPool import CrownstoneUartPool
 from crownstone_uart.core.UartEventBus import UartEventBus
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
+from crownstone_uart.core.containerClasses.UartConnectionOptions import UartConnectionOptions
 from crownstone_uart.topics.UartTopics import UartTopics
+from crownstone_uart.core.uart.UartTypes import UartWriteQueueFullPolicy, UartWritePriority, UartStreamOverflowPolicy, UartSampleFormat
+from crownstone_uart.core.uart.UartParser import register_opcode_handler, set_sample_format
@@ -0,0 +1,212 @@
+import itertools
+import logging
+import threading
+
+from crownstone_uart.topics.TopicKeys import TOPIC_KEY_GETTERS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CopyOnWriteEventBus:
+    """
+    Event bus with the same API as crownstone_core.util.EventBus, that can be used from multiple threads at the same time.
+
+    Each topic has an immutable tuple of subscribers, which is replaced on subscribe, so emit can iterate it without a lock,
+    while other threads subscribe and unsubscribe.
+    Unsubscribe only removes the subscription id from a dict. Emit skips removed subscribers, and the tuple is only
+    rebuilt once half of its subscribers have been removed.
+
+    A subscription can have a key, like crownstoneId=38, to only get the events with that value. These subscribers
+    are kept in a tuple per key value, so emit only looks at the subscribers with a matching key.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # For each topic: tuple of (subscriptionId, callback).
+        self.topics = {}
+        # For each topic: dict with for each key name: dict with for each key value: tuple of (subscriptionId, callback).
+        # The dict per topic is replaced when a key name is added, so emit can iterate it.
+        self.keyedTopics = {}
+        # For each subscription id: its location, which is (topic, keyName, keyValue), or (topic, None, None) without key.
+        self.subscriptions = {}
+        # For each location: number of subscribers in the tuple that have been removed.
+        self.removedCounts = {}
+        self.subscriptionIdCounter = itertools.count()
+        # Incremented on every change of the subscriptions, so users can cache what they derive from them.
+        self.version = 0
+
+    def subscribe(self, topic, callback, **key):
+        """
+        :param topic:    Topic to subscribe to.
+        :param callback: Function that is called with the data of each emit on this topic.
+        :param key:      Optional single key, like crownstoneId=38, to only get the events with that value.
+                         See TOPIC_KEY_GETTERS for how the value is taken from the data.
+        :return:         Subscription id, to unsubscribe with.
+        """
+        return self._subscribe(next(self.subscriptionIdCounter), topic, callback, key)
+
+    def once(self, topic, callback, **key):
+        """
+        Subscribe to only the first event: the subscription is removed before the callback is called.
+        Parameters are the same as for subscribe.
+
+        :return: Subscription id, to unsubscribe with before the event has been emitted.
+        """
+        subscriptionId = next(self.subscriptionIdCounter)
+
+        def callOnce(data):
+            # Only the emit that removes the subscription calls the callback, also when emitted from multiple threads.
+            if self.unsubscribe(subscriptionId):
+                callback(data)
+
+        return self._subscribe(subscriptionId, topic, callOnce, key)
+
+    def _subscribe(self, subscriptionId, topic, callback, key):
+        if len(key) > 1:
+            raise TypeError(f"Subscribe with at most one key, not {list(key)}")
+        keyName, keyValue = next(iter(key.items()), (None, None))
+        location = (topic, keyName, keyValue)
+
+        with self.lock:
+            self.subscriptions[subscriptionId] = location
+            subscribers = self._getSubscribers(location) or ()
+            self._setSubscribers(location, subscribers + ((subscriptionId, callback),))
+            self.version += 1
+        return subscriptionId
+
+    def unsubscribe(self, subscriptionId) -> bool:
+        """
+        :param subscriptionId: Id returned by subscribe. Unknown ids, like None or an id that was already unsubscribed, are ignored.
+        :return:               True when the subscription has been removed, False when the id was unknown.
+        """
+        with self.lock:
+            location = self.subscriptions.pop(subscriptionId, None)
+            if location is None:
+                return False
+            self.version += 1
+
+            removedCount = self.removedCounts.get(location, 0) + 1
+            subscribers = self._getSubscribers(location)
+            if 2 * removedCount < len(subscribers):
+                self.removedCounts[location] = removedCount
+                return True
+
+            # The replaced tuple is kept by the subscribers variable until the lock is released: dropping the last reference
+            # to a callback can run a finalizer that unsubscribes, which would deadlock when it runs while holding the lock.
+            remainingSubscribers = tuple(subscriber for subscriber in subscribers if subscriber[0] in self.subscriptions)
+            self.removedCounts.pop(location, None)
+            self._setSubscribers(location, remainingSubscribers)
+        return True
+
+    def has_subscribers(self, topic) -> bool:
+        """
+        :return: True when the topic has any subscriber, with or without key.
+        """
+        return self.get_subscriber_count(topic) > 0
+
+    def get_subscriber_count(self, topic) -> int:
+        """
+        :return: Number of subscribers of the topic, with or without key.
+        """
+        with self.lock:
+            return sum(len(self._getSubscribers(location)) - self.removedCounts.get(location, 0) for location in self._getLocations(topic))
+
+    def get_subscription_ids(self, topic) -> set:
+        """
+        :return: Subscription ids of the subscribers of the topic, with or without key.
+        """
+        with self.lock:
+            return {
+                subscriptionId
+                for location in self._getLocations(topic)
+                for subscriptionId, callback in self._getSubscribers(location)
+                if subscriptionId in self.subscriptions
+            }
+
+    def emit(self, topic, data=None):
+        """
+        Call the callbacks of all subscribers of the topic, and those with a matching key, from this thread.
+        An exception raised by a callback is logged, and does not stop the other callbacks from being called.
+
+        :param topic: Topic to emit on.
+        :param data:  Data to pass to the callbacks.
+        """
+        subscribers = self.topics.get(topic)
+        if subscribers is not None:
+            self._call(subscribers, data)
+
+        keyedSubscribers = self.keyedTopics.get(topic)
+        if keyedSubscribers is not None:
+            for keyName, subscribersPerValue in keyedSubscribers.items():
+                subscribers = subscribersPerValue.get(self._getKeyValue(topic, keyName, data))
+                if subscribers is not None:
+                    self._call(subscribers, data)
+
+    def _call(self, subscribers, data):
+        subscriptions = self.subscriptions
+        for subscriptionId, callback in subscribers:
+            # Skip subscribers that have been removed, also when that happened during this emit.
+            if subscriptionId in subscriptions:
+                try:
+                    callback(data)
+                except Exception as e:
+                    _LOGGER.error(f"Error in callback of subscriptionId={subscriptionId}: {e}", exc_info=True)
+
+    @staticmethod
+    def _getKeyValue(topic, keyName, data):
+        keyGetter = TOPIC_KEY_GETTERS.get(topic, {}).get(keyName)
+        try:
+            if keyGetter is not None:
+                return keyGetter(data)
+            return getattr(data, keyName, None)
+        except (IndexError, KeyError, TypeError):
+            return None
+
+    def _getLocations(self, topic):
+        """
+        :return: Locations of the topic that have subscribers. Must be called with the lock.
+        """
+        locations = [(topic, None, None)] if topic in self.topics else []
+        for keyName, subscribersPerValue in self.keyedTopics.get(topic, {}).items():
+            locations += [(topic, keyName, keyValue) for keyValue in subscribersPerValue]
+        return locations
+
+    def _getSubscribers(self, location):
+        topic, keyName, keyValue = location
+        if keyName is None:
+            return self.topics.get(topic)
+        return self.keyedTopics.get(topic, {}).get(keyName, {}).get(keyValue)
+
+    def _setSubscribers(self, location, subscribers):
+        """
+        Replace the tuple of subscribers at the location, and remove the location when empty. Must be called with the lock.
+        """
+        topic, keyName, keyValue = location
+        if keyName is None:
+            if subscribers:
+                self.topics[topic] = subscribers
+            else:
+                self.topics.pop(topic, None)
+            return
+
+        keyedSubscribers = self.keyedTopics.get(topic, {})
+        subscribersPerValue = keyedSubscribers.get(keyName)
+        if subscribersPerValue is None:
+            if not subscribers:
+                return
+            subscribersPerValue = {}
+            # Replace the dict of the topic, as emit may be iterating the current one.
+            keyedSubscribers = {**keyedSubscribers, keyName: subscribersPerValue}
+            self.keyedTopics[topic] = keyedSubscribers
+
+        if subscribers:
+            subscribersPerValue[keyValue] = subscribers
+            return
+
+        subscribersPerValue.pop(keyValue, None)
+        if not subscribersPerValue:
+            keyedSubscribers = {name: values for name, values in keyedSubscribers.items() if name != keyName}
+            if keyedSubscribers:
+                self.keyedTopics[topic] = keyedSubscribers
+            else:
+                self.keyedTopics.pop(topic, None)
@@ -1,12 +1,13 @@
 # import signal  # used to catch control C
 import logging
-import queue
-import time
 
 from crownstone_core.protocol.BlePackets import ControlPacket
 from crownstone_core.protocol.BluenetTypes import ControlType
 
+from crownstone_uart.core.UartEventBus import UartEventBus
+from crownstone_uart.core.containerClasses.UartConnectionOptions import UartConnectionOptions
 from crownstone_uart.core.modules.ControlHandler import ControlHandler
+from crownstone_uart.core.dataFlowManagers.EventStream import EventStream
 from crownstone_uart.core.dataFlowManagers.UartWriter import UartWriter
 from crownstone_uart.core.modules.MeshHandler import MeshHandler
 from crownstone_uart.core.modules.StateHandler import StateHandler
@@ -15,31 +16,34 @@ from crownstone_uart.core.dataFlowManagers.StoneManager import StoneManager
 from crownstone_uart.core.modules.UsbDevHandler import UsbDevHandler
 import asyncio
 
-from crownstone_uart.core.UartEventBus import UartEventBus
 from crownstone_uart.core.uart.UartManager import UartManager
 from crownstone_uart.core.uart.uartPackets.UartMessagePacket import UartMessagePacket
-from crownstone_uart.core.uart.UartTypes import UartTxType, UartMessageType
+from crownstone_uart.core.uart.UartTypes import UartTxType, UartMessageType, UartStreamOverflowPolicy
 from crownstone_uart.core.uart.uartPackets.UartWrapperPacket import UartWrapperPacket
-from crownstone_uart.topics.SystemTopics import SystemTopics
 
 _LOGGER = logging.getLogger(__name__)
 
 class CrownstoneUart:
     __version__ = "2.1.0-git"
 
-    def __init__(self):
+    def __init__(self, eventBus=UartEventBus):
+        """
+        :param eventBus: EventBus on which all events of this Crownstone USB are emitted, and on which it takes its writes.
+            Give each instance its own CopyOnWriteEventBus() to use multiple Crownstone USBs in one process.
+            By default, the global UartEventBus is used.
+        """
         self.uartManager = None
         self.running = True
+        self.eventBus = eventBus
 
-        self.manager_exception_queue = queue.Queue()
-        self.uartManager = UartManager(self.manager_exception_queue)
-        self.stoneManager = StoneManager()
+        self.uartManager = UartManager(eventBus)
+        self.stoneManager = StoneManager(eventBus)
 
-        self.control = ControlHandler()
-        self.state = StateHandler()
-        self.mesh = MeshHandler()
+        self.control = ControlHandler(eventBus)
+        self.state = StateHandler(eventBus)
+        self.mesh = MeshHandler(eventBus)
         # only for development. Generally undocumented.
-        self._usbDev = UsbDevHandler()
+        self._usbDev = UsbDevHandler(eventBus)
 
     def __del__(self):
         self.stop()
@@ -47,77 +51,110 @@ class CrownstoneUart:
     def is_ready(self) -> bool:
         return self.uartManager.is_ready()
 
-    async def initialize_usb(self, port = None, baudrate=230400, writeChunkMaxSize=0):
+    def stream(self, topic, maxsize=100, overflow=UartStreamOverflowPolicy.DROP_OLDEST, **key) -> EventStream:
         """
-        Initialize a Crownstone serial device. 
-            
-        :param port: serial port of the USB. e.g. '/dev/ttyUSB0' or 'COM3'.
-        :param baudrate: baudrate that should be used for this connection. default is 230400.
-        :param writeChunkMaxSize: writing in chunks solves issues writing to certain JLink chips. A max chunkSize of 64 was found to work well for our case.
-            For normal usage with Crownstones this is not required. a writeChunkMaxSize of 0 will not send the payload in chunks.
-        
-        This method is a coroutine.
+        Get the events of a topic as async iterator, for example:
+            async with uart.stream(UartTopics.assetIdReport) as reports:
+                async for report in reports:
+                    ...
+        The events are buffered until iterated, they can be emitted from any thread.
+
+        :param topic: topic to stream, for example UartTopics.assetIdReport.
+        :param maxsize: max number of events in the buffer.
+        :param overflow: UartStreamOverflowPolicy, or its value as string, which event to drop when the buffer is full:
+            "drop_oldest" or "drop_newest". The number of dropped events is part of get_metrics() of the stream.
+        :param key: optional single key, like crownstoneId=38 or assetId=..., to only stream the events with that value.
+        :return: EventStream, call close() on it when done, or use it with "async with".
         """
-        self.uartManager.config(port, baudrate, writeChunkMaxSize)
+        return EventStream(topic, maxsize, overflow, self.eventBus, **key)
 
-        result = [False]
-        def handleMessage(result, data):
-            result[0] = True
+    def get_write_queue_metrics(self):
+        """
+        Get the metrics of the queue of packets waiting to be written to the serial port.
+        Producers can use these to slow down before the queue gets full.
 
-        event = UartEventBus.subscribe(SystemTopics.connectionEstablished, lambda data: handleMessage(result, data))
-        self.uartManager.start()
+        :return: dict with queueDepth, queueDepthPerPriority, maxQueueDepth, written, dropped, rejected, averageWaitTime and maxWaitTime (seconds),
+                 and rate: the packetsPerSecond and bytesPerSecond currently allowed by the rate limiter, or None when there is no limit.
+                 None when not connected.
+        """
+        return self.uartManager.get_write_queue_metrics()
 
-        while not result[0] and self.running:
-            try:
-                exception, exception_value, trace = self.manager_exception_queue.get(block=False)
-                self.uartManager.join()
-                self.stop()
-                raise exception(exception_value)
-            except queue.Empty:
-                pass
+    def get_heartbeat_metrics(self):
+        """
+        Get the metrics of the heartbeats, when enabled with UartConnectionOptions.heartbeatInterval.
 
-            await asyncio.sleep(0.1)
+        :return: dict with sent, missed, consecutiveMissed, lastRoundTripTime, minRoundTripTime, averageRoundTripTime and maxRoundTripTime (seconds),
+                 and histogram: a dict with the number of recent round trip times per bucket, keyed by the upper bound of the bucket in seconds.
+                 None when not connected, or when heartbeats are disabled.
+        """
+        return self.uartManager.get_heartbeat_metrics()
 
-        UartEventBus.unsubscribe(event)
+    def get_dispatch_metrics(self):
+        """
+        Get the metrics of the queue of received packets waiting to be emitted, when enabled with UartConnectionOptions.dispatchQueueSize.
 
+        :return: dict with queueDepth, maxQueueDepth, maxQueueSize, dispatched and dropped (number of received packets).
+                 None when not connected, or when not dispatching.
+        """
+        return self.uartManager.get_dispatch_metrics()
 
-    def initialize_usb_sync(self, port = None, baudrate=230400, writeChunkMaxSize=0):
+    async def initialize_usb(self, port = None, baudrate=230400, writeChunkMaxSize=0, options: UartConnectionOptions = None):
         """
-        Initialize a Crownstone serial device. 
-            
+        Initialize a Crownstone serial device.
+
         :param port: serial port of the USB. e.g. '/dev/ttyUSB0' or 'COM3'.
         :param baudrate: baudrate that should be used for this connection. default is 230400.
         :param writeChunkMaxSize: writing in chunks solves issues writing to certain JLink chips. A max chunkSize of 64 was found to work well for our case.
             For normal usage with Crownstones this is not required. a writeChunkMaxSize of 0 will not send the payload in chunks.
+        :param options: UartConnectionOptions with the transport, write queue and reconnect settings, or None for the defaults.
+
+        This method is a coroutine.
         """
-        self.uartManager.config(port, baudrate, writeChunkMaxSize)
+        if options is None:
+            options = UartConnectionOptions()
+        loop = None
+        if options.asyncTransport:
+            loop = asyncio.get_running_loop()
+        dispatchLoop = None
+        if options.dispatchToLoop:
+            dispatchLoop = asyncio.get_running_loop()
+        self.uartManager.config(port, baudrate, writeChunkMaxSize, options, loop=loop, dispatchLoop=dispatchLoop)
 
-        result = [False]
+        self.uartManager.start()
+
+        try:
+            await asyncio.wrap_future(self.uartManager.setupFuture)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.uartManager.join()
+            self.stop()
+            raise
 
-        def handleMessage(result, data):
-            result[0] = True
 
-        event = UartEventBus.subscribe(SystemTopics.connectionEstablished, lambda data: handleMessage(result, data))
+    def initialize_usb_sync(self, port = None, baudrate=230400, writeChunkMaxSize=0, options: UartConnectionOptions = None):
+        """
+        Initialize a Crownstone serial device. See initialize_usb() for the parameters.
+        The asyncTransport and dispatchToLoop options require a running event loop, so they can only be used with initialize_usb().
+        """
+        if options is not None and (options.asyncTransport or options.dispatchToLoop):
+            raise ValueError("asyncTransport and dispatchToLoop can only be used with initialize_usb()")
+        self.uartManager.config(port, baudrate, writeChunkMaxSize, options)
+
         self.uartManager.start()
 
         try:
-            while not result[0] and self.running:
-                try:
-                    exc = self.manager_exception_queue.get(block=False)
-                    self.uartManager.join()
-                    self.stop()
-                    raise exc[0](exc[1])
-                except queue.Empty:
-                    pass
-
-                time.sleep(0.1)
+            try:
+                self.uartManager.setupFuture.result()
+            except Exception:
+                self.uartManager.join()
+                self.stop()
+                raise
 
         except KeyboardInterrupt:
             print("\nClosing Crownstone Uart.... Thanks for your time!")
             self.stop()
 
-        UartEventBus.unsubscribe(event)
-
 
     def stop(self):
         if self.uartManager is not None:
@@ -164,4 +201,4 @@ class CrownstoneUart:
         uartPacket    = UartWrapperPacket(UartMessageType.UART_MESSAGE, uartMessage).serialize()
 
         # send over uart
-        result = UartWriter(uartPacket).write_sync()
+        result = UartWriter(uartPacket, eventBus=self.eventBus).write_sync()
@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import List
+
+from crownstone_core.packets.ResultPacket import ResultPacket
+from crownstone_core.protocol.BluenetTypes import ResultValue
+
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
+from crownstone_uart.core.CrownstoneUart import CrownstoneUart
+from crownstone_uart.core.UartEventBus import UartEventBus
+from crownstone_uart.core.dataFlowManagers.EventStream import EventStream
+from crownstone_uart.core.dataFlowManagers.StoneManager import StoneManager
+from crownstone_uart.core.modules.ControlHandler import ControlHandler
+from crownstone_uart.core.modules.MeshHandler import MeshHandler
+from crownstone_uart.core.modules.PoolHandler import PoolHandler
+from crownstone_uart.core.uart.UartTypes import UartStreamOverflowPolicy
+from crownstone_uart.topics.SystemTopics import SystemTopics
+from crownstone_uart.topics.UartTopics import UartTopics
+from crownstone_uart.Exceptions import UartError, UartException
+
+_LOGGER = logging.getLogger(__name__)
+
+# Weight of the latest result in the recent BUSY rate of a Crownstone USB.
+BUSY_RATE_WEIGHT = 0.1
+
+# A Crownstone USB that only replies BUSY counts as having this many more commands in progress.
+BUSY_LOAD = 10
+
+# Identical state updates and asset reports that are received within this many seconds, by any of the Crownstone USBs, are emitted only once.
+DEDUPLICATION_TIME = 0.5
+
+
+class CrownstoneUartPool:
+    """
+    Multiple Crownstone USBs in the same sphere, used as one.
+
+    The mesh and control modules have the same methods as those of CrownstoneUart. Each command is sent via the
+    Crownstone USB with the fewest commands in progress and packets waiting to be written, taking into account
+    how often it recently replied BUSY.
+
+    Each Crownstone USB has its own event bus. The state updates and asset reports they receive are merged,
+    and emitted only once on the event bus of the pool. See DEDUPLICATION_TIME.
+    """
+
+    def __init__(self, eventBus=UartEventBus):
+        """
+        :param eventBus: EventBus on which the merged events are emitted. By default, the global UartEventBus is used.
+        """
+        self.eventBus = eventBus
+        self.running = True
+
+        # CrownstoneUart of each Crownstone USB in the pool.
+        self.uarts: List[CrownstoneUart] = []
+        # For each Crownstone USB: number of commands that are in progress, and the recent fraction of BUSY results.
+        self.commandsInProgress = []
+        self.busyRates = []
+        # For each Crownstone USB: ids of our subscriptions on its event bus.
+        self.subscriptionIds = []
+        self.nextIndex = 0
+        self.lock = threading.RLock()
+
+        # Key of recent state updates and asset reports, with the time they were received.
+        self.eventTimestamps = {}
+        self.eventPurgeTimestamp = time.monotonic()
+
+        # Deduplicates the state updates of all Crownstone USBs, and emits newDataAvailable and newCrownstoneFound on our event bus.
+        self.stoneManager = StoneManager(eventBus)
+
+        self.mesh = PoolHandler(self, "mesh", MeshHandler)
+        self.control = PoolHandler(self, "control", ControlHandler)
+
+    def __del__(self):
+        self.stop()
+
+    async def initialize_usb(self, ports: List[str], **kwargs):
+        """
+        Initialize a Crownstone USB on each of the given ports, at the same time.
+
+        :param ports: serial ports of the Crownstone USBs. e.g. ['/dev/ttyUSB0', '/dev/ttyUSB1'].
+        :param kwargs: other arguments of CrownstoneUart.initialize_usb, used for each Crownstone USB.
+
+        This method is a coroutine.
+        """
+        uarts = [self._addUart() for port in ports]
+        await asyncio.gather(*[uart.initialize_usb(port, **kwargs) for uart, port in zip(uarts, ports)])
+
+    def initialize_usb_sync(self, ports: List[str], **kwargs):
+        """
+        Initialize a Crownstone USB on each of the given ports, one after the other.
+
+        :param ports: serial ports of the Crownstone USBs. e.g. ['/dev/ttyUSB0', '/dev/ttyUSB1'].
+        :param kwargs: other arguments of CrownstoneUart.initialize_usb_sync, used for each Crownstone USB.
+        """
+        for port in ports:
+            self._addUart().initialize_usb_sync(port, **kwargs)
+
+    def stop(self):
+        self.running = False
+        for uart, subscriptionIds in zip(self.uarts, self.subscriptionIds):
+            for subscriptionId in subscriptionIds:
+                uart.eventBus.unsubscribe(subscriptionId)
+            subscriptionIds.clear()
+            uart.stop()
+
+    def is_ready(self) -> bool:
+        """
+        :return: True when at least one Crownstone USB in the pool is ready.
+        """
+        return any(self._isReady(index) for index in range(len(self.uarts)))
+
+    def switch_crownstone(self, crownstoneId: int, on: bool):
+        """
+        :param crownstoneId:
+        :param on: Boolean
+        :return:
+        """
+        if not on:
+            self.mesh.turn_crownstone_off(crownstoneId)
+        else:
+            self.mesh.turn_crownstone_on(crownstoneId)
+
+    def dim_crownstone(self, crownstoneId: int, switchVal: int):
+        """
+        :param crownstoneId:
+        :param switchVal: 0% .. 100% or special values (SwitchValSpecial).
+        :return:
+        """
+        self.mesh.set_crownstone_switch(crownstoneId, switchVal)
+
+    def get_crownstone_ids(self):
+        return self.stoneManager.getIds()
+
+    def get_crownstones(self):
+        return self.stoneManager.getStones()
+
+    def stream(self, topic, maxsize=100, overflow=UartStreamOverflowPolicy.DROP_OLDEST, **key) -> EventStream:
+        """
+        Get the events of a topic as async iterator, for example:
+            async with pool.stream(UartTopics.assetIdReport) as reports:
+                async for report in reports:
+                    ...
+        State updates and asset reports that are received by multiple Crownstone USBs are streamed once,
+        like they are emitted on the event bus of the pool. State updates without timestamp are not deduplicated.
+
+        :param topic: topic to stream, for example UartTopics.assetIdReport.
+        :param maxsize: max number of events in the buffer.
+        :param overflow: UartStreamOverflowPolicy, or its value as string, which event to drop when the buffer is full:
+            "drop_oldest" or "drop_newest". The number of dropped events is part of get_metrics() of the stream.
+        :param key: optional single key, like crownstoneId=38 or assetId=..., to only stream the events with that value.
+        :return: EventStream, call close() on it when done, or use it with "async with".
+        """
+        return EventStream(topic, maxsize, overflow, self.eventBus, **key)
+
+    def get_load(self) -> List[dict]:
+        """
+        :return: for each Crownstone USB: a dict with ready, commandsInProgress, queueDepth and busyRate.
+        """
+        with self.lock:
+            return [{
+                "ready":              self._isReady(index),
+                "commandsInProgress": self.commandsInProgress[index],
+                "queueDepth":         self._getQueueDepth(index),
+                "busyRate":           self.busyRates[index],
+            } for index, uart in enumerate(self.uarts)]
+
+    def _addUart(self) -> CrownstoneUart:
+        uart = CrownstoneUart(CopyOnWriteEventBus())
+        with self.lock:
+            index = len(self.uarts)
+            self.uarts.append(uart)
+            self.commandsInProgress.append(0)
+            self.busyRates.append(0.0)
+            self.subscriptionIds.append([
+                uart.eventBus.subscribe(SystemTopics.resultPacket,       lambda resultPacket: self._handleResult(index, resultPacket)),
+                uart.eventBus.subscribe(SystemTopics.stateUpdate,        self._handleStateUpdate),
+                uart.eventBus.subscribe(UartTopics.assetIdReport,        lambda report: self._handleAssetReport(UartTopics.assetIdReport, report)),
+                uart.eventBus.subscribe(UartTopics.assetTrackingReport,  lambda report: self._handleAssetReport(UartTopics.assetTrackingReport, report)),
+            ])
+        return uart
+
+    def _call(self, handlerName, methodName, args, kwargs):
+        """
+        Call a method of a handler, on the least busy Crownstone USB.
+        """
+        with self.lock:
+            index = self._selectUart()
+            self.commandsInProgress[index] += 1
+
+        try:
+            result = getattr(getattr(self.uarts[index], handlerName), methodName)(*args, **kwargs)
+        except BaseException:
+            self._finishCommand(index)
+            raise
+
+        if asyncio.iscoroutine(result):
+            return self._awaitCommand(index, result)
+        self._finishCommand(index)
+        return result
+
+    async def _awaitCommand(self, index, coroutine):
+        try:
+            return await coroutine
+        finally:
+            self._finishCommand(index)
+
+    def _finishCommand(self, index):
+        with self.lock:
+            self.commandsInProgress[index] -= 1
+
+    def _selectUart(self) -> int:
+        """
+        :return: index of the ready Crownstone USB with the lowest load. Equal loads are taken in turns.
+        """
+        count = len(self.uarts)
+        bestIndex = None
+        bestLoad = None
+        for i in range(count):
+            index = (self.nextIndex + i) % count
+            if not self._isReady(index):
+                continue
+            load = self.commandsInProgress[index] + self._getQueueDepth(index) + BUSY_LOAD * self.busyRates[index]
+            if bestLoad is None or load < bestLoad:
+                bestIndex = index
+                bestLoad = load
+
+        if bestIndex is None:
+            raise UartException(UartError.NO_CROWNSTONE_UART_DEVICE_AVAILABLE, "None of the Crownstone USBs in the pool is ready.")
+        self.nextIndex = (bestIndex + 1) % count
+        return bestIndex
+
+    def _isReady(self, index):
+        uart = self.uarts[index]
+        return uart.running and uart.is_ready()
+
+    def _getQueueDepth(self, index):
+        metrics = self.uarts[index].get_write_queue_metrics()
+        if metrics is None:
+            return 0
+        return metrics["queueDepth"]
+
+    def _handleResult(self, index, resultPacket: ResultPacket):
+        busy = 1.0 if resultPacket.resultCode == ResultValue.BUSY else 0.0
+        with self.lock:
+            self.busyRates[index] += BUSY_RATE_WEIGHT * (busy - self.busyRates[index])
+
+    def _handleStateUpdate(self, data):
+        crownstoneId, state = data
+        # The same state, relayed by each Crownstone USB, has the same timestamp. Without timestamp, the state can't be told apart from a newer one.
+        stateTimestamp = getattr(state, "timestamp", None)
+        if stateTimestamp is not None:
+            with self.lock:
+                if self._isDuplicate((SystemTopics.stateUpdate, crownstoneId, type(state), stateTimestamp)):
+                    return
+        # Emit without the lock, so subscribers can use the pool.
+        self.eventBus.emit(SystemTopics.stateUpdate, data)
+
+    def _handleAssetReport(self, topic, report):
+        key = (topic,) + tuple((name, tuple(value) if isinstance(value, list) else value) for name, value in sorted(vars(report).items()))
+        with self.lock:
+            if self._isDuplicate(key):
+                return
+        self.eventBus.emit(topic, report)
+
+    def _isDuplicate(self, key) -> bool:
+        """
+        :return: True when an event with the same key was received in the last DEDUPLICATION_TIME seconds. Must be called with the lock.
+        """
+        now = time.monotonic()
+        if now - self.eventPurgeTimestamp > DEDUPLICATION_TIME:
+            self.eventTimestamps = {k: t for k, t in self.eventTimestamps.items() if now - t <= DEDUPLICATION_TIME}
+            self.eventPurgeTimestamp = now
+
+        timestamp = self.eventTimestamps.get(key)
+        if timestamp is not None and now - timestamp <= DEDUPLICATION_TIME:
+            return True
+        self.eventTimestamps[key] = now
+        return False
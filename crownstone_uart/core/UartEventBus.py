@@ -1,3 +1,3 @@
-from crownstone_core.util.EventBus import EventBus
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
 
-UartEventBus = EventBus()
\ No newline at end of file
+UartEventBus = CopyOnWriteEventBus()
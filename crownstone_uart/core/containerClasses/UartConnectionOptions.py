@@ -0,0 +1,91 @@
+from crownstone_uart.core.uart.UartTypes import UartWriteQueueFullPolicy
+
+
+class UartConnectionOptions:
+
+    def __init__(self, *,
+                 zeroCopy: bool = False,
+                 maxFrameSize: int = None,
+                 batchDelivery: bool = False,
+                 asyncTransport: bool = False,
+                 dispatchQueueSize: int = 0,
+                 dispatchToLoop: bool = False,
+                 maxWriteQueueSize: int = 0,
+                 writeQueueFullPolicy: UartWriteQueueFullPolicy = UartWriteQueueFullPolicy.BLOCK,
+                 maxWritePacketsPerSecond: float = None,
+                 maxWriteBytesPerSecond: float = None,
+                 adaptiveWriteRate: bool = False,
+                 concurrentDiscovery: bool = False,
+                 portCacheFile: str = None,
+                 usbVendorIds=None,
+                 reconnectAttempts: int = 5,
+                 replayIdempotent: bool = False,
+                 heartbeatInterval: float = None,
+                 heartbeatMaxMissed: int = 3):
+        """
+        Settings of the connection with a Crownstone USB, given to CrownstoneUart.initialize_usb() or initialize_usb_sync().
+        The defaults are the behaviour without options.
+
+        Transport:
+        :param zeroCopy:          When True, every received frame is kept as one bytes object and the payloads of received packets
+                                  are memoryview slices of it, instead of lists. Use payload.tolist() if a subscriber requires a list.
+        :param maxFrameSize:      When set, frames with a size field larger than this are dropped right away, and decoding resumes
+                                  at the next start token. This speeds up recovery from corrupted data.
+        :param batchDelivery:     When True, all packets decoded from a single serial read are emitted as one list on
+                                  SystemTopics.uartNewPackageBatch and SystemTopics.uartNewMessageBatch, instead of one by one on
+                                  SystemTopics.uartNewPackage and SystemTopics.uartNewMessage. The other topics are not affected.
+        :param asyncTransport:    When True, the serial port is read by the running event loop instead of a separate thread.
+                                  All events are then emitted on the event loop. Only with initialize_usb(), not available on Windows.
+        :param dispatchQueueSize: When larger than 0, the reader only decodes the received packets, and they are emitted from
+                                  a dispatcher thread instead, so slow subscribers don't hold up reading the serial port. At most this
+                                  many packets wait to be emitted, packets that are received when the queue is full are dropped.
+                                  See get_dispatch_metrics().
+        :param dispatchToLoop:    When True and dispatching, the received packets are emitted on the running event loop
+                                  instead of a dispatcher thread. Only with initialize_usb().
+
+        Write queue:
+        :param maxWriteQueueSize:        Max number of packets that can wait to be written to the serial port. 0 for no limit.
+        :param writeQueueFullPolicy:     UartWriteQueueFullPolicy, what happens when a packet is written while the write queue is full:
+                                         BLOCK waits until there is room, REJECT raises a UartException, and DROP_OLDEST drops the oldest
+                                         idempotent UartWriteRequest with the same supersedeKey as the new one, or waits if there is none.
+        :param maxWritePacketsPerSecond: When set, packets are spaced so that no more than this many are written per second.
+        :param maxWriteBytesPerSecond:   When set, packets are spaced so that no more than this many bytes are written per second.
+        :param adaptiveWriteRate:        When True, the rates above are lowered each time the Crownstone replies that it is busy,
+                                         and raised back up again with each other reply. The current rate is part of get_write_queue_metrics().
+
+        Discovery and reconnecting:
+        :param concurrentDiscovery: When True and no port is given, a hello is sent to all available ports at the same time,
+                                    instead of one port after the other. The first port that replies is used.
+        :param portCacheFile:       File in which the port of the connected Crownstone USB is stored. When no port is given,
+                                    this port is tried first. None to disable, for example UART_PORT_CACHE_FILE to enable.
+        :param usbVendorIds:        When no port is given, USB ports with a vendor ID that is not in this list are skipped,
+                                    unless none of the ports match. None to try all ports, for example CROWNSTONE_USB_VENDOR_IDS to filter.
+        :param reconnectAttempts:   When the connection is lost, the same port is tried this many times, with exponential backoff,
+                                    before all ports are scanned again.
+        :param replayIdempotent:    When True, idempotent packets that were not written when the connection was lost,
+                                    are written again once reconnected.
+        :param heartbeatInterval:   When set, a heartbeat is written every this many seconds. When the Crownstone doesn't reply
+                                    to heartbeatMaxMissed heartbeats in a row, the connection is considered lost and is set up again.
+                                    The round trip times are part of get_heartbeat_metrics().
+        :param heartbeatMaxMissed:  Number of heartbeats in a row that may go without reply.
+        """
+        self.zeroCopy = zeroCopy
+        self.maxFrameSize = maxFrameSize
+        self.batchDelivery = batchDelivery
+        self.asyncTransport = asyncTransport
+        self.dispatchQueueSize = dispatchQueueSize
+        self.dispatchToLoop = dispatchToLoop
+
+        self.maxWriteQueueSize = maxWriteQueueSize
+        self.writeQueueFullPolicy = writeQueueFullPolicy
+        self.maxWritePacketsPerSecond = maxWritePacketsPerSecond
+        self.maxWriteBytesPerSecond = maxWriteBytesPerSecond
+        self.adaptiveWriteRate = adaptiveWriteRate
+
+        self.concurrentDiscovery = concurrentDiscovery
+        self.portCacheFile = portCacheFile
+        self.usbVendorIds = usbVendorIds
+        self.reconnectAttempts = reconnectAttempts
+        self.replayIdempotent = replayIdempotent
+        self.heartbeatInterval = heartbeatInterval
+        self.heartbeatMaxMissed = heartbeatMaxMissed
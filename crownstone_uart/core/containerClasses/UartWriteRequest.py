@@ -0,0 +1,22 @@
+from crownstone_uart.core.uart.UartTypes import UartWritePriority
+
+
+class UartWriteRequest:
+
+    def __init__(self, data, idempotent: bool = False, priority: UartWritePriority = UartWritePriority.NORMAL, supersedeKey=None):
+        """
+        Can be emitted on SystemTopics.uartWriteData instead of the plain data, to tell the write queue how to treat it.
+
+        :param data:       Serialized uart wrapper packet: list of uint8, bytes or bytearray.
+        :param idempotent:   True when sending this packet twice does no harm. For example: setting a switch to an absolute value.
+                             These can be written again after reconnecting.
+        :param priority:     UartWritePriority, packets with a higher priority are written before the ones that are already waiting.
+        :param supersedeKey: Hashable that identifies what this packet sets, like ("switch", crownstoneId), or None.
+                             When the write queue is full, a waiting packet is dropped for a newer idempotent one with the same key.
+        """
+        self.data = data
+        self.idempotent = idempotent
+        self.priority = priority
+        self.supersedeKey = supersedeKey
+        # Set by the bridge once queued: Future that is resolved when the packet has been written, see UartWriteQueue.write().
+        self.future = None
@@ -3,20 +3,21 @@ from crownstone_uart.core.UartEventBus import UartEventBus
 
 class BatchCollector:
     
-    def __init__(self, topic= None, timeout = 15, interval = 0.05):
+    def __init__(self, topic= None, timeout = 15, interval = 0.05, eventBus = UartEventBus):
         self.response = None
+        self.eventBus = eventBus
         self.timeout = timeout
         self.interval = interval
 
         self.cleanupId = None
         if topic is not None:
-            self.cleanupId = UartEventBus.subscribe(topic, self.collect)
+            self.cleanupId = self.eventBus.subscribe(topic, self.collect)
 
     def __del__(self):
-        UartEventBus.unsubscribe(self.cleanupId)
+        self.eventBus.unsubscribe(self.cleanupId)
 
     def cleanup(self):
-        UartEventBus.unsubscribe(self.cleanupId)
+        self.eventBus.unsubscribe(self.cleanupId)
 
     def clear(self):
         self.response = None
@@ -5,17 +5,18 @@ from crownstone_uart.core.UartEventBus import UartEventBus
 
 class Collector:
     
-    def __init__(self, topic= None, timeout = 10, interval = 0.05):
+    def __init__(self, topic= None, timeout = 10, interval = 0.05, eventBus = UartEventBus):
         self.response = None
+        self.eventBus = eventBus
         self.timeout = timeout
         self.interval = interval
 
         self.cleanupId = None
         if topic is not None:
-            self.cleanupId = UartEventBus.subscribe(topic, self.collect)
+            self.cleanupId = self.eventBus.subscribe(topic, self.collect)
 
     def __del__(self):
-        UartEventBus.unsubscribe(self.cleanupId)
+        self.eventBus.unsubscribe(self.cleanupId)
 
     def clear(self):
         self.response = None
@@ -25,13 +26,13 @@ class Collector:
         while counter < self.timeout:
             if self.response is not None:
                 # cleanup the listener(s)
-                UartEventBus.unsubscribe(self.cleanupId)
+                self.eventBus.unsubscribe(self.cleanupId)
                 return self.response
 
             await asyncio.sleep(self.interval)
             counter += self.interval
 
-        UartEventBus.unsubscribe(self.cleanupId)
+        self.eventBus.unsubscribe(self.cleanupId)
         return None
     
     def receive_sync(self):
@@ -39,13 +40,13 @@ class Collector:
         while counter < self.timeout:
             if self.response is not None:
                 # cleanup the listener(s)
-                UartEventBus.unsubscribe(self.cleanupId)
+                self.eventBus.unsubscribe(self.cleanupId)
                 return self.response
 
             time.sleep(self.interval)
             counter += self.interval
 
-        UartEventBus.unsubscribe(self.cleanupId)
+        self.eventBus.unsubscribe(self.cleanupId)
         return None
 
     def collect(self, data):
@@ -0,0 +1,119 @@
+import asyncio
+import collections
+import threading
+
+from crownstone_uart.core.UartEventBus import UartEventBus
+from crownstone_uart.core.uart.UartTypes import UartStreamOverflowPolicy
+
+
+class EventStream:
+    """
+    Async iterator over the events of a topic, which can be emitted from any thread.
+
+    Events wait in a bounded buffer until they are taken with "async for". When the buffer is full,
+    an event is dropped according to the overflow policy, and counted.
+    The stream stays subscribed until it is closed, or until the "async with" block ends.
+    """
+
+    def __init__(self, topic, maxsize=100, overflow=UartStreamOverflowPolicy.DROP_OLDEST, eventBus=UartEventBus, loop=None, **key):
+        """
+        :param topic:    Topic to stream the events of.
+        :param maxsize:  Max number of events in the buffer.
+        :param overflow: UartStreamOverflowPolicy, or its value as string, which event to drop when the buffer is full.
+        :param eventBus: EventBus to subscribe to.
+        :param loop:     Event loop on which the stream is iterated. By default, the running event loop, so without loop,
+                         the stream must be created from a coroutine.
+        :param key:      Optional single key, like crownstoneId=38, to only stream the events with that value.
+        """
+        self.topic = topic
+        self.maxsize = maxsize
+        self.overflow = UartStreamOverflowPolicy(overflow)
+        self.eventBus = eventBus
+        self.loop = loop if loop is not None else asyncio.get_running_loop()
+
+        self.lock = threading.Lock()
+        self.buffer = collections.deque()
+        # Future that the iterator waits on when the buffer is empty.
+        self.waiter = None
+        self.closed = False
+
+        # Metrics
+        self.receivedCount = 0
+        self.droppedCount = 0
+
+        self.subscriptionId = self.eventBus.subscribe(topic, self._handleEvent, **key)
+
+    def __del__(self):
+        # Not subscribed when the constructor raised.
+        self.eventBus.unsubscribe(getattr(self, "subscriptionId", None))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            with self.lock:
+                if self.buffer:
+                    return self.buffer.popleft()
+                if self.closed:
+                    raise StopAsyncIteration
+                self.waiter = self.loop.create_future()
+                waiter = self.waiter
+            await waiter
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, excType, excValue, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Unsubscribe. Events that are already in the buffer can still be iterated.
+        """
+        self.eventBus.unsubscribe(self.subscriptionId)
+        with self.lock:
+            self.closed = True
+            waiter = self.waiter
+            self.waiter = None
+        self._wakeThreadsafe(waiter)
+
+    def get_metrics(self) -> dict:
+        """
+        :return: dict with received and dropped (number of events), and bufferDepth.
+        """
+        with self.lock:
+            return {
+                "received":    self.receivedCount,
+                "dropped":     self.droppedCount,
+                "bufferDepth": len(self.buffer),
+            }
+
+    def _handleEvent(self, data):
+        with self.lock:
+            if self.closed:
+                return
+            self.receivedCount += 1
+            if len(self.buffer) >= self.maxsize:
+                self.droppedCount += 1
+                if self.overflow == UartStreamOverflowPolicy.DROP_NEWEST:
+                    return
+                self.buffer.popleft()
+            self.buffer.append(data)
+            waiter = self.waiter
+            self.waiter = None
+        self._wakeThreadsafe(waiter)
+
+    def _wakeThreadsafe(self, waiter):
+        if waiter is None:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._wake, waiter)
+        except RuntimeError:
+            # The loop is closed, so nobody is waiting anymore.
+            pass
+
+    @staticmethod
+    def _wake(waiter):
+        if not waiter.done():
+            waiter.set_result(None)
@@ -5,10 +5,11 @@ from crownstone_uart.topics.SystemTopics import SystemTopics
 
 class StoneManager:
     
-    def __init__(self):
+    def __init__(self, eventBus=UartEventBus):
         self.stones = {}
-        self.stateManager = StoneStateManager()
-        UartEventBus.subscribe(SystemTopics.newCrownstoneFound, self.handleNewStoneFromScan)
+        self.eventBus = eventBus
+        self.stateManager = StoneStateManager(eventBus)
+        self.eventBus.subscribe(SystemTopics.newCrownstoneFound, self.handleNewStoneFromScan)
 
     def getIds(self):
         ids = []
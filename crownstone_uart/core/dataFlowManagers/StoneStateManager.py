@@ -4,9 +4,10 @@ from crownstone_uart.topics.UartTopics import UartTopics
 
 
 class StoneStateManager:
-    def __init__(self):
+    def __init__(self, eventBus=UartEventBus):
         self.stones = {}
-        UartEventBus.subscribe(SystemTopics.stateUpdate, self.handleStateUpdate)
+        self.eventBus = eventBus
+        self.eventBus.subscribe(SystemTopics.stateUpdate, self.handleStateUpdate)
 
     def handleStateUpdate(self, data):
         stoneId    = data[0]
@@ -18,12 +19,12 @@ class StoneStateManager:
                     self.stones[stoneId] = advPayload
                     self.emitNewData(advPayload)
         else:
-            UartEventBus.emit(SystemTopics.newCrownstoneFound, stoneId)
+            self.eventBus.emit(SystemTopics.newCrownstoneFound, stoneId)
             self.stones[stoneId] = advPayload
             self.emitNewData(advPayload)
     
     def emitNewData(self, advPayload):
-        UartEventBus.emit(UartTopics.newDataAvailable, advPayload)
+        self.eventBus.emit(UartTopics.newDataAvailable, advPayload)
 
     def getIds(self):
         ids = []
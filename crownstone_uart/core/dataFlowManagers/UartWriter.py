@@ -1,12 +1,15 @@
 import asyncio, logging, time
+from concurrent.futures import Future
 from typing import List
 
 from crownstone_core.Exceptions import CrownstoneException
 from crownstone_core.packets.ResultPacket import ResultPacket
 from crownstone_core.protocol.BluenetTypes import ResultValue
 
-from crownstone_uart.Constants import UART_WRITE_TIMEOUT
+from crownstone_uart.Exceptions import UartBridgeError, UartException
 from crownstone_uart.core.UartEventBus import UartEventBus
+from crownstone_uart.core.containerClasses.UartWriteRequest import UartWriteRequest
+from crownstone_uart.core.uart.UartTypes import UartWritePriority
 from crownstone_uart.topics.SystemTopics import SystemTopics
 
 _LOGGER = logging.getLogger(__name__)
@@ -18,41 +21,44 @@ Usage of code duplication is because asyncio is difficult when obtaining event l
 To avoid this annoying behaviour, we duplicate the code a bit.
 """
 class UartWriter:
-    def __init__(self, dataToSend: List[int], interval = 0.001):
+    def __init__(self, dataToSend: List[int], interval = 0.001, priority = UartWritePriority.NORMAL, eventBus = UartEventBus):
         """
         This class will handle the event flow around writing to uart and receiving errors or result codes.
         :param dataToSend: This is your data packet
         :param interval: Polling interval. Don't touch. This is cheap and local only. It does not do uart things.
+        :param priority: UartWritePriority of your data packet.
+        :param eventBus: EventBus of the Crownstone USB to write to.
         """
         self.dataToSend : List[int] = dataToSend
         self.interval = interval
+        self.priority = priority
+        self.eventBus = eventBus
 
-        self.error   = None
-        self.success = False
         self.result  = None
 
         self.cleanupIds = []
-        self.cleanupIds.append(UartEventBus.subscribe(SystemTopics.resultPacket,     self._handleResult))
-        self.cleanupIds.append(UartEventBus.subscribe(SystemTopics.uartWriteSuccess, self._handleSuccess))
-        self.cleanupIds.append(UartEventBus.subscribe(SystemTopics.uartWriteError,   self._handleError))
+        self.cleanupIds.append(self.eventBus.subscribe(SystemTopics.resultPacket, self._handleResult))
 
     def __del__(self):
         for cleanupId in self.cleanupIds:
-            UartEventBus.unsubscribe(cleanupId)
-
-    def _handleError(self, errorData):
-        _LOGGER.error("Error during uart write", errorData)
-        self.error = errorData
-        raise errorData["error"]
+            self.eventBus.unsubscribe(cleanupId)
 
     def _handleResult(self, data: ResultPacket):
         self.result = data
         _LOGGER.debug("Uart result packet received")
 
-    def _handleSuccess(self, data: List[int]):
-        if data == self.dataToSend:
-            _LOGGER.debug("Uart write successful")
-            self.success = True
+    def _queueWrite(self) -> Future:
+        """
+        Queue the data packet in the write queue of the bridge.
+
+        :return: Future that is resolved once the packet has been written, see UartWriteQueue.write().
+        """
+        writeRequest = UartWriteRequest(self.dataToSend, priority=self.priority)
+        self.eventBus.emit(SystemTopics.uartWriteData, writeRequest)
+        if writeRequest.future is None:
+            self.__del__()
+            raise UartException(UartBridgeError.WRITE_QUEUE_STOPPED, "Write not queued: not connected to a Crownstone USB.")
+        return writeRequest.future
 
     async def write_with_result(self, success_codes=None, result_timeout=1) -> ResultPacket:
         """
@@ -65,13 +71,13 @@ class UartWriter:
         If a resultcode is not in the list, an CrownstoneException will be raised. You can await the result. If the write fails, an CrownstoneException will be raised.
 
         :param success_codes: List[ResultValue]
-        :param result_timeout: time to wait on a result in seconds before raising a timeout CrownstoneException. This should be higher than the UART_WRITE_TIMEOUT
+        :param result_timeout: time to wait on a result in seconds, after the packet has been written, before raising a timeout CrownstoneException.
         :return: ResultPacket
         """
 
         if success_codes is None:
             success_codes = [ResultValue.SUCCESS]
-        UartEventBus.emit(SystemTopics.uartWriteData, self.dataToSend)
+        await self._awaitWritten(self._queueWrite())
         counter = 0
         while counter < result_timeout:
             if self.result:
@@ -95,12 +101,12 @@ class UartWriter:
         :return:
 
         :param success_codes: List[ResultValue]
-        :param result_timeout: time to wait on a result in seconds before raising a timeout error. This should be higher than the UART_WRITE_TIMEOUT
+        :param result_timeout: time to wait on a result in seconds, after the packet has been written, before raising a timeout error.
         :return: ResultPacket
         """
         if success_codes is None:
             success_codes = [ResultValue.SUCCESS]
-        UartEventBus.emit(SystemTopics.uartWriteData, self.dataToSend)
+        self._waitWritten(self._queueWrite())
         counter = 0
         while counter < result_timeout:
             if self.result:
@@ -117,41 +123,35 @@ class UartWriter:
         You can await the success of the write. If the write fails, an CrownstoneException will be raised.
         :return:
         """
+        await self._awaitWritten(self._queueWrite())
+        # cleanup the listener(s)
+        self.__del__()
+        return True
 
-        UartEventBus.emit(SystemTopics.uartWriteData, self.dataToSend)
-        counter = 0
-        while counter < 2*UART_WRITE_TIMEOUT:
-            if self.success:
-                # cleanup the listener(s)
-                self.__del__()
-                return True
-
-            await asyncio.sleep(self.interval)
-            counter += self.interval
-
-
-        self._wrapUpFailedWrite()
-    
     def write_sync(self) -> True:
         """
         write_sync will take the data packet you have provided to the constructor and send it over UART.
         This method is blocking. If the write fails, an CrownstoneException will be raised.
         :return:
         """
-
-        UartEventBus.emit(SystemTopics.uartWriteData, self.dataToSend)
-        counter = 0
-        while counter < 2 * UART_WRITE_TIMEOUT:
-            if self.success:
-                # cleanup the listener(s)
-                self.__del__()
-                return True
-
-            time.sleep(self.interval)
-            counter += self.interval
-        self._wrapUpFailedWrite()
-
-
+        self._waitWritten(self._queueWrite())
+        # cleanup the listener(s)
+        self.__del__()
+        return True
+
+    async def _awaitWritten(self, future: Future):
+        # The packet may wait in the write queue for a while, so there is no timeout: the write queue always resolves the future,
+        # when the packet is written, fails to write within UART_WRITE_TIMEOUT, is dropped, or when the queue is stopped.
+        try:
+            await asyncio.wrap_future(future)
+        except Exception as e:
+            self._wrapUpFailedWrite(e)
+
+    def _waitWritten(self, future: Future):
+        try:
+            future.result()
+        except Exception as e:
+            self._wrapUpFailedWrite(e)
 
     def _checkResult(self, success_codes):
         if success_codes == [] or self.result.resultCode in success_codes:
@@ -173,8 +173,7 @@ class UartWriter:
             wait_until_result) + " seconds", 404)
 
 
-    def _wrapUpFailedWrite(self):
-        # we should never arrive here. If the write went wrong, an error should have been thrown by the write method before we get here.
+    def _wrapUpFailedWrite(self, error):
         self.__del__()
-        # TODO: Invalid error type.
-        raise CrownstoneException("WRITE_EXCEPTION", "Write not completed, but no error was thrown.", 500)
+        _LOGGER.error(f"Error during uart write: {error}")
+        raise error
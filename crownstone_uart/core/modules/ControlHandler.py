@@ -12,8 +12,9 @@ from crownstone_core.packets.assetFilter.util.AssetFilterSyncer import AssetFilt
 from crownstone_core.protocol.BluenetTypes import ResultValue
 from crownstone_core.protocol.ControlPackets import ControlPacketsGenerator
 from crownstone_uart.core.UartEventBus import UartEventBus
+from crownstone_uart.core.containerClasses.UartWriteRequest import UartWriteRequest
 from crownstone_uart.core.dataFlowManagers.Collector import Collector
-from crownstone_uart.core.uart.UartTypes import UartTxType, UartMessageType
+from crownstone_uart.core.uart.UartTypes import UartTxType, UartMessageType, UartWritePriority
 from crownstone_uart.core.uart.uartPackets.UartMessagePacket import UartMessagePacket
 from crownstone_uart.core.uart.uartPackets.UartWrapperPacket import UartWrapperPacket
 from crownstone_uart.topics.SystemTopics import SystemTopics
@@ -22,6 +23,9 @@ _LOGGER = logging.getLogger(__name__)
 
 class ControlHandler:
 
+    def __init__(self, eventBus=UartEventBus):
+        self.eventBus = eventBus
+
     async def setFilters(self, filters: List[AssetFilter], masterVersion: int = None) -> int:
         """
         Makes sure the given filters are set at the Crownstone.
@@ -76,7 +80,7 @@ class ControlHandler:
         result = None
         for i in range(0, chunker.getAmountOfChunks()):
             chunk = chunker.getChunk()
-            result = await self._write(ControlPacketsGenerator.getUploadFilterPacket(chunk))
+            result = await self._write(ControlPacketsGenerator.getUploadFilterPacket(chunk), priority=UartWritePriority.BULK)
         return result
 
     async def removeFilter(self, filterId):
@@ -102,9 +106,10 @@ class ControlHandler:
         return await self._write(ControlPacketsGenerator.getCommitFilterChangesPacket(masterVersion, masterCrc))
 
 
-    async def _write(self, controlPacket: [int], successCodes = [ResultValue.SUCCESS, ResultValue.SUCCESS_NO_CHANGE, ResultValue.WAIT_FOR_SUCCESS]) -> [int] or None:
+    async def _write(self, controlPacket: [int], successCodes = [ResultValue.SUCCESS, ResultValue.SUCCESS_NO_CHANGE, ResultValue.WAIT_FOR_SUCCESS], priority = UartWritePriority.NORMAL) -> [int] or None:
         """
         Returns the result payload.
+        :param priority: UartWritePriority of the packet.
         TODO: return result packet.
         TODO: use a ControlPacket as param, instead of int array.
         """
@@ -112,9 +117,9 @@ class ControlHandler:
         uartMessage = UartMessagePacket(UartTxType.CONTROL, controlPacket).serialize()
         uartPacket = UartWrapperPacket(UartMessageType.UART_MESSAGE, uartMessage).serialize()
 
-        resultCollector = Collector(timeout=1, topic=SystemTopics.resultPacket)
+        resultCollector = Collector(timeout=1, topic=SystemTopics.resultPacket, eventBus=self.eventBus)
         # send the message to the Crownstone
-        UartEventBus.emit(SystemTopics.uartWriteData, uartPacket)
+        self.eventBus.emit(SystemTopics.uartWriteData, UartWriteRequest(uartPacket, priority=priority))
 
         # wait for the collectors to fill
         commandResultData = await resultCollector.receive()
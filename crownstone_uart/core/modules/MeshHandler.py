@@ -10,17 +10,21 @@ from crownstone_core.protocol.MeshPackets import MeshMultiSwitchPacket, StoneMul
 from crownstone_core.util.Timestamp import getCorrectedLocalTimestamp
 
 from crownstone_uart.core.containerClasses.MeshResult import MeshResult
+from crownstone_uart.core.containerClasses.UartWriteRequest import UartWriteRequest
 from crownstone_uart.core.dataFlowManagers.BatchCollector import BatchCollector
 from crownstone_uart.core.dataFlowManagers.Collector import Collector
 from crownstone_uart.core.UartEventBus import UartEventBus
 from crownstone_uart.core.uart.uartPackets.UartMessagePacket import UartMessagePacket
-from crownstone_uart.core.uart.UartTypes import UartTxType, UartMessageType
+from crownstone_uart.core.uart.UartTypes import UartTxType, UartMessageType, UartWritePriority
 from crownstone_uart.core.uart.uartPackets.UartWrapperPacket import UartWrapperPacket
 from crownstone_uart.topics.SystemTopics import SystemTopics
 
 
 class MeshHandler:
 
+    def __init__(self, eventBus=UartEventBus):
+        self.eventBus = eventBus
+
     # TODO: make async, wait for uart reply.
     def turn_crownstone_on(self, crownstone_id: int):
         self._switch_crownstone(crownstone_id, SwitchValSpecial.SMART_ON)
@@ -62,8 +66,9 @@ class MeshHandler:
         # finally wrap it in a uart wrapper packet
         uartPacket = UartWrapperPacket(UartMessageType.UART_MESSAGE, uartMessage).serialize()
 
-        # send over uart
-        UartEventBus.emit(SystemTopics.uartWriteData, uartPacket)
+        # send over uart, a newer switch command for the same crownstone makes this one obsolete, so it can be dropped when the write queue is full.
+        # It's sent with high priority, as a user is waiting for the light to go on.
+        self.eventBus.emit(SystemTopics.uartWriteData, UartWriteRequest(uartPacket, idempotent=True, priority=UartWritePriority.HIGH, supersedeKey=("switch", crownstone_id)))
 
 
     async def set_time(self, timestamp = None):
@@ -208,12 +213,12 @@ class MeshHandler:
         uartMessage = UartMessagePacket(UartTxType.CONTROL, controlPacket).serialize()
         uartPacket = UartWrapperPacket(UartMessageType.UART_MESSAGE, uartMessage).serialize()
 
-        resultCollector     = Collector(timeout=2,  topic=SystemTopics.resultPacket)
-        individualCollector = BatchCollector(timeout=15, topic=SystemTopics.meshResultPacket)
-        finalCollector      = Collector(timeout=15, topic=SystemTopics.meshResultFinalPacket)
+        resultCollector     = Collector(timeout=2,  topic=SystemTopics.resultPacket, eventBus=self.eventBus)
+        individualCollector = BatchCollector(timeout=15, topic=SystemTopics.meshResultPacket, eventBus=self.eventBus)
+        finalCollector      = Collector(timeout=15, topic=SystemTopics.meshResultFinalPacket, eventBus=self.eventBus)
 
         # send the message to the Crownstone
-        UartEventBus.emit(SystemTopics.uartWriteData, uartPacket)
+        self.eventBus.emit(SystemTopics.uartWriteData, uartPacket)
 
         # wait for the collectors to fill
         commandResultData = await resultCollector.receive()
@@ -239,10 +244,10 @@ class MeshHandler:
         uartMessage = UartMessagePacket(UartTxType.CONTROL, controlPacket).serialize()
         uartPacket = UartWrapperPacket(UartMessageType.UART_MESSAGE, uartMessage).serialize()
 
-        resultCollector = Collector(timeout=2, topic=SystemTopics.resultPacket)
+        resultCollector = Collector(timeout=2, topic=SystemTopics.resultPacket, eventBus=self.eventBus)
 
         # send the message to the Crownstone
-        UartEventBus.emit(SystemTopics.uartWriteData, uartPacket)
+        self.eventBus.emit(SystemTopics.uartWriteData, uartPacket)
 
         # wait for the collectors to fill
         commandResultData = await resultCollector.receive()
@@ -266,12 +271,12 @@ class MeshHandler:
         uartMessage = UartMessagePacket(UartTxType.CONTROL, controlPacket).serialize()
         uartPacket = UartWrapperPacket(UartMessageType.UART_MESSAGE, uartMessage).serialize()
 
-        resultCollector     = Collector(timeout=2, topic=SystemTopics.resultPacket)
-        individualCollector = BatchCollector(timeout=15, topic=SystemTopics.meshResultPacket)
-        finalCollector      = Collector(timeout=15, topic=SystemTopics.meshResultFinalPacket)
+        resultCollector     = Collector(timeout=2, topic=SystemTopics.resultPacket, eventBus=self.eventBus)
+        individualCollector = BatchCollector(timeout=15, topic=SystemTopics.meshResultPacket, eventBus=self.eventBus)
+        finalCollector      = Collector(timeout=15, topic=SystemTopics.meshResultFinalPacket, eventBus=self.eventBus)
 
         # send the message to the Crownstone
-        UartEventBus.emit(SystemTopics.uartWriteData, uartPacket)
+        self.eventBus.emit(SystemTopics.uartWriteData, uartPacket)
 
         # wait for the collectors to fill
         commandResultData = await resultCollector.receive()
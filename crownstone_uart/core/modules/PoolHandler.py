@@ -0,0 +1,23 @@
+class PoolHandler:
+    """
+    Has the same methods as a handler of CrownstoneUart, like MeshHandler or ControlHandler.
+    Each call is forwarded to that handler of the Crownstone USB in the pool that is least busy at that moment.
+    """
+
+    def __init__(self, pool, handlerName: str, handlerClass):
+        """
+        :param pool:         The CrownstoneUartPool.
+        :param handlerName:  Name of the handler attribute of CrownstoneUart, for example "mesh".
+        :param handlerClass: Class of that handler, for example MeshHandler.
+        """
+        self.pool = pool
+        self.handlerName = handlerName
+        self.handlerClass = handlerClass
+
+    def __getattr__(self, name):
+        if name.startswith("_") or not callable(getattr(self.handlerClass, name, None)):
+            raise AttributeError(f"{self.handlerClass.__name__} has no method {name}")
+
+        def forward(*args, **kwargs):
+            return self.pool._call(self.handlerName, name, args, kwargs)
+        return forward
@@ -14,14 +14,17 @@ from crownstone_uart.topics.SystemTopics import SystemTopics
 
 class StateHandler:
 
+    def __init__(self, eventBus=UartEventBus):
+        self.eventBus = eventBus
+
     async def setPowerZero(self, mW: int):
         controlPacket = ControlStateSetPacket(StateType.POWER_ZERO).loadInt32(mW).serialize()
         uartMessage   = UartMessagePacket(UartTxType.CONTROL, controlPacket).serialize()
         uartPacket    = UartWrapperPacket(UartMessageType.UART_MESSAGE, uartMessage).serialize()
 
-        resultCollector = Collector(timeout=1,  topic=SystemTopics.resultPacket)
+        resultCollector = Collector(timeout=1,  topic=SystemTopics.resultPacket, eventBus=self.eventBus)
         # send the message to the Crownstone
-        UartEventBus.emit(SystemTopics.uartWriteData, uartPacket)
+        self.eventBus.emit(SystemTopics.uartWriteData, uartPacket)
 
         # wait for the collectors to fill
         commandResultData = await resultCollector.receive()
@@ -2,8 +2,9 @@ from crownstone_core.protocol.BlePackets import ControlStateSetPacket, ControlPa
 from crownstone_core.protocol.BluenetTypes import StateType, ControlType
 
 from crownstone_uart.core.UartEventBus import UartEventBus
+from crownstone_uart.core.containerClasses.UartWriteRequest import UartWriteRequest
 from crownstone_uart.core.uart.uartPackets.UartMessagePacket import UartMessagePacket
-from crownstone_uart.core.uart.UartTypes import UartTxType, UartMessageType
+from crownstone_uart.core.uart.UartTypes import UartTxType, UartMessageType, UartWritePriority
 from crownstone_uart.core.uart.uartPackets.UartWrapperPacket import UartWrapperPacket
 from crownstone_uart.core.dataFlowManagers.UartWriter import UartWriter
 from crownstone_uart.topics.SystemTopics import SystemTopics
@@ -13,6 +14,9 @@ from crownstone_core.packets.microapp.MicroappInfoPacket import MicroappInfoPack
 from crownstone_core.packets.microapp.MicroappUploadPacket import MicroappUploadPacket
 
 class UsbDevHandler:
+
+    def __init__(self, eventBus=UartEventBus):
+        self.eventBus = eventBus
     
     def setAdvertising(self, enabled):
         """
@@ -196,7 +200,7 @@ class UsbDevHandler:
         # send over uart
         uartMessage = UartMessagePacket(opCode, payload).serialize()
         uartPacket = UartWrapperPacket(UartMessageType.UART_MESSAGE, uartMessage).serialize()
-        UartEventBus.emit(SystemTopics.uartWriteData, uartPacket)
+        self.eventBus.emit(SystemTopics.uartWriteData, UartWriteRequest(uartPacket, priority=UartWritePriority.BULK))
         
     def remove_microapp(self, index : int) -> bool:
         """
@@ -209,7 +213,7 @@ class UsbDevHandler:
             ControlType.MICROAPP_REMOVE).loadByteArray(packet.serialize()).serialize()
         uartMessage   = UartMessagePacket(UartTxType.CONTROL, controlPacket).serialize()
         uartPacket    = UartWrapperPacket(UartMessageType.UART_MESSAGE, uartMessage).serialize()
-        result = UartWriter(uartPacket).write_sync()
+        result = UartWriter(uartPacket, priority=UartWritePriority.BULK, eventBus=self.eventBus).write_sync()
         return result
 
     def enable_microapp(self, index : int) -> bool:
@@ -225,7 +229,7 @@ class UsbDevHandler:
             ControlType.MICROAPP_ENABLE).loadByteArray(packet.serialize()).serialize()
         uartMessage   = UartMessagePacket(UartTxType.CONTROL, controlPacket).serialize()
         uartPacket    = UartWrapperPacket(UartMessageType.UART_MESSAGE, uartMessage).serialize()
-        result = UartWriter(uartPacket).write_sync()
+        result = UartWriter(uartPacket, priority=UartWritePriority.BULK, eventBus=self.eventBus).write_sync()
         return result
 
     def validate_microapp(self, index : int) -> bool:
@@ -239,7 +243,7 @@ class UsbDevHandler:
             ControlType.MICROAPP_VALIDATE).loadByteArray(packet.serialize()).serialize()
         uartMessage   = UartMessagePacket(UartTxType.CONTROL, controlPacket).serialize()
         uartPacket    = UartWrapperPacket(UartMessageType.UART_MESSAGE, uartMessage).serialize()
-        result = UartWriter(uartPacket).write_sync()
+        result = UartWriter(uartPacket, priority=UartWritePriority.BULK, eventBus=self.eventBus).write_sync()
         return result
 
     def disable_microapp(self, index : int) -> bool:
@@ -253,5 +257,5 @@ class UsbDevHandler:
             ControlType.MICROAPP_DISABLE).loadByteArray(packet.serialize()).serialize()
         uartMessage   = UartMessagePacket(UartTxType.CONTROL, controlPacket).serialize()
         uartPacket    = UartWrapperPacket(UartMessageType.UART_MESSAGE, uartMessage).serialize()
-        result = UartWriter(uartPacket).write_sync()
+        result = UartWriter(uartPacket, priority=UartWritePriority.BULK, eventBus=self.eventBus).write_sync()
         return result
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import sys
+import threading
+
+import serial
+
+from crownstone_uart.core.uart.UartBridgeBase import UartBridgeBase
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UartAsyncBridge(UartBridgeBase):
+    """
+    Alternative to the UartBridge that does not use a reader thread.
+
+    The file descriptor of the serial port is registered with an asyncio event loop, which calls back
+    when there is data. Reading, parsing and emitting of the events are all done on that loop.
+    This requires an event loop that supports add_reader, so it is not available on Windows.
+
+    It can be started and stopped from any thread, like the UartBridge.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, exception_queue, port, baudrate, **kwargs):
+        """
+        :param loop:    Event loop to read the serial port on.
+        :param kwargs: Keyword arguments of the UartBridgeBase: writeChunkMaxSize, options (UartConnectionOptions), dispatchLoop and eventBus.
+        """
+        super().__init__(exception_queue, port, baudrate, **kwargs)
+        self.loop = loop
+        self.readerFd = None
+        self.closedEvent = threading.Event()
+
+    def start(self):
+        self.loop.call_soon_threadsafe(self._start)
+
+    def join(self, timeout=None):
+        self.closedEvent.wait(timeout)
+
+    def stop(self):
+        super().stop()
+        if self.loop.is_closed():
+            self._close()
+        else:
+            self.loop.call_soon_threadsafe(self._close)
+
+    def _start(self):
+        if not self.running:
+            self.closedEvent.set()
+            self.startedEvent.set()
+            return
+
+        try:
+            self.start_serial()
+            # Never block the loop on a read.
+            self.serialController.timeout = 0
+            self.start_write_queue()
+            self.start_read_buffer()
+            self.loop.add_reader(self.serialController.fileno(), self._read)
+        except Exception:
+            self.bridge_exception_queue.put(sys.exc_info())
+            # Also when starting failed after the port was opened.
+            self.loop.run_in_executor(None, self._close_serial)
+            self.startedEvent.set()
+            return
+
+        self.readerFd = self.serialController.fileno()
+        self.started = True
+        self.startedEvent.set()
+        _LOGGER.debug(F"Read starting on serial port.{self.port} {self.running}")
+
+    def _read(self):
+        """
+        Called by the event loop when the serial port has data.
+        """
+        try:
+            bytesFromSerial = self.serialController.read(max(1, self.serialController.in_waiting))
+        except (OSError, serial.SerialException):
+            _LOGGER.info("Connection to USB Failed. Retrying...")
+            self._close()
+            return
+
+        if bytesFromSerial:
+            try:
+                self.readBuffer.addByteArray(bytesFromSerial)
+            except Exception:
+                # Keep reading, like the parser does when a packet fails to decode.
+                _LOGGER.exception("Failed to handle the data read from the serial port")
+
+    def _close(self):
+        """
+        Called on the event loop, or from any thread once the loop is closed.
+        """
+        if self.readerFd is None:
+            if self.loop.is_closed():
+                # Not reading, and can't start anymore.
+                self.closedEvent.set()
+            return
+
+        if not self.loop.is_closed():
+            self.loop.remove_reader(self.readerFd)
+        self.readerFd = None
+
+        # Stopping the write queue joins its thread, and subscribers of connectionClosed may take a while,
+        # like the UartManager setting up a new connection, so keep that off the event loop.
+        if self.loop.is_closed():
+            self._close_serial()
+        else:
+            self.loop.run_in_executor(None, self._close_serial)
+
+    def _close_serial(self):
+        self.close_serial()
+        self.closedEvent.set()
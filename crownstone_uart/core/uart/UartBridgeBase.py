@@ -0,0 +1,166 @@
+import logging
+import threading
+from concurrent.futures import Future
+
+import serial
+
+from crownstone_uart.Constants import UART_READ_TIMEOUT, UART_WRITE_TIMEOUT
+from crownstone_uart.core.UartEventBus import UartEventBus
+from crownstone_uart.core.containerClasses.UartConnectionOptions import UartConnectionOptions
+from crownstone_uart.core.containerClasses.UartWriteRequest import UartWriteRequest
+from crownstone_uart.core.uart.UartParser import UartParser
+from crownstone_uart.core.uart.UartRateLimiter import UartRateLimiter
+from crownstone_uart.core.uart.UartDispatcher import UartDispatcher
+from crownstone_uart.core.uart.UartReadBuffer import UartReadBuffer
+from crownstone_uart.core.uart.UartWriteQueue import UartWriteQueue
+from crownstone_uart.topics.SystemTopics import SystemTopics
+from crownstone_uart.Exceptions import UartBridgeError, UartException
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UartBridgeBase:
+    """
+    Serial connection with a Crownstone dongle: opens the port, writes via a write queue, and parses what is read.
+    How the port is read is left to the subclass: the UartBridge reads it on its own thread, the UartAsyncBridge on an event loop.
+
+    Subclasses implement start() and join(), and set startedEvent once started, failed to start, or stopped.
+    """
+
+    def __init__(self, exception_queue, port, baudrate, *, writeChunkMaxSize=0, options: UartConnectionOptions = None, dispatchLoop=None, eventBus=UartEventBus):
+        self.bridge_exception_queue = exception_queue
+        self.baudrate = baudrate
+        self.port = port
+        self.writeChunkMaxSize = writeChunkMaxSize
+        self.options = options if options is not None else UartConnectionOptions()
+        self.dispatchLoop = dispatchLoop
+        self.eventBus = eventBus
+
+        self.serialController = None
+        self.readBuffer = None
+        self.writeQueue = None
+        self.dispatcher = None
+        # Idempotent packets that were not written when the write queue was stopped, as UartWriteRequest.
+        self.unsentIdempotent = []
+        self.started = False
+        # Set once started, failed to start, or stopped.
+        self.startedEvent = threading.Event()
+
+        self.running = True
+        self.parser = UartParser(self.eventBus)
+        self.eventId = self.eventBus.subscribe(SystemTopics.uartWriteData, self.write_to_uart)
+
+
+    def __del__(self):
+        self.stop()
+
+
+    def stop(self):
+        self.running = False
+        self.eventBus.unsubscribe(self.eventId)
+        self.parser.stop()
+        self.startedEvent.set()
+
+
+    def start_serial(self):
+        _LOGGER.debug(F"UartBridge: Initializing serial on port {self.port} with baudrate {self.baudrate}")
+        try:
+            self.serialController = serial.Serial()
+            self.serialController.port = self.port
+            self.serialController.baudrate = int(self.baudrate)
+            self.serialController.timeout = UART_READ_TIMEOUT
+            self.serialController._write_timeout = UART_WRITE_TIMEOUT
+            self.serialController.open()
+        except OSError or serial.SerialException or KeyboardInterrupt as serial_error:
+            self.stop()
+            _LOGGER.error(serial_error)
+            raise UartException(UartBridgeError.CANNOT_OPEN_SERIAL_CONTROLLER, serial_error) from serial_error
+
+
+    def close_serial(self):
+        """
+        Stop the write queue and dispatcher, close the serial port and emit SystemTopics.connectionClosed.
+        Does nothing when the port was not opened.
+        """
+        if self.serialController is None:
+            return
+        self.stop_write_queue()
+        self.stop_dispatcher()
+        self.serialController.close()
+        self.serialController = None
+        # remove the event listener pointing to the old connection
+        self.eventBus.unsubscribe(self.eventId)
+        self.started = False
+        self.eventBus.emit(SystemTopics.connectionClosed, True)
+
+    def write_to_uart(self, data):
+        """
+        Queue data to be written to the serial port. The result is emitted as
+        SystemTopics.uartWriteSuccess or SystemTopics.uartWriteError.
+
+        :param data: list of uint8, bytes, bytearray or a UartWriteRequest.
+        :return: Future that resolves when the data has been written.
+        """
+        _LOGGER.debug(f"write_to_uart: {data}")
+        if self.writeQueue is not None and self.started:
+            if isinstance(data, UartWriteRequest):
+                try:
+                    data.future = self.writeQueue.write(data.data, data.idempotent, data.priority, data.supersedeKey)
+                except UartException as e:
+                    # Called from an event bus emit, which would only log the exception: pass it on via the future.
+                    data.future = Future()
+                    data.future.set_exception(e)
+                return data.future
+            return self.writeQueue.write(data)
+        else:
+            self.stop()
+
+    def start_read_buffer(self):
+        """
+        Create the read buffer. When dispatching, it emits via the dispatcher, so the subscribers don't run on the reader.
+        """
+        readBufferEventBus = self.eventBus
+        if self.options.dispatchQueueSize > 0:
+            self.dispatcher = UartDispatcher(self.options.dispatchQueueSize, self.dispatchLoop, self.eventBus)
+            self.dispatcher.start()
+            readBufferEventBus = self.dispatcher
+        self.readBuffer = UartReadBuffer(
+            zeroCopy=self.options.zeroCopy,
+            maxFrameSize=self.options.maxFrameSize,
+            batchDelivery=self.options.batchDelivery,
+            eventBus=readBufferEventBus,
+            frameFilter=self.parser.isFrameConsumed,
+        )
+
+    def stop_dispatcher(self):
+        if self.dispatcher is not None:
+            self.dispatcher.stop()
+
+    def start_write_queue(self):
+        rateLimiter = None
+        if self.options.maxWritePacketsPerSecond is not None or self.options.maxWriteBytesPerSecond is not None:
+            rateLimiter = UartRateLimiter(
+                maxPacketsPerSecond=self.options.maxWritePacketsPerSecond,
+                maxBytesPerSecond=self.options.maxWriteBytesPerSecond,
+                adaptive=self.options.adaptiveWriteRate,
+                eventBus=self.eventBus,
+            )
+        self.writeQueue = UartWriteQueue(
+            self.serialController,
+            writeChunkMaxSize=self.writeChunkMaxSize,
+            maxQueueSize=self.options.maxWriteQueueSize,
+            queueFullPolicy=self.options.writeQueueFullPolicy,
+            rateLimiter=rateLimiter,
+            eventBus=self.eventBus,
+        )
+        self.writeQueue.start()
+
+    def stop_write_queue(self):
+        if self.writeQueue is not None:
+            self.writeQueue.stop()
+            if self.writeQueue.rateLimiter is not None:
+                self.writeQueue.rateLimiter.stop()
+            if self.writeQueue is not threading.current_thread():
+                self.writeQueue.join()
+                self.unsentIdempotent = self.writeQueue.unsentIdempotent
+            self.writeQueue = None
@@ -0,0 +1,109 @@
+import collections
+import logging
+import threading
+
+from crownstone_uart.core.UartEventBus import UartEventBus
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UartDispatcher:
+    """
+    Takes the place of the event bus of the UartReadBuffer, so that the reader only decodes frames,
+    while the subscribers of the received packets run on the dispatcher thread, or on the given event loop.
+    A slow subscriber then no longer holds up reading the serial port.
+
+    Received packets wait in a bounded queue, with the reader as only producer and the dispatcher as only consumer.
+    When the queue is full, newly received packets are dropped and counted.
+    """
+
+    def __init__(self, maxQueueSize, loop=None, eventBus=UartEventBus):
+        """
+        :param maxQueueSize: Max number of received packets waiting to be emitted.
+        :param loop:         Event loop to emit on, via call_soon_threadsafe. None to emit from a dispatcher thread.
+        :param eventBus:     EventBus to emit on.
+        """
+        self.maxQueueSize = maxQueueSize
+        self.loop = loop
+        self.eventBus = eventBus
+        self.running = True
+
+        # Items are (topic, data). Append and popleft of a deque are thread safe, which is enough for one producer and one consumer.
+        self.queue = collections.deque()
+        self.event = threading.Event()
+        self.drainScheduled = False
+        self.overflowing = False
+        self.thread = None
+
+        # Metrics
+        self.maxQueueDepth = 0
+        self.dispatchedCount = 0
+        self.droppedCount = 0
+
+    def start(self):
+        if self.loop is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """
+        Stop after emitting the packets that are already queued.
+        """
+        self.running = False
+        self.event.set()
+
+    def emit(self, topic, data=None):
+        """
+        Called from the reader: queue the data to be emitted on the event bus.
+        """
+        if len(self.queue) >= self.maxQueueSize:
+            self.droppedCount += 1
+            if not self.overflowing:
+                self.overflowing = True
+                _LOGGER.warning("Dispatch queue is full, received packets are dropped. Subscribers are too slow?")
+            return
+
+        self.queue.append((topic, data))
+        self.maxQueueDepth = max(self.maxQueueDepth, len(self.queue))
+
+        if self.loop is None:
+            self.event.set()
+        elif not self.drainScheduled:
+            self.drainScheduled = True
+            try:
+                self.loop.call_soon_threadsafe(self._drain)
+            except RuntimeError:
+                # The loop is closed.
+                self.queue.clear()
+
+    def get_metrics(self) -> dict:
+        """
+        :return: dict with queueDepth, maxQueueDepth, maxQueueSize, dispatched and dropped (number of received packets).
+        """
+        return {
+            "queueDepth":    len(self.queue),
+            "maxQueueDepth": self.maxQueueDepth,
+            "maxQueueSize":  self.maxQueueSize,
+            "dispatched":    self.dispatchedCount,
+            "dropped":       self.droppedCount,
+        }
+
+    def _run(self):
+        while True:
+            self.event.wait()
+            self.event.clear()
+            self._drain()
+            if not self.running:
+                return
+
+    def _drain(self):
+        # Clear the flag first: anything that is queued from now on is either emitted by this drain, or schedules a new one.
+        self.drainScheduled = False
+        while self.queue:
+            topic, data = self.queue.popleft()
+            try:
+                self.eventBus.emit(topic, data)
+            except Exception:
+                _LOGGER.exception(f"Error in subscriber of {topic}")
+            self.dispatchedCount += 1
+        self.overflowing = False
@@ -0,0 +1,155 @@
+import collections
+import logging
+import math
+import threading
+import time
+
+from crownstone_uart.core.UartEventBus import UartEventBus
+from crownstone_uart.core.containerClasses.UartWriteRequest import UartWriteRequest
+from crownstone_uart.core.uart.UartTypes import UartTxType, UartMessageType, UartWritePriority
+from crownstone_uart.core.uart.uartPackets.UartCommandHeartbeatPacket import UartCommandHeartbeatPacket
+from crownstone_uart.core.uart.uartPackets.UartMessagePacket import UartMessagePacket
+from crownstone_uart.core.uart.uartPackets.UartWrapperPacket import UartWrapperPacket
+from crownstone_uart.topics.SystemTopics import SystemTopics
+from crownstone_uart.Exceptions import UartException
+
+_LOGGER = logging.getLogger(__name__)
+
+# Number of most recent round trip times that are kept for the metrics.
+RTT_HISTORY_SIZE = 100
+
+# Upper bounds in seconds of the round trip time histogram buckets. Slower replies go in the last bucket: inf.
+RTT_HISTOGRAM_BOUNDS = [0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0]
+
+
+class UartHeartbeatMonitor(threading.Thread):
+    """
+    Checks whether the Crownstone USB is still responsive, by writing a heartbeat every interval and waiting for the reply.
+
+    A heartbeat that is not replied to within the interval counts as missed.
+    After maxMissed missed heartbeats in a row, onFailure is called from this thread, and the monitor stops.
+    """
+
+    def __init__(self, interval, maxMissed=3, onFailure=None, eventBus=UartEventBus):
+        """
+        :param interval:  Time in seconds between heartbeats, also the time to wait for a reply.
+        :param maxMissed: Number of heartbeats in a row that may be missed before the connection is considered lost.
+        :param onFailure: Function without arguments, called when the connection is considered lost.
+        :param eventBus:  EventBus of the connection to monitor.
+        """
+        self.eventBus = eventBus
+        self.interval = interval
+        self.maxMissed = maxMissed
+        self.onFailure = onFailure
+        self.running = True
+
+        # Tell the Crownstone to consider us gone when it doesn't receive a heartbeat for this many seconds.
+        self.timeout = max(1, math.ceil(interval * (maxMissed + 1)))
+
+        self.lock = threading.Lock()
+        self.stopEvent = threading.Event()
+        self.replyEvent = threading.Event()
+        self.sentTimestamp = None
+
+        # Metrics
+        self.sentCount = 0
+        self.missedCount = 0
+        self.consecutiveMissedCount = 0
+        self.roundTripTimes = collections.deque(maxlen=RTT_HISTORY_SIZE)
+
+        self.eventId = self.eventBus.subscribe(SystemTopics.uartHeartbeat, self._handleReply)
+
+        threading.Thread.__init__(self, daemon=True)
+
+    def stop(self):
+        self.running = False
+        self.eventBus.unsubscribe(self.eventId)
+        self.stopEvent.set()
+        self.replyEvent.set()
+
+    def run(self):
+        while self.running:
+            startTimestamp = time.monotonic()
+            with self.lock:
+                self.replyEvent.clear()
+                self.sentTimestamp = startTimestamp
+                self.sentCount += 1
+            self._writeHeartbeat()
+
+            replied = self.replyEvent.wait(self.interval)
+            if not self.running:
+                break
+
+            if replied:
+                self.consecutiveMissedCount = 0
+            else:
+                with self.lock:
+                    # A reply that arrives later is ignored.
+                    self.sentTimestamp = None
+                    self.missedCount += 1
+                    self.consecutiveMissedCount += 1
+                _LOGGER.debug(f"Missed heartbeat reply ({self.consecutiveMissedCount} in a row)")
+
+                if self.consecutiveMissedCount >= self.maxMissed:
+                    _LOGGER.warning(f"No reply to {self.consecutiveMissedCount} heartbeats, the connection is considered lost.")
+                    self.stop()
+                    if self.onFailure is not None:
+                        self.onFailure()
+                    break
+
+            remainingTime = self.interval - (time.monotonic() - startTimestamp)
+            if remainingTime > 0:
+                self.stopEvent.wait(remainingTime)
+
+    def get_metrics(self) -> dict:
+        """
+        :return: dict with:
+            sent, missed:       number of heartbeats that were sent, and of which no reply was received in time.
+            consecutiveMissed:  number of heartbeats that were missed since the last reply.
+            lastRoundTripTime, minRoundTripTime, averageRoundTripTime, maxRoundTripTime: in seconds, of the last RTT_HISTORY_SIZE replies.
+                                None when no reply was received yet.
+            histogram:          dict with the upper bound of each bucket in seconds as key, and the number of the last
+                                RTT_HISTORY_SIZE replies that fall in that bucket as value.
+        """
+        with self.lock:
+            roundTripTimes = list(self.roundTripTimes)
+            metrics = {
+                "sent":              self.sentCount,
+                "missed":            self.missedCount,
+                "consecutiveMissed": self.consecutiveMissedCount,
+            }
+
+        histogram = {bound: 0 for bound in RTT_HISTOGRAM_BOUNDS}
+        histogram[math.inf] = 0
+        for roundTripTime in roundTripTimes:
+            for bound in histogram:
+                if roundTripTime <= bound:
+                    histogram[bound] += 1
+                    break
+
+        hasReplies = len(roundTripTimes) > 0
+        metrics["lastRoundTripTime"]    = roundTripTimes[-1] if hasReplies else None
+        metrics["minRoundTripTime"]     = min(roundTripTimes) if hasReplies else None
+        metrics["averageRoundTripTime"] = sum(roundTripTimes) / len(roundTripTimes) if hasReplies else None
+        metrics["maxRoundTripTime"]     = max(roundTripTimes) if hasReplies else None
+        metrics["histogram"]            = histogram
+        return metrics
+
+    def _writeHeartbeat(self):
+        heartbeatPacket = UartCommandHeartbeatPacket(self.timeout).serialize()
+        uartMessage = UartMessagePacket(UartTxType.HEARTBEAT, heartbeatPacket).serialize()
+        uartPacket = UartWrapperPacket(UartMessageType.UART_MESSAGE, uartMessage).serialize()
+        try:
+            # Idempotent: it may be dropped from a full queue for the next heartbeat.
+            self.eventBus.emit(SystemTopics.uartWriteData, UartWriteRequest(uartPacket, idempotent=True, priority=UartWritePriority.HIGH, supersedeKey="heartbeat"))
+        except UartException as e:
+            # For example when the write queue is full. The heartbeat will be missed.
+            _LOGGER.debug(f"Could not write heartbeat: {e}")
+
+    def _handleReply(self, data=None):
+        with self.lock:
+            if self.sentTimestamp is None:
+                return
+            self.roundTripTimes.append(time.monotonic() - self.sentTimestamp)
+            self.sentTimestamp = None
+            self.replyEvent.set()
@@ -1,8 +1,8 @@
 import logging
 import threading
 import time
-import sys
 import queue
+from concurrent.futures import Future
 
 from crownstone_core.protocol.BlePackets import ControlPacket
 from crownstone_core.protocol.BluenetTypes import ControlType
@@ -13,9 +13,14 @@ from crownstone_uart.core.uart.uartPackets.UartCrownstoneHelloPacket import Uart
 from crownstone_uart.core.uart.uartPackets.UartMessagePacket import UartMessagePacket
 
 from crownstone_uart.core.UartEventBus import UartEventBus
+from crownstone_uart.core.containerClasses.UartConnectionOptions import UartConnectionOptions
 from crownstone_uart.core.uart.uartPackets.UartWrapperPacket import UartWrapperPacket
 from crownstone_uart.core.uart.UartTypes import UartTxType, UartMessageType
 from crownstone_uart.core.uart.UartBridge import UartBridge
+from crownstone_uart.core.uart.UartAsyncBridge import UartAsyncBridge
+from crownstone_uart.core.uart.UartPortCache import UartPortCache
+from crownstone_uart.core.uart.UartPortProbe import UartPortProbe
+from crownstone_uart.core.uart.UartHeartbeatMonitor import UartHeartbeatMonitor
 
 from crownstone_uart.topics.UartTopics import UartTopics
 from crownstone_uart.topics.SystemTopics import SystemTopics
@@ -26,20 +31,36 @@ from serial.tools import list_ports
 
 _LOGGER = logging.getLogger(__name__)
 
+# Delay before the first attempt to reconnect, doubled after each failed attempt, up to the max.
+RECONNECT_INITIAL_DELAY = 0.05
+RECONNECT_MAX_DELAY = 2.0
+
 class UartManager(threading.Thread):
 
-    def __init__(self, exception_queue):
+    def __init__(self, eventBus=UartEventBus):
+        self.eventBus = eventBus
         self.port = None     # Port configured by user.
         self.baudRate = 230400
         self.writeChunkMaxSize = 0
-        self.manager_exception_queue = exception_queue
+        self.options = UartConnectionOptions()
+        self.portCache = None
+        self.dispatchLoop = None   # When set, the received packets are dispatched on this event loop.
+        self.loop = None     # When set, the UartAsyncBridge is used on this event loop.
         self.running = True
         self._availablePorts = list(list_ports.comports())
+        self._cachedPortAvailable = False
         self._attemptingIndex = 0
         self._uartBridge = None
+        self._heartbeatMonitor = None
         self.ready = False
 
-        self.eventId = UartEventBus.subscribe(SystemTopics.connectionClosed, self.resetEvent)
+        # Wakes up the thread when the connection is lost, or when stopped.
+        self.supervisorEvent = threading.Event()
+        # Resolved with True once connected for the first time, with False when stopped before that,
+        # or with the exception that stopped the initialization.
+        self.setupFuture = Future()
+        self.setupLock = threading.Lock()
+        self.eventId = self.eventBus.subscribe(SystemTopics.connectionClosed, self.resetEvent)
 
         self.custom_port_set = False
 
@@ -48,39 +69,114 @@ class UartManager(threading.Thread):
     def __del__(self):
         self.stop()
 
-    def config(self, port, baudRate = 230400, writeChunkMaxSize=0):
+    def config(self, port, baudRate = 230400, writeChunkMaxSize=0, options: UartConnectionOptions = None, *, loop=None, dispatchLoop=None):
         if port is not None:
             self.custom_port_set = True
         self.port            = port
         self.baudRate        = baudRate
         self.writeChunkMaxSize = writeChunkMaxSize
+        self.options         = options if options is not None else UartConnectionOptions()
+        self.portCache       = UartPortCache(self.options.portCacheFile) if self.options.portCacheFile is not None else None
+        self.loop            = loop
+        self.dispatchLoop    = dispatchLoop
 
     def run(self):
         try:
             self.initialize()
-        except (UartException, BaseException):
-            self.manager_exception_queue.put(sys.exc_info())
+        except (UartException, BaseException) as e:
+            self._resolveSetup(exception=e)
+            return
+
+        # Supervise the connection.
+        while self.running:
+            self.supervisorEvent.wait()
+            self.supervisorEvent.clear()
+            if self.running and not self.ready:
+                self.reconnect()
 
     def stop(self):
         self.running = False
-        UartEventBus.unsubscribe(self.eventId)
+        self.eventBus.unsubscribe(self.eventId)
+        self.supervisorEvent.set()
+        self._resolveSetup(False)
+        self._stopHeartbeat()
         if self._uartBridge is not None:
             self._uartBridge.stop()
 
+    def _resolveSetup(self, result=None, exception=None):
+        # The future can only be resolved once, but the connection is set up again after reconnecting.
+        with self.setupLock:
+            if self.setupFuture.done():
+                return
+            if exception is not None:
+                self.setupFuture.set_exception(exception)
+            else:
+                self.setupFuture.set_result(result)
+
     def resetEvent(self, eventData=None):
+        # This is called from the thread of the closed connection, so leave the reconnecting to our own thread.
         if self.ready:
+            self.ready = False
+            self.supervisorEvent.set()
+
+    def _startHeartbeat(self):
+        self._stopHeartbeat()
+        if self.options.heartbeatInterval is not None:
+            self._heartbeatMonitor = UartHeartbeatMonitor(self.options.heartbeatInterval, self.options.heartbeatMaxMissed, self._handleHeartbeatFailure, self.eventBus)
+            self._heartbeatMonitor.start()
+
+    def _stopHeartbeat(self):
+        if self._heartbeatMonitor is not None:
+            self._heartbeatMonitor.stop()
+            self._heartbeatMonitor = None
+
+    def _handleHeartbeatFailure(self):
+        # The serial port may still be open, while the dongle is stuck, so the bridge won't notice.
+        self.resetEvent()
+
+    def reconnect(self):
+        """
+        Reconnect after the connection was lost.
+
+        First the previous port is reopened, with exponential backoff, since the dongle most likely comes back on the same port.
+        After reconnectAttempts failures, all ports are scanned again.
+        """
+        previousPort = self.port
+        unsentIdempotent = []
+        self._stopHeartbeat()
+        if self._uartBridge is not None:
             self._uartBridge.stop()
-            while self._uartBridge.running:
-                time.sleep(0.1)
-            self.reset()
+            self._uartBridge.join()
+            unsentIdempotent = self._uartBridge.unsentIdempotent
 
-            self.ready = False
-            self.initialize()
+        delay = RECONNECT_INITIAL_DELAY
+        attempts = 0
+        while self.running and not self.ready:
+            try:
+                if previousPort is not None and attempts < self.options.reconnectAttempts:
+                    _LOGGER.info(f"Reconnecting to {previousPort}, attempt {attempts + 1}")
+                    self.setupConnection(previousPort)
+                else:
+                    _LOGGER.info("Reconnecting: scanning all ports")
+                    self.reset()
+                    self.initialize()
+            except Exception as e:
+                _LOGGER.debug(f"Reconnect failed: {e}")
+
+            if not self.ready:
+                attempts += 1
+                self.supervisorEvent.wait(delay)
+                self.supervisorEvent.clear()
+                delay = min(2 * delay, RECONNECT_MAX_DELAY)
+
+        if self.ready and self.options.replayIdempotent:
+            for writeRequest in unsentIdempotent:
+                self.eventBus.emit(SystemTopics.uartWriteData, writeRequest)
 
     def reset(self):
         if self.running:
             self._attemptingIndex = 0
-            self._availablePorts = list(list_ports.comports())
+            self._availablePorts = self._getAvailablePorts()
             self._uartBridge = None
             self.port = None
 
@@ -88,17 +184,51 @@ class UartManager(threading.Thread):
         controlPacket = ControlPacket(ControlType.UART_MESSAGE).loadString(string).serialize()
         uartMessage   = UartMessagePacket(UartTxType.CONTROL, controlPacket).serialize()
         uartPacket    = UartWrapperPacket(UartMessageType.UART_MESSAGE, uartMessage).serialize()
-        UartEventBus.emit(SystemTopics.uartWriteData, uartPacket)
+        self.eventBus.emit(SystemTopics.uartWriteData, uartPacket)
 
     def writeHello(self):
         helloPacket = UartCommandHelloPacket().serialize()
         uartMessage = UartMessagePacket(UartTxType.HELLO, helloPacket).serialize()
         uartPacket = UartWrapperPacket(UartMessageType.UART_MESSAGE, uartMessage).serialize()
-        UartEventBus.emit(SystemTopics.uartWriteData, uartPacket)
+        self.eventBus.emit(SystemTopics.uartWriteData, uartPacket)
+
+    def _getAvailablePorts(self):
+        """
+        Get the ports to try, the port of the last connection first.
+        USB ports of which the vendor ID doesn't match that of a Crownstone USB are skipped, unless that leaves no ports at all.
+        """
+        ports = list(list_ports.comports())
+        if self.custom_port_set:
+            return ports
+
+        if self.options.usbVendorIds is not None:
+            # Ports that are not USB don't have a vendor ID, but can still be a Crownstone, for example on a dev board.
+            candidatePorts = [port for port in ports if port.vid is None or port.vid in self.options.usbVendorIds]
+            if len(candidatePorts) > 0:
+                ports = candidatePorts
+
+        self._cachedPortAvailable = False
+        if self.portCache is not None:
+            cachedPort = self.portCache.load()
+            if cachedPort is not None:
+                # Stable sort, so only the cached port moves to the front.
+                ports.sort(key=lambda port: not UartPortCache.matches(cachedPort, port))
+                self._cachedPortAvailable = len(ports) > 0 and UartPortCache.matches(cachedPort, ports[0])
+        return ports
+
+    def _storePort(self, port):
+        if self.portCache is None:
+            return
+        for portInfo in self._availablePorts:
+            if portInfo.device == port:
+                self.portCache.store(portInfo)
+                return
 
     def initialize(self):
+        self._availablePorts = self._getAvailablePorts()
         if not self.custom_port_set:
-            _LOGGER.warning(F"By not providing a specific port to find the Crownstone dongle, we will try to connect and handshake with all available ports one by one until we find the dongle."
+            _LOGGER.warning(F"By not providing a specific port to find the Crownstone dongle, we will try to connect and handshake with all available ports "
+                            F"{'at the same time' if self.options.concurrentDiscovery else 'one by one'} until we find the dongle."
                             F"\nPorts that will be checked are:"
                             F"\n{[port.device for port in self._availablePorts]}")
 
@@ -130,7 +260,9 @@ class UartManager(threading.Thread):
 
 
             if self.port is None:
-                if self._attemptingIndex >= len(self._availablePorts): # this also catches len(self._availablePorts) == 0
+                if self.options.concurrentDiscovery:
+                    self._discoverConcurrently()
+                elif self._attemptingIndex >= len(self._availablePorts): # this also catches len(self._availablePorts) == 0
                     _LOGGER.warning("No Crownstone USB connected? Retrying...")
                     time.sleep(1)
                     self.reset()
@@ -138,6 +270,24 @@ class UartManager(threading.Thread):
                     self._attemptConnection(self._attemptingIndex)
 
 
+    def _discoverConcurrently(self):
+        ports = [port.device for port in self._availablePorts]
+        foundPort = None
+        if self._cachedPortAvailable:
+            # Most likely, the dongle is still on the same port, so don't bother the other ports.
+            foundPort = UartPortProbe(ports[0:1], self.baudRate).probe()
+            ports = ports[1:]
+        if foundPort is None and len(ports) > 0:
+            foundPort = UartPortProbe(ports, self.baudRate).probe()
+
+        if foundPort is None:
+            _LOGGER.warning("No Crownstone USB connected? Retrying...")
+            time.sleep(1)
+            self.reset()
+        else:
+            # The probe already did the handshake.
+            self.setupConnection(foundPort, performHandshake=False)
+
     def _attemptConnection(self, index, handshake=True):
         attemptingPort = self._availablePorts[index]
         self.setupConnection(attemptingPort.device, handshake)
@@ -146,20 +296,30 @@ class UartManager(threading.Thread):
     def setupConnection(self, port, performHandshake=True):
         _LOGGER.debug(F"Setting up connection... port={port} baudRate={self.baudRate} performHandshake={performHandshake}")
         bridge_exception_queue = queue.Queue()
-        self._uartBridge = UartBridge(bridge_exception_queue, port, self.baudRate, self.writeChunkMaxSize)
+        bridgeOptions = dict(
+            writeChunkMaxSize=self.writeChunkMaxSize,
+            options=self.options,
+            dispatchLoop=self.dispatchLoop,
+            eventBus=self.eventBus,
+        )
+        if self.loop is not None:
+            self._uartBridge = UartAsyncBridge(self.loop, bridge_exception_queue, port, self.baudRate, **bridgeOptions)
+        else:
+            self._uartBridge = UartBridge(bridge_exception_queue, port, self.baudRate, **bridgeOptions)
         self._uartBridge.start()
 
         def initialize_bridge():
             # handle exceptions that happen in thread while initializing
-            while not self._uartBridge.started and self.running:
-                try:
-                    exception, exception_value, trace = bridge_exception_queue.get(block=False)
-                    self._uartBridge.join()
-                    raise exception(exception_value)
-                except queue.Empty:
-                    pass
-                    
-                time.sleep(0.1)
+            self._uartBridge.startedEvent.wait()
+            if not self._uartBridge.started:
+                # Failed or stopped: wait for the bridge to finish, so that its exception is queued.
+                self._uartBridge.join()
+            try:
+                exception, exception_value, trace = bridge_exception_queue.get(block=False)
+                self._uartBridge.join()
+                raise exception_value.with_traceback(trace)
+            except queue.Empty:
+                pass
         
         # attempt serial connection with the dongle
         initialize_bridge()
@@ -168,7 +328,7 @@ class UartManager(threading.Thread):
         handshake_succesfull = True
 
         if performHandshake:
-            collector = Collector(timeout=0.25, topic=UartTopics.hello)
+            collector = Collector(timeout=0.25, topic=UartTopics.hello, eventBus=self.eventBus)
             self.writeHello()
             reply = collector.receive_sync()
 
@@ -192,10 +352,42 @@ class UartManager(threading.Thread):
         else:
             _LOGGER.info("Connection established to {}".format(port))
             self.port = port
+            self._storePort(port)
             self.ready = True
-            UartEventBus.emit(SystemTopics.connectionEstablished)
+            self._startHeartbeat()
+            self.eventBus.emit(SystemTopics.connectionEstablished)
+            self._resolveSetup(True)
 
 
 
     def is_ready(self) -> bool:
         return self.ready
+
+    def get_write_queue_metrics(self):
+        """
+        :return: metrics of the write queue of the current connection, see UartWriteQueue.get_metrics(). None when not connected.
+        """
+        bridge = self._uartBridge
+        writeQueue = bridge.writeQueue if bridge is not None else None
+        if writeQueue is None:
+            return None
+        return writeQueue.get_metrics()
+
+    def get_heartbeat_metrics(self):
+        """
+        :return: metrics of the heartbeat monitor of the current connection, see UartHeartbeatMonitor.get_metrics(). None when not monitored.
+        """
+        heartbeatMonitor = self._heartbeatMonitor
+        if heartbeatMonitor is None:
+            return None
+        return heartbeatMonitor.get_metrics()
+
+    def get_dispatch_metrics(self):
+        """
+        :return: metrics of the dispatcher of the current connection, see UartDispatcher.get_metrics(). None when not connected, or not dispatching.
+        """
+        bridge = self._uartBridge
+        dispatcher = bridge.dispatcher if bridge is not None else None
+        if dispatcher is None:
+            return None
+        return dispatcher.get_metrics()
@@ -1,5 +1,6 @@
 import datetime
 import logging
+from typing import List
 
 from crownstone_core.Exceptions import CrownstoneException
 from crownstone_core.packets.ResultPacket import ResultPacket
@@ -10,7 +11,7 @@ from crownstone_core.util.Conversion import Conversion
 from crownstone_uart.core.uart.uartPackets.AssetIdReport import AssetIdReport
 from crownstone_uart.core.uart.uartPackets.AssetMacReport import AssetMacReport
 from crownstone_uart.core.UartEventBus import UartEventBus
-from crownstone_uart.core.uart.UartTypes import UartRxType, UartMessageType
+from crownstone_uart.core.uart.UartTypes import UartRxType, UartMessageType, UartSampleFormat
 from crownstone_uart.core.uart.uartPackets.AdcConfigPacket import AdcConfigPacket
 from crownstone_uart.core.uart.uartPackets.CurrentSamplesPacket import CurrentSamplesPacket
 from crownstone_uart.core.uart.uartPackets.PowerCalculationPacket import PowerCalculationPacket
@@ -26,21 +27,235 @@ from crownstone_uart.topics.UartTopics import UartTopics
 
 _LOGGER = logging.getLogger(__name__)
 
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+# Topics on which every received packet or message is emitted, before it is decoded. The parser itself subscribes to each of them once.
+RAW_TOPICS = [
+    SystemTopics.uartNewPackage,
+    SystemTopics.uartNewMessage,
+    SystemTopics.uartNewPackageBatch,
+    SystemTopics.uartNewMessageBatch,
+]
+
+
+def _logReceived(name):
+    def decode(payload):
+        _LOGGER.debug(f"Received {name}")
+    return decode
+
+def _decodeUartMessage(payload):
+    stringResult = ""
+    for byte in payload:
+        stringResult += chr(byte)
+    return {"string": stringResult, "data": payload}
+
+def _decodeOwnServiceData(payload):
+    # service data type + device type + data type + service data (15b)
+    serviceData = ServiceData(payload)
+    serviceData.parse()
+    return serviceData.payload
+
+def _decodeMeshServiceData(payload):
+    # data type + service data (15b)
+    result = parseOpcode7(payload)
+    _LOGGER.debug(f"Received service data: {result}")
+    if hasattr(result, "crownstoneId"):
+        return (result.crownstoneId, result)
+    return None
+
+def _decodeMeshResult(payload):
+    if len(payload) > 1:
+        return [payload[0], ResultPacket(payload[1:])]
+    return None
+
+def _decodeLog(payload):
+    _LOGGER.debug(f"Received binary log: {payload}")
+    return UartLogPacket(payload)
+
+def _decodeLogArray(payload):
+    _LOGGER.debug(f"Received binary log array: {payload}")
+    return UartLogArrayPacket(payload)
+
+def _decodeAssetMacReport(payload):
+    _LOGGER.debug(f"Received ASSET_MAC_RSSI_REPORT: {payload}")
+    return AssetMacReport(payload)
+
+def _decodeAssetIdReport(payload):
+    _LOGGER.debug(f"Received ASSET_ID_RSSI_REPORT: {payload}")
+    return AssetIdReport(payload)
+
+def _decodeMacAddress(payload):
+    addr = Conversion.uint8_array_to_address(payload)
+    if addr == "":
+        _LOGGER.warning(f"invalid address: {payload}")
+        return None
+    return addr
+
+def _printAsciiLog(payload):
+    timestamp = datetime.datetime.now()
+    stringResult = ""
+    for byte in payload:
+        if byte < 128:
+            stringResult += chr(byte)
+    logStr = f"ASCII LOG: [{timestamp.strftime(TIMESTAMP_FORMAT)}] {stringResult}"
+    print(logStr.rstrip())
+
+
+# For each opcode: (decoder, topic, acceptsBuffer), see register_opcode_handler().
+# The dict is replaced on every change, so the parsers can use it from other threads without a lock.
+OPCODE_HANDLERS = {
+    UartRxType.HELLO:                           (UartCrownstoneHelloPacket,                                   UartTopics.hello,                       False),
+    UartRxType.SESSION_NONCE:                   (_logReceived("SESSION_NONCE"),                               None,                                   False),
+    UartRxType.HEARTBEAT:                       (lambda payload: True,                                        SystemTopics.uartHeartbeat,             False),
+    UartRxType.STATUS:                          (_logReceived("STATUS"),                                      None,                                   False),
+    UartRxType.RESULT_PACKET:                   (ResultPacket,                                                SystemTopics.resultPacket,              False),
+
+    # Error replies
+    UartRxType.ERR_REPLY_PARSING_FAILED:        (_logReceived("ERR_REPLY_PARSING_FAILED"),                    None,                                   False),
+    UartRxType.ERR_REPLY_STATUS:                (_logReceived("ERR_REPLY_STATUS"),                            None,                                   False),
+    UartRxType.ERR_REPLY_SESSION_NONCE_MISSING: (_logReceived("ERR_REPLY_SESSION_NONCE_MISSING"),             None,                                   False),
+    UartRxType.ERR_REPLY_DECRYPTION_FAILED:     (_logReceived("ERR_REPLY_DECRYPTION_FAILED"),                 None,                                   False),
+
+    # Events
+    UartRxType.UART_MESSAGE:                    (_decodeUartMessage,                                          UartTopics.uartMessage,                 True),
+    UartRxType.SESSION_NONCE_MISSING:           (_logReceived("SESSION_NONCE_MISSING"),                       None,                                   False),
+    UartRxType.OWN_SERVICE_DATA:                (_decodeOwnServiceData,                                       DevTopics.newServiceData,               False),
+    UartRxType.PRESENCE_CHANGE:                 (None,                                                        None,                                   False),
+    UartRxType.FACTORY_RESET:                   (None,                                                        None,                                   False),
+    UartRxType.BOOTED:                          (_logReceived("BOOTED"),                                      None,                                   False),
+    UartRxType.HUB_DATA:                        (None,                                                        None,                                   False),
+    UartRxType.MESH_SERVICE_DATA:               (_decodeMeshServiceData,                                      SystemTopics.stateUpdate,               False),
+    UartRxType.EXTERNAL_STATE_PART_0:           (None,                                                        None,                                   False),
+    UartRxType.EXTERNAL_STATE_PART_1:           (None,                                                        None,                                   False),
+    UartRxType.MESH_RESULT:                     (_decodeMeshResult,                                           SystemTopics.meshResultPacket,          False),
+    UartRxType.MESH_ACK_ALL_RESULT:             (ResultPacket,                                                SystemTopics.meshResultFinalPacket,     False),
+    # For now, you can subscribe to SystemTopics.uartNewMessage
+    UartRxType.RSSI_PING_MESSAGE:               (None,                                                        None,                                   False),
+    UartRxType.LOG:                             (_decodeLog,                                                  UartTopics.log,                         False),
+    UartRxType.LOG_ARRAY:                       (_decodeLogArray,                                             UartTopics.logArray,                    False),
+
+    # Asset filter events
+    UartRxType.ASSET_MAC_RSSI_REPORT:           (_decodeAssetMacReport,                                       UartTopics.assetTrackingReport,         False),
+    UartRxType.ASSET_ID_RSSI_REPORT:            (_decodeAssetIdReport,                                        UartTopics.assetIdReport,               False),
+
+    # Developer events
+    UartRxType.INTERNAL_EVENT:                  (None,                                                        None,                                   False),
+    UartRxType.MESH_CMD_TIME:                   (None,                                                        None,                                   False),
+    UartRxType.MESH_PROFILE_LOCATION:           (None,                                                        None,                                   False),
+    UartRxType.MESH_SET_BEHAVIOUR_SETTINGS:     (None,                                                        None,                                   False),
+    UartRxType.MESH_TRACKED_DEVICE_REGISTER:    (None,                                                        None,                                   False),
+    UartRxType.MESH_TRACKED_DEVICE_TOKEN:       (None,                                                        None,                                   False),
+    UartRxType.MESH_SYNC_REQUEST:               (None,                                                        None,                                   False),
+    UartRxType.MESH_TRACKED_DEVICE_HEARTBEAT:   (None,                                                        None,                                   False),
+
+    # Debug build events
+    UartRxType.ADVERTISING_ENABLED:             (None,                                                        None,                                   False),
+    UartRxType.MESH_ENABLED:                    (None,                                                        None,                                   False),
+    UartRxType.CROWNSTONE_ID:                   (lambda payload: Conversion.int8_to_uint8(payload[0]),        DevTopics.ownCrownstoneId,              False),
+    UartRxType.MAC_ADDRESS:                     (_decodeMacAddress,                                           DevTopics.ownMacAddress,                False),
+    UartRxType.ADC_CONFIG:                      (lambda payload: AdcConfigPacket(payload).getDict(),          DevTopics.newAdcConfigPacket,           False),
+    UartRxType.ADC_RESTART:                     (None,                                                        DevTopics.adcRestarted,                 False),
+    UartRxType.POWER_LOG_CURRENT:               (lambda payload: CurrentSamplesPacket(payload).getDict(),     DevTopics.newCurrentData,               True),
+    UartRxType.POWER_LOG_VOLTAGE:               (lambda payload: VoltageSamplesPacket(payload).getDict(),     DevTopics.newVoltageData,               True),
+    UartRxType.POWER_LOG_FILTERED_CURRENT:      (lambda payload: CurrentSamplesPacket(payload).getDict(),     DevTopics.newFilteredCurrentData,       True),
+    UartRxType.POWER_LOG_FILTERED_VOLTAGE:      (lambda payload: VoltageSamplesPacket(payload).getDict(),     DevTopics.newFilteredVoltageData,       True),
+    UartRxType.POWER_LOG_POWER:                 (lambda payload: PowerCalculationPacket(payload).getDict(),   DevTopics.newCalculatedPowerData,       True),
+    UartRxType.ASCII_LOG:                       (_printAsciiLog,                                              None,                                   True),
+    # No need to process this, that's in the test suite.
+    UartRxType.FIRMWARESTATE:                   (None,                                                        None,                                   False),
+}
+
+def register_opcode_handler(opCode, decoder, topic=None, acceptsBuffer=False):
+    """
+    Set how received UART messages with this opcode are handled, by all parsers.
+    This can be used for opcodes that are ignored by default, like UartRxType.PRESENCE_CHANGE or UartRxType.NEIGHBOUR_RSSI.
+
+    :param opCode:  UartRxType, or any other uint16 opcode.
+    :param decoder: Function that is called with the payload of the message, and returns the data to emit.
+                    When it returns None, nothing is emitted. When the decoder is None, the topic is emitted with None as data.
+    :param topic:   Topic to emit the data on. When None, the decoder is always called, even when nobody subscribed.
+                    When both are None, the opcode is ignored.
+    :param acceptsBuffer: When False, the decoder always gets the payload as list, also when zeroCopy is used.
+                    When True, it may get a memoryview instead.
+    """
+    global OPCODE_HANDLERS
+    OPCODE_HANDLERS = {**OPCODE_HANDLERS, opCode: (decoder, topic, acceptsBuffer)}
+
+def set_sample_format(sampleFormat):
+    """
+    Set the type of the "data" of the current and voltage sample events, like DevTopics.newCurrentData, for all parsers.
+    :param sampleFormat: UartSampleFormat, or its value as string. A list of ints by default.
+    """
+    sampleFormat = UartSampleFormat(sampleFormat)
+    if sampleFormat == UartSampleFormat.NUMPY:
+        # Fail here, instead of on every received packet.
+        import numpy
+
+    register_opcode_handler(UartRxType.POWER_LOG_CURRENT,          lambda payload: CurrentSamplesPacket(payload, sampleFormat).getDict(), DevTopics.newCurrentData, True)
+    register_opcode_handler(UartRxType.POWER_LOG_VOLTAGE,          lambda payload: VoltageSamplesPacket(payload, sampleFormat).getDict(), DevTopics.newVoltageData, True)
+    register_opcode_handler(UartRxType.POWER_LOG_FILTERED_CURRENT, lambda payload: CurrentSamplesPacket(payload, sampleFormat).getDict(), DevTopics.newFilteredCurrentData, True)
+    register_opcode_handler(UartRxType.POWER_LOG_FILTERED_VOLTAGE, lambda payload: VoltageSamplesPacket(payload, sampleFormat).getDict(), DevTopics.newFilteredVoltageData, True)
+
 class UartParser:
     """
     Receives SystemTopics.uartNewPackage messages and emits their corresponding SystemTopics.uartNewMessage events.
     Several opcodes for uartNewMessage wil subsequently be parsed (looped back) and a more specific event may
     be emitted.
+    The same is done for batches: SystemTopics.uartNewPackageBatch leads to a SystemTopics.uartNewMessageBatch event.
+
+    Messages of which the topic in OPCODE_HANDLERS has no subscribers are not decoded. This requires an event bus that
+    keeps track of its subscribers, like the CopyOnWriteEventBus, other event buses always decode everything.
     """
     
-    def __init__(self):
-        self.uartPackageSubscription = UartEventBus.subscribe(SystemTopics.uartNewPackage, self.parse)
-        self.uartMessageSubscription = UartEventBus.subscribe(SystemTopics.uartNewMessage, self.handleUartMessage)
-        self.timestampFormat = "%Y-%m-%d %H:%M:%S.%f"
+    def __init__(self, eventBus=UartEventBus):
+        self.eventBus = eventBus
+        self.uartPackageSubscription      = self.eventBus.subscribe(SystemTopics.uartNewPackage,      self.parse)
+        self.uartMessageSubscription      = self.eventBus.subscribe(SystemTopics.uartNewMessage,      self.handleUartMessage)
+        self.uartPackageBatchSubscription = self.eventBus.subscribe(SystemTopics.uartNewPackageBatch, self.parseBatch)
+        self.uartMessageBatchSubscription = self.eventBus.subscribe(SystemTopics.uartNewMessageBatch, self.handleUartMessageBatch)
+
+        # Opcodes of which nobody consumes the result, and of which nobody consumes the raw message either.
+        # Both are derived from the handlers, and the subscribers of the event bus at subscriptionsVersion.
+        self.unconsumedOpCodes = frozenset()
+        self.droppableOpCodes = frozenset()
+        self.handlers = None
+        self.subscriptionsVersion = None
 
     def stop(self):
-        UartEventBus.unsubscribe(self.uartPackageSubscription)
-        UartEventBus.unsubscribe(self.uartMessageSubscription)
+        self.eventBus.unsubscribe(self.uartPackageSubscription)
+        self.eventBus.unsubscribe(self.uartMessageSubscription)
+        self.eventBus.unsubscribe(self.uartPackageBatchSubscription)
+        self.eventBus.unsubscribe(self.uartMessageBatchSubscription)
+
+    def isFrameConsumed(self, messageType, opCode) -> bool:
+        """
+        Used by the read buffer to drop frames right after the CRC check, without decoding them.
+        :param messageType: UartMessageType of the frame.
+        :param opCode:      Opcode of the UART message in the frame.
+        :returns False when nobody would get anything from the frame.
+        """
+        if messageType != UartMessageType.UART_MESSAGE:
+            return True
+        self._updateConsumedOpCodes()
+        return opCode not in self.droppableOpCodes
+
+    def _updateConsumedOpCodes(self):
+        version = getattr(self.eventBus, "version", None)
+        handlers = OPCODE_HANDLERS
+        if version is None or (version == self.subscriptionsVersion and handlers is self.handlers):
+            return
+
+        # Ignored opcodes are never consumed, those that only have a decoder are always consumed.
+        unconsumedOpCodes = frozenset(
+            opCode for opCode, (decoder, topic, acceptsBuffer) in handlers.items()
+            if (decoder is None and topic is None) or (topic is not None and not self.eventBus.has_subscribers(topic))
+        )
+        ownSubscriptions = {self.uartPackageSubscription, self.uartMessageSubscription, self.uartPackageBatchSubscription, self.uartMessageBatchSubscription}
+        rawConsumed = any(self.eventBus.get_subscription_ids(topic) - ownSubscriptions for topic in RAW_TOPICS)
+        self.unconsumedOpCodes = unconsumedOpCodes
+        self.droppableOpCodes = frozenset() if rawConsumed else unconsumedOpCodes
+        self.handlers = handlers
+        self.subscriptionsVersion = version
 
     def parse(self, wrapperPacket: UartWrapperPacket):
         """
@@ -49,24 +264,56 @@ class UartParser:
         :param wrapperPacket:
         :return:
         """
+        uartMsg = self._getUartMessage(wrapperPacket)
+        if uartMsg is not None:
+            self.eventBus.emit(SystemTopics.uartNewMessage, uartMsg)
+
+    def parseBatch(self, wrapperPackets: List[UartWrapperPacket]):
+        """
+        Callback for SystemTopics.uartNewPackageBatch, emits a single SystemTopics.uartNewMessageBatch message
+        with the messages of all wrapper packets that were of the correct protocol version and unencrypted.
+        :param wrapperPackets:
+        :return:
+        """
+        uartMsgs = []
+        for wrapperPacket in wrapperPackets:
+            uartMsg = self._getUartMessage(wrapperPacket)
+            if uartMsg is not None:
+                uartMsgs.append(uartMsg)
+
+        if uartMsgs:
+            self.eventBus.emit(SystemTopics.uartNewMessageBatch, uartMsgs)
+
+    def _getUartMessage(self, wrapperPacket: UartWrapperPacket) -> UartMessagePacket or None:
+        """
+        :returns the message in the wrapper packet, or None if it can't be handled.
+        """
         if type(wrapperPacket) is not UartWrapperPacket:
             raise TypeError(f"Invalid type: {type(wrapperPacket)}")
 
         if wrapperPacket.protocolMajor != PROTOCOL_MAJOR:
             _LOGGER.warning(F"Unknown protocol: {wrapperPacket.protocolMajor}.{wrapperPacket.protocolMinor}")
-            return
+            return None
 
         msgType = wrapperPacket.messageType
         if msgType == UartMessageType.UART_MESSAGE:
             uartMsg = UartMessagePacket()
             if uartMsg.parse(wrapperPacket.payload):
-                UartEventBus.emit(SystemTopics.uartNewMessage, uartMsg)
+                return uartMsg
+            return None
         elif msgType == UartMessageType.ENCRYPTED_UART_MESSAGE:
             _LOGGER.info(f"Received encrypted msg: decryption is not implemented.")
-            return
+            return None
         else:
             _LOGGER.warning(F"Unknown message type: {msgType}")
-            return
+            return None
+
+    def handleUartMessageBatch(self, messagePackets: List[UartMessagePacket]):
+        """
+        Callback for SystemTopics.uartNewMessageBatch. Handles the messages one by one, like handleUartMessage.
+        """
+        for messagePacket in messagePackets:
+            self.handleUartMessage(messagePacket)
 
     def handleUartMessage(self, messagePacket: UartMessagePacket):
         try:
@@ -80,247 +327,42 @@ class UartParser:
     def _handleUartMessage(self, messagePacket: UartMessagePacket):
         """
         Callback for SystemTopics.uartNewMessage. This transforms a select number of message types
-        into further specialized messages and posts those on UartEventBus.
+        into further specialized messages and posts those on the event bus, see OPCODE_HANDLERS.
         :param messagePacket:
         :return:
         """
         opCode = messagePacket.opCode
-        parsedData = None
-        # print("UART - opCode:", opCode, "payload:", dataPacket.payload)
-
-        if opCode == UartRxType.HELLO:
-            helloPacket = UartCrownstoneHelloPacket(messagePacket.payload)
-            UartEventBus.emit(UartTopics.hello, helloPacket)
-            pass
-
-        elif opCode == UartRxType.SESSION_NONCE:
-            _LOGGER.debug(f"Received SESSION_NONCE")
-            pass
-
-        elif opCode == UartRxType.HEARTBEAT:
-            _LOGGER.debug(f"Received HEARTBEAT")
-            pass
-
-        elif opCode == UartRxType.STATUS:
-            _LOGGER.debug(f"Received STATUS")
-            pass
-
-        elif opCode == UartRxType.RESULT_PACKET:
-            packet = ResultPacket(messagePacket.payload)
-            UartEventBus.emit(SystemTopics.resultPacket, packet)
-
-
-        #################
-        # Error replies #
-        #################
-
-        elif opCode == UartRxType.ERR_REPLY_PARSING_FAILED:
-            _LOGGER.debug(f"Received ERR_REPLY_PARSING_FAILED")
-            pass
-
-        elif opCode == UartRxType.ERR_REPLY_STATUS:
-            _LOGGER.debug(f"Received ERR_REPLY_STATUS")
-            pass
-
-        elif opCode == UartRxType.ERR_REPLY_SESSION_NONCE_MISSING:
-            _LOGGER.debug(f"Received ERR_REPLY_SESSION_NONCE_MISSING")
-            pass
-
-        elif opCode == UartRxType.ERR_REPLY_DECRYPTION_FAILED:
-            _LOGGER.debug(f"Received ERR_REPLY_DECRYPTION_FAILED")
-            pass
-
-        elif 9900 < opCode < 10000:
-            _LOGGER.debug(f"Received ERR_REPLY {opCode}")
-            pass
-
-
-        ################
-        #### Events ####
-        ################
-
-        elif opCode == UartRxType.UART_MESSAGE:
-            stringResult = ""
-            for byte in messagePacket.payload:
-                stringResult += chr(byte)
-            # logStr = "LOG: %15.3f - %s" % (time.time(), stringResult)
-            UartEventBus.emit(UartTopics.uartMessage, {"string":stringResult, "data": messagePacket.payload})
-
-        elif opCode == UartRxType.SESSION_NONCE_MISSING:
-            _LOGGER.debug(f"Received SESSION_NONCE_MISSING")
-            pass
 
-        elif opCode == UartRxType.OWN_SERVICE_DATA:
-            # service data type + device type + data type + service data (15b)
-            serviceData = ServiceData(messagePacket.payload)
-            serviceData.parse()
-            UartEventBus.emit(DevTopics.newServiceData, serviceData.payload)
-
-        elif opCode == UartRxType.PRESENCE_CHANGE:
-            pass
-
-        elif opCode == UartRxType.FACTORY_RESET:
-            pass
-
-        elif opCode == UartRxType.BOOTED:
-            _LOGGER.debug(f"Received BOOTED")
-            pass
-
-        elif opCode == UartRxType.HUB_DATA:
-            pass
-
-        elif opCode == UartRxType.MESH_SERVICE_DATA:
-            # data type + service data (15b)
-            result = parseOpcode7(messagePacket.payload)
-            _LOGGER.debug(f"Received service data: {result}")
-            if hasattr(result,"crownstoneId"):
-                UartEventBus.emit(SystemTopics.stateUpdate, (result.crownstoneId, result))
-
-        elif opCode == UartRxType.EXTERNAL_STATE_PART_0:
-            pass
-
-        elif opCode == UartRxType.EXTERNAL_STATE_PART_1:
-            pass
-
-        elif opCode == UartRxType.MESH_RESULT:
-            if len(messagePacket.payload) > 1:
-                crownstoneId = messagePacket.payload[0]
-                packet = ResultPacket(messagePacket.payload[1:])
-                UartEventBus.emit(SystemTopics.meshResultPacket, [crownstoneId, packet])
-
-        elif opCode == UartRxType.MESH_ACK_ALL_RESULT:
-            packet = ResultPacket(messagePacket.payload)
-            UartEventBus.emit(SystemTopics.meshResultFinalPacket, packet)
-
-        elif opCode == UartRxType.RSSI_PING_MESSAGE:
-            # for now, you can subscribe to SystemTopics.uartNewMessage
-            pass
-
-        elif opCode == UartRxType.LOG:
-            _LOGGER.debug(f"Received binary log: {messagePacket.payload}")
-            packet = UartLogPacket(messagePacket.payload)
-            UartEventBus.emit(UartTopics.log, packet)
-
-        elif opCode == UartRxType.LOG_ARRAY:
-            _LOGGER.debug(f"Received binary log array: {messagePacket.payload}")
-            packet = UartLogArrayPacket(messagePacket.payload)
-            UartEventBus.emit(UartTopics.logArray, packet)
-
-
-        #######################
-        # ASSET FILTER events #
-        #######################
-
-        elif opCode == UartRxType.ASSET_MAC_RSSI_REPORT:
-            _LOGGER.debug(f"Received ASSET_MAC_RSSI_REPORT: {messagePacket.payload}")
-            packet = AssetMacReport(messagePacket.payload)
-            UartEventBus.emit(UartTopics.assetTrackingReport, packet)
-
-        elif opCode == UartRxType.ASSET_ID_RSSI_REPORT:
-            _LOGGER.debug(f"Received ASSET_ID_RSSI_REPORT: {messagePacket.payload}")
-            packet = AssetIdReport(messagePacket.payload)
-            UartEventBus.emit(UartTopics.assetIdReport, packet)
-
-
-        ####################
-        # Developer events #
-        ####################
-
-        elif opCode == UartRxType.INTERNAL_EVENT:
-            pass
-
-        elif opCode == UartRxType.MESH_CMD_TIME:
-            pass
-
-        elif opCode == UartRxType.MESH_PROFILE_LOCATION:
-            pass
-
-        elif opCode == UartRxType.MESH_SET_BEHAVIOUR_SETTINGS:
-            pass
-
-        elif opCode == UartRxType.MESH_TRACKED_DEVICE_REGISTER:
-            pass
-
-        elif opCode == UartRxType.MESH_TRACKED_DEVICE_TOKEN:
-            pass
-
-        elif opCode == UartRxType.MESH_SYNC_REQUEST:
-            pass
-
-        elif opCode == UartRxType.MESH_TRACKED_DEVICE_HEARTBEAT:
-            pass
-
-
-        ######################
-        # Debug build events #
-        ######################
-
-        elif opCode == UartRxType.ADVERTISING_ENABLED:
-            pass
-
-        elif opCode == UartRxType.MESH_ENABLED:
-            pass
+        handler = OPCODE_HANDLERS.get(opCode)
+        if handler is None:
+            if 9900 < opCode < 10000:
+                _LOGGER.debug(f"Received ERR_REPLY {opCode}")
+            else:
+                _LOGGER.debug(f"Unknown opCode: {opCode}")
+            return
 
-        elif opCode == UartRxType.CROWNSTONE_ID:
-            id = Conversion.int8_to_uint8(messagePacket.payload)
-            UartEventBus.emit(DevTopics.ownCrownstoneId, id)
+        self._updateConsumedOpCodes()
+        if opCode in self.unconsumedOpCodes:
+            return
 
-        elif opCode == UartRxType.MAC_ADDRESS:
-            addr = Conversion.uint8_array_to_address(messagePacket.payload)
-            if addr != "":
-                UartEventBus.emit(DevTopics.ownMacAddress, addr)
-            else:
-                _LOGGER.warning("invalid address:", messagePacket.payload)
-
-        elif opCode == UartRxType.ADC_CONFIG:
-            # type is PowerCalculationsPacket
-            parsedData = AdcConfigPacket(messagePacket.payload)
-            UartEventBus.emit(DevTopics.newAdcConfigPacket, parsedData.getDict())
-
-        elif opCode == UartRxType.ADC_RESTART:
-            UartEventBus.emit(DevTopics.adcRestarted, None)
-
-        elif opCode == UartRxType.POWER_LOG_CURRENT:
-            # type is CurrentSamples
-            parsedData = CurrentSamplesPacket(messagePacket.payload)
-            UartEventBus.emit(DevTopics.newCurrentData, parsedData.getDict())
-
-        elif opCode == UartRxType.POWER_LOG_VOLTAGE:
-            # type is VoltageSamplesPacket
-            parsedData = VoltageSamplesPacket(messagePacket.payload)
-            UartEventBus.emit(DevTopics.newVoltageData, parsedData.getDict())
-
-        elif opCode == UartRxType.POWER_LOG_FILTERED_CURRENT:
-            # type is CurrentSamples
-            parsedData = CurrentSamplesPacket(messagePacket.payload)
-            UartEventBus.emit(DevTopics.newFilteredCurrentData, parsedData.getDict())
-
-        elif opCode == UartRxType.POWER_LOG_FILTERED_VOLTAGE:
-            # type is VoltageSamplesPacket
-            parsedData = VoltageSamplesPacket(messagePacket.payload)
-            UartEventBus.emit(DevTopics.newFilteredVoltageData, parsedData.getDict())
-
-        elif opCode == UartRxType.POWER_LOG_POWER:
-            # type is PowerCalculationsPacket
-            parsedData = PowerCalculationPacket(messagePacket.payload)
-            UartEventBus.emit(DevTopics.newCalculatedPowerData, parsedData.getDict())
-
-        elif opCode == UartRxType.ASCII_LOG:
-            timestamp = datetime.datetime.now()
-            stringResult = ""
-            for byte in messagePacket.payload:
-                if byte < 128:
-                    stringResult += chr(byte)
-            logStr = f"ASCII LOG: [{timestamp.strftime(self.timestampFormat)}] {stringResult}"
-            # sys.stdout.write(logStr)
-            print(logStr.rstrip())
-
-        elif opCode == UartRxType.FIRMWARESTATE:
-            # no need to process this, that's in the test suite.
-            pass
+        decoder, topic, acceptsBuffer = handler
+        if decoder is None:
+            if topic is not None:
+                self.eventBus.emit(topic, None)
+            return
 
-        else:
-            _LOGGER.debug(f"Unknown opCode: {opCode}")
+        payload = messagePacket.payload
+        if isinstance(payload, memoryview) and not acceptsBuffer:
+            payload = payload.tolist()
 
-        parsedData = None
-        
+        # Only catch errors of the decoder, not those of the subscribers.
+        try:
+            data = decoder(payload)
+        except CrownstoneException as e:
+            _LOGGER.error(f"Parse error: {e}")
+            return
+        except Exception:
+            _LOGGER.exception(f"Failed to decode opCode {opCode}")
+            return
+        if topic is not None and data is not None:
+            self.eventBus.emit(topic, data)
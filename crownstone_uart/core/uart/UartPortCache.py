@@ -0,0 +1,59 @@
+import json
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UartPortCache:
+    """
+    Remembers the port of the last connected Crownstone USB in a small json file.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Path of the cache file.
+        """
+        self.path = path
+
+    def load(self) -> dict or None:
+        """
+        :return: dict with device, serialNumber, vid and pid of the last connected port, or None when there is no valid cache.
+        """
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+            if isinstance(data, dict) and "device" in data:
+                return data
+            _LOGGER.debug(f"Invalid port cache in {self.path}")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            _LOGGER.debug(f"Could not read port cache {self.path}: {e}")
+        return None
+
+    def store(self, portInfo):
+        """
+        :param portInfo: ListPortInfo of the connected port.
+        """
+        data = {
+            "device":       portInfo.device,
+            "serialNumber": portInfo.serial_number,
+            "vid":          portInfo.vid,
+            "pid":          portInfo.pid,
+        }
+        try:
+            with open(self.path, "w") as file:
+                json.dump(data, file)
+        except OSError as e:
+            _LOGGER.debug(f"Could not write port cache {self.path}: {e}")
+
+    @staticmethod
+    def matches(cachedPort: dict, portInfo) -> bool:
+        """
+        Whether a port is the cached port. The USB serial number is leading, as the device path can change between reboots.
+        """
+        if cachedPort.get("serialNumber") is not None:
+            return (portInfo.serial_number == cachedPort["serialNumber"] and
+                    portInfo.vid == cachedPort.get("vid") and
+                    portInfo.pid == cachedPort.get("pid"))
+        return portInfo.device == cachedPort["device"]
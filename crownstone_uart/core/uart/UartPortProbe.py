@@ -0,0 +1,122 @@
+import logging
+import threading
+import time
+from typing import List
+
+import serial
+from crownstone_core.Exceptions import CrownstoneException
+
+from crownstone_uart.Constants import UART_WRITE_TIMEOUT
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
+from crownstone_uart.core.uart.UartReadBuffer import UartReadBuffer
+from crownstone_uart.core.uart.UartTypes import UartTxType, UartMessageType, UartRxType
+from crownstone_uart.core.uart.uartPackets.UartCommandHelloPacket import UartCommandHelloPacket
+from crownstone_uart.core.uart.uartPackets.UartCrownstoneHelloPacket import UartCrownstoneHelloPacket
+from crownstone_uart.core.uart.uartPackets.UartMessagePacket import UartMessagePacket
+from crownstone_uart.core.uart.uartPackets.UartWrapperPacket import UartWrapperPacket, PROTOCOL_MAJOR
+from crownstone_uart.topics.SystemTopics import SystemTopics
+
+_LOGGER = logging.getLogger(__name__)
+
+# Time to wait for the hello reply, after the hello has been written.
+HELLO_REPLY_TIMEOUT = 0.25
+
+# Read timeout, determines how fast the other ports are closed once a dongle has been found.
+READ_INTERVAL = 0.05
+
+# Max size of a frame in the reply, so that garbage from other devices is skipped quickly.
+MAX_REPLY_FRAME_SIZE = 1024
+
+
+class UartPortProbe:
+    """
+    Finds the Crownstone dongle among a list of ports, by sending a hello to all of them at the same time.
+
+    Every port is opened on its own thread, and the replies are decoded with a private read buffer,
+    so nothing is emitted on the UartEventBus. The first port that replies with a hello wins, the others are closed right away.
+    """
+
+    def __init__(self, ports: List[str], baudRate=230400, timeout=HELLO_REPLY_TIMEOUT):
+        """
+        :param ports:    Device names of the ports to probe.
+        :param baudRate: Baud rate to open the ports with.
+        :param timeout:  Time in seconds to wait for a hello reply, after the hello has been written.
+        """
+        self.ports = ports
+        self.baudRate = baudRate
+        self.timeout = timeout
+
+        self.lock = threading.Lock()
+        self.foundEvent = threading.Event()
+        self.foundPort = None
+
+    def probe(self) -> str or None:
+        """
+        Probe all ports. Blocks until a dongle has been found, or all ports failed to reply.
+
+        :return: Device name of the port with the dongle, or None if none was found.
+        """
+        threads = []
+        for port in self.ports:
+            thread = threading.Thread(target=self._probePort, args=(port,), daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            # Joining all threads also makes sure the other ports are closed before the found port is reopened.
+            thread.join()
+
+        return self.foundPort
+
+    def _probePort(self, port):
+        try:
+            serialController = serial.Serial()
+            serialController.port = port
+            serialController.baudrate = int(self.baudRate)
+            serialController.timeout = min(READ_INTERVAL, self.timeout)
+            serialController._write_timeout = UART_WRITE_TIMEOUT
+            serialController.open()
+        except (OSError, serial.SerialException) as e:
+            _LOGGER.debug(f"Probe: can't open {port}: {e}")
+            return
+
+        try:
+            eventBus = CopyOnWriteEventBus()
+            readBuffer = UartReadBuffer(maxFrameSize=MAX_REPLY_FRAME_SIZE, eventBus=eventBus)
+            eventBus.subscribe(SystemTopics.uartNewPackage, lambda wrapperPacket: self._handlePacket(port, wrapperPacket))
+
+            serialController.write(self._getHelloPacket())
+            deadline = time.monotonic() + self.timeout
+            while not self.foundEvent.is_set() and time.monotonic() < deadline:
+                bytesFromSerial = serialController.read(max(1, serialController.in_waiting))
+                if bytesFromSerial:
+                    readBuffer.addByteArray(bytesFromSerial)
+        except (OSError, serial.SerialException) as e:
+            _LOGGER.debug(f"Probe: error on {port}: {e}")
+        finally:
+            serialController.close()
+
+    def _handlePacket(self, port, wrapperPacket: UartWrapperPacket):
+        if wrapperPacket.protocolMajor != PROTOCOL_MAJOR or wrapperPacket.messageType != UartMessageType.UART_MESSAGE:
+            return
+
+        messagePacket = UartMessagePacket()
+        if not messagePacket.parse(wrapperPacket.payload) or messagePacket.opCode != UartRxType.HELLO:
+            return
+
+        try:
+            UartCrownstoneHelloPacket(messagePacket.payload)
+        except CrownstoneException as e:
+            _LOGGER.debug(f"Probe: invalid hello reply on {port}: {e}")
+            return
+
+        with self.lock:
+            if self.foundPort is None:
+                _LOGGER.debug(f"Probe: hello reply on {port}")
+                self.foundPort = port
+                self.foundEvent.set()
+
+    def _getHelloPacket(self):
+        helloPacket = UartCommandHelloPacket().serialize()
+        uartMessage = UartMessagePacket(UartTxType.HELLO, helloPacket).serialize()
+        return bytes(UartWrapperPacket(UartMessageType.UART_MESSAGE, uartMessage).serialize())
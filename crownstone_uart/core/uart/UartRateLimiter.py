@@ -0,0 +1,141 @@
+import logging
+import threading
+import time
+
+from crownstone_core.packets.ResultPacket import ResultPacket
+from crownstone_core.protocol.BluenetTypes import ResultValue
+
+from crownstone_uart.core.UartEventBus import UartEventBus
+from crownstone_uart.topics.SystemTopics import SystemTopics
+
+_LOGGER = logging.getLogger(__name__)
+
+# The bucket holds enough tokens for this many seconds of traffic, so short bursts are not spaced.
+BURST_TIME = 0.1
+
+# When adaptive: the rate is multiplied by this factor on a BUSY result,
+DECREASE_FACTOR = 0.5
+# increased by this fraction of the max rate on any other result,
+INCREASE_STEP = 0.05
+# and never lower than this fraction of the max rate.
+MIN_FACTOR = 1 / 16
+
+
+class UartRateLimiter:
+    """
+    Token bucket that limits the number of packets and bytes per second that are written to the serial port.
+
+    When adaptive, the allowed rate is lowered each time the Crownstone replies with a BUSY result,
+    and slowly raised back to the configured max rate with each other result.
+    """
+
+    def __init__(self, maxPacketsPerSecond=None, maxBytesPerSecond=None, adaptive=False, eventBus=UartEventBus):
+        """
+        :param maxPacketsPerSecond: Max number of packets per second, None for no limit.
+        :param maxBytesPerSecond:   Max number of bytes per second, None for no limit.
+        :param adaptive:            Whether to adjust the rate to the BUSY results of the Crownstone.
+        :param eventBus:            EventBus on which the results of the Crownstone are received.
+        """
+        self.eventBus = eventBus
+        self.maxPacketsPerSecond = maxPacketsPerSecond
+        self.maxBytesPerSecond = maxBytesPerSecond
+        self.adaptive = adaptive
+
+        # Fraction of the max rates that is currently allowed.
+        self.factor = 1.0
+        self.busyCount = 0
+
+        self.lock = threading.Lock()
+        self.packetTokens = self._capacity(maxPacketsPerSecond)
+        self.byteTokens = self._capacity(maxBytesPerSecond)
+        self.lastRefill = time.monotonic()
+
+        self.eventId = None
+        if self.adaptive:
+            self.eventId = self.eventBus.subscribe(SystemTopics.resultPacket, self._handleResult)
+
+    def stop(self):
+        if self.eventId is not None:
+            self.eventBus.unsubscribe(self.eventId)
+            self.eventId = None
+
+    def get_rate(self) -> dict:
+        """
+        :return: dict with the currently allowed packetsPerSecond and bytesPerSecond (None when not limited),
+                 and the number of BUSY results that were received.
+        """
+        with self.lock:
+            return {
+                "packetsPerSecond": self._rate(self.maxPacketsPerSecond),
+                "bytesPerSecond":   self._rate(self.maxBytesPerSecond),
+                "busyCount":        self.busyCount,
+            }
+
+    def get_delay(self) -> float:
+        """
+        :return: Time in seconds to wait before the next write is allowed.
+        """
+        with self.lock:
+            self._refill()
+            delay = 0.0
+            packetRate = self._rate(self.maxPacketsPerSecond)
+            if packetRate is not None and self.packetTokens < 1:
+                delay = (1 - self.packetTokens) / packetRate
+            byteRate = self._rate(self.maxBytesPerSecond)
+            if byteRate is not None and self.byteTokens < 0:
+                delay = max(delay, -self.byteTokens / byteRate)
+            return delay
+
+    def get_packet_allowance(self):
+        """
+        :return: Number of packets that may be written now, or None when the number of packets is not limited.
+        """
+        with self.lock:
+            if self.maxPacketsPerSecond is None:
+                return None
+            self._refill()
+            return max(0, int(self.packetTokens))
+
+    def consume(self, packets, size):
+        """
+        Take tokens for a write. The byte bucket may go into debt, which is paid by waiting before the next write.
+
+        :param packets: Number of packets that are written.
+        :param size:    Number of bytes that are written.
+        """
+        with self.lock:
+            self._refill()
+            if self.maxPacketsPerSecond is not None:
+                self.packetTokens -= packets
+            if self.maxBytesPerSecond is not None:
+                self.byteTokens -= size
+
+    def _rate(self, maxRate):
+        if maxRate is None:
+            return None
+        return maxRate * self.factor
+
+    def _capacity(self, maxRate):
+        if maxRate is None:
+            return 0.0
+        return max(1.0, self._rate(maxRate) * BURST_TIME)
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.lastRefill
+        self.lastRefill = now
+        if self.maxPacketsPerSecond is not None:
+            self.packetTokens = min(self._capacity(self.maxPacketsPerSecond), self.packetTokens + elapsed * self._rate(self.maxPacketsPerSecond))
+        if self.maxBytesPerSecond is not None:
+            self.byteTokens = min(self._capacity(self.maxBytesPerSecond), self.byteTokens + elapsed * self._rate(self.maxBytesPerSecond))
+
+    def _handleResult(self, resultPacket: ResultPacket):
+        with self.lock:
+            # Refill at the old rate, up to now.
+            self._refill()
+            if resultPacket.resultCode == ResultValue.BUSY:
+                self.busyCount += 1
+                self.factor = max(MIN_FACTOR, self.factor * DECREASE_FACTOR)
+                _LOGGER.debug(f"Crownstone is busy, lowered write rate factor to {self.factor}")
+            else:
+                self.factor = min(1.0, self.factor + INCREASE_STEP)
@@ -1,44 +1,152 @@
-from crownstone_core.util.CRC import crc16ccitt
 from crownstone_core.util.Conversion import Conversion
 import logging
 
 from crownstone_uart.core.UartEventBus import UartEventBus
 from crownstone_uart.core.uart.uartPackets.UartWrapperPacket import SIZE_HEADER_SIZE, CRC_SIZE, WRAPPER_HEADER_SIZE, START_TOKEN, \
-    ESCAPE_TOKEN, BIT_FLIP_MASK, UartWrapperPacket
+    ESCAPE_TOKEN, BIT_FLIP_MASK, UartWrapperPacket, PROTOCOL_MAJOR
+from crownstone_uart.core.uart.uartPackets.UartMessagePacket import OPCODE_SIZE
 from crownstone_uart.topics.DevTopics import DevTopics
 from crownstone_uart.topics.SystemTopics import SystemTopics
+from crownstone_uart.util.CRC import crc16ccitt, CRC16_CCITT_START_VALUE
 
 _LOGGER = logging.getLogger(__name__)
 
 
 class UartReadBuffer:
 
-    def __init__(self):
-        self.buffer = []
+    def __init__(self, zeroCopy=False, maxFrameSize=None, batchDelivery=False, eventBus=UartEventBus, frameFilter=None):
+        """
+        :param zeroCopy: when True, every received frame is stored as a single immutable bytes object, and the payloads
+            of the emitted UartWrapperPacket and UartMessagePacket are memoryview slices of it instead of lists.
+            Use payload.tolist() where a list is required.
+        :param maxFrameSize: when set, the buffer resynchronises as fast as possible after corrupted data:
+            a size field larger than this is rejected right away, and a start token right after an escape token
+            starts a new frame instead of being dropped. None disables this.
+        :param batchDelivery: when True, the packets decoded from one call to addByteArray are emitted together as a list
+            on SystemTopics.uartNewPackageBatch, instead of one by one on SystemTopics.uartNewPackage.
+        :param eventBus: the EventBus to emit the packets and noise on.
+        :param frameFilter: optional function that is called with the message type and opcode of every valid frame,
+            before it is decoded. When it returns False, the frame is dropped, see UartParser.isFrameConsumed.
+        """
+        self.eventBus = eventBus
+        self.zeroCopy = zeroCopy
+        self.maxFrameSize = maxFrameSize
+        self.batchDelivery = batchDelivery
+        self.frameFilter = frameFilter
+
+        # Packets decoded during the current addByteArray call, when using batch delivery.
+        self.batch = []
+
+        # Unescaped bytes of the frame that is being read, reused for every frame.
+        self.buffer = bytearray()
         self.escapingNextByte = False
         self.active = False
         self.sizeToRead = 0
 
+        # CRC of the bytes in the buffer so far, updated as they come in.
+        self.crc = CRC16_CCITT_START_VALUE
+
+        # Whether the current frame started in the middle of a corrupted frame.
+        self.recovering = False
+        # Whether a corrupted frame was dropped before its end, so the next frame starts in the middle of it.
+        # Unlike recovering, this is kept on reset.
+        self.recoveryPending = False
+        # Number of valid frames that were started in the middle of a corrupted frame.
+        self.recoveredFrames = 0
+        # Number of valid frames that were dropped by the frame filter.
+        self.filteredFrames = 0
+
     def addByteArray(self, rawByteArray):
-        for byte in rawByteArray:
-            self.add(byte)
+        """
+        Add a chunk of received bytes.
+
+        Instead of handling the chunk byte by byte, it is scanned for start and escape tokens,
+        and the runs of plain bytes in between are copied into the buffer at once.
+        The special tokens themselves are handled by add(), so the framing is the same.
+        """
+        self._addByteArray(rawByteArray)
+
+        if self.batch:
+            batch = self.batch
+            self.batch = []
+            self.eventBus.emit(SystemTopics.uartNewPackageBatch, batch)
+
+    def _addByteArray(self, rawByteArray):
+        if not isinstance(rawByteArray, (bytes, bytearray)):
+            rawByteArray = bytes(rawByteArray)
+        data = memoryview(rawByteArray)
+        length = len(rawByteArray)
+
+        # Position of the next start and escape token, -1 when it has to be searched for.
+        nextStart = -1
+        nextEscape = -1
+
+        index = 0
+        while index < length:
+            if not self.active:
+                # Skip everything up to the next start token.
+                startIndex = rawByteArray.find(START_TOKEN, index)
+                if startIndex == -1:
+                    return
+                self.add(START_TOKEN)
+                index = startIndex + 1
+                continue
+
+            if self.escapingNextByte:
+                self.add(rawByteArray[index])
+                index += 1
+                continue
+
+            # Amount of (unescaped) bytes that are required to complete the size field, or the frame.
+            if self.sizeToRead == 0:
+                required = SIZE_HEADER_SIZE - len(self.buffer)
+            else:
+                required = self.sizeToRead - len(self.buffer)
+
+            if nextStart < index:
+                nextStart = rawByteArray.find(START_TOKEN, index)
+                if nextStart == -1:
+                    nextStart = length
+            if nextEscape < index:
+                nextEscape = rawByteArray.find(ESCAPE_TOKEN, index)
+                if nextEscape == -1:
+                    nextEscape = length
+
+            end = min(index + required, nextStart, nextEscape, length)
+            if end == index:
+                # The next byte is a special token.
+                self.add(rawByteArray[index])
+                index += 1
+                continue
+
+            self._addToBuffer(data[index:end])
+            index = end
 
     def add(self, byte):
         # An escape shouldn't be followed by a special byte.
         if self.escapingNextByte and (byte is START_TOKEN or byte is ESCAPE_TOKEN):
             _LOGGER.warning("Special byte after escape token")
-            UartEventBus.emit(DevTopics.uartNoise, "special byte after escape token")
+            self.eventBus.emit(DevTopics.uartNoise, "special byte after escape token")
             self.reset()
+            if self.maxFrameSize is not None and byte is START_TOKEN:
+                # The start token is most likely the start of the next frame.
+                self.active = True
+                self.recovering = True
+            else:
+                self.recoveryPending = True
             return
 
         # Activate on start token.
         if byte is START_TOKEN:
-            if self.active:
+            interrupted = self.active
+            if interrupted:
                 _LOGGER.warning("MULTIPLE START TOKENS")
-                _LOGGER.debug(f"Multiple start tokens: sizeToRead={self.sizeToRead} bufLen={len(self.buffer)} buffer={self.buffer}")
-                UartEventBus.emit(DevTopics.uartNoise, "multiple start token")
+                _LOGGER.debug(f"Multiple start tokens: sizeToRead={self.sizeToRead} bufLen={len(self.buffer)} buffer={list(self.buffer)}")
+                self.eventBus.emit(DevTopics.uartNoise, "multiple start token")
             self.reset()
             self.active = True
+            self.recovering = interrupted or self.recoveryPending
+            self.recoveryPending = False
             return
 
         if not self.active:
@@ -53,7 +161,24 @@ class UartReadBuffer:
             byte ^= BIT_FLIP_MASK
             self.escapingNextByte = False
 
-        self.buffer.append(byte)
+        self._addToBuffer(bytes((byte,)))
+
+    def _addToBuffer(self, data):
+        """
+        Add unescaped bytes to the buffer, and update the CRC with the ones that are covered by it.
+        """
+        if self.sizeToRead != 0:
+            crcCoveredSize = self.sizeToRead - CRC_SIZE - len(self.buffer)
+            if crcCoveredSize > 0:
+                self.crc = crc16ccitt(data[0 : crcCoveredSize], self.crc)
+
+        self.buffer += data
+        self._handleBufferUpdate()
+
+    def _handleBufferUpdate(self):
+        """
+        Check if the size field, or the whole frame, has been read after bytes were added to the buffer.
+        """
         bufferSize = len(self.buffer)
 
         if self.sizeToRead == 0:
@@ -67,7 +192,16 @@ class UartReadBuffer:
                     self.reset()
                     return
 
-                self.buffer = []
+                # Don't wait for a frame that can't be valid, but look for the next start token instead.
+                if self.maxFrameSize is not None and self.sizeToRead > self.maxFrameSize:
+                    _LOGGER.warning("Frame too large")
+                    _LOGGER.debug(f"Frame too large: sizeToRead={self.sizeToRead} maxFrameSize={self.maxFrameSize}")
+                    self.eventBus.emit(DevTopics.uartNoise, "frame too large")
+                    self.reset()
+                    self.recoveryPending = True
+                    return
+
+                self.buffer.clear()
                 return
 
         elif bufferSize >= self.sizeToRead:
@@ -82,6 +216,7 @@ class UartReadBuffer:
         Check CRC, and emit a uart packet.
 
         Buffer starts after size header, and includes wrapper header and tail (CRC).
+        The CRC has already been calculated while the buffer was filled.
         """
 
         # Check size
@@ -89,29 +224,48 @@ class UartReadBuffer:
         wrapperSize = WRAPPER_HEADER_SIZE + CRC_SIZE
         if bufferSize < wrapperSize:
             _LOGGER.warning("Buffer too small")
-            UartEventBus.emit(DevTopics.uartNoise, "buffer too small")
+            self.eventBus.emit(DevTopics.uartNoise, "buffer too small")
             return
 
-        # Get the buffer between size field and CRC:
-        baseBuffer = self.buffer[0 : bufferSize - CRC_SIZE]
-
         # Check CRC
-        calculatedCrc = crc16ccitt(baseBuffer)
+        calculatedCrc = self.crc
         sourceCrc = Conversion.uint8_array_to_uint16(self.buffer[bufferSize - CRC_SIZE : ])
 
         if calculatedCrc != sourceCrc:
             _LOGGER.warning("Failed CRC")
-            _LOGGER.debug(f"Failed CRC: sourceCrc={sourceCrc} calculatedCrc={calculatedCrc} bufSize={len(self.buffer)} buffer={self.buffer}")
-            UartEventBus.emit(DevTopics.uartNoise, "crc mismatch")
+            _LOGGER.debug(f"Failed CRC: sourceCrc={sourceCrc} calculatedCrc={calculatedCrc} bufSize={len(self.buffer)} buffer={list(self.buffer)}")
+            self.eventBus.emit(DevTopics.uartNoise, "crc mismatch")
             return
 
+        if self.recovering:
+            self.recoveredFrames += 1
+
+        # Peek at the message type and opcode, to drop frames that nobody consumes before decoding them.
+        if self.frameFilter is not None and bufferSize >= wrapperSize + OPCODE_SIZE and self.buffer[0] == PROTOCOL_MAJOR:
+            messageType = self.buffer[WRAPPER_HEADER_SIZE - 1]
+            opCode = self.buffer[WRAPPER_HEADER_SIZE] + (self.buffer[WRAPPER_HEADER_SIZE + 1] << 8)
+            if not self.frameFilter(messageType, opCode):
+                self.filteredFrames += 1
+                return
+
+        # Get the buffer between size field and CRC:
+        if self.zeroCopy:
+            # The only copy of the frame: everything after this is a view on it.
+            baseBuffer = memoryview(bytes(self.buffer))[0 : bufferSize - CRC_SIZE]
+        else:
+            baseBuffer = list(self.buffer[0 : bufferSize - CRC_SIZE])
+
         wrapperPacket = UartWrapperPacket()
         if wrapperPacket.parse(baseBuffer):
-            UartEventBus.emit(SystemTopics.uartNewPackage, wrapperPacket)
+            if self.batchDelivery:
+                self.batch.append(wrapperPacket)
+            else:
+                self.eventBus.emit(SystemTopics.uartNewPackage, wrapperPacket)
 
     def reset(self):
-        self.buffer = []
+        self.buffer.clear()
         self.escapingNextByte = False
         self.active = False
         self.sizeToRead = 0
-
+        self.crc = CRC16_CCITT_START_VALUE
+        self.recovering = False
@@ -1,4 +1,4 @@
-from enum import IntEnum
+from enum import IntEnum, Enum
 
 class UartMessageType(IntEnum):
     UART_MESSAGE =                     0
@@ -94,3 +94,24 @@ class UartRxType(IntEnum):
 
     ASCII_LOG =               		   60000
     FIRMWARESTATE =                    60001
+
+class UartWriteQueueFullPolicy(Enum):
+    BLOCK =                            "BLOCK"        # Wait until there is room in the queue.
+    REJECT =                           "REJECT"       # Raise a UartException.
+    DROP_OLDEST =                      "DROP_OLDEST"  # Drop the oldest idempotent packet with the same supersede key as the new one, block if there is none.
+
+class UartWritePriority(IntEnum):
+    HIGH =                             0  # Interactive commands, like switching.
+    NORMAL =                           1
+    BULK =                             2  # Long transfers, like uploading filters or microapps.
+
+class UartStreamOverflowPolicy(Enum):
+    # Values are lower case, so the policy can also be given as string, like overflow="drop_oldest".
+    DROP_OLDEST =                      "drop_oldest"  # Drop the oldest event in the buffer, to make room for the new one.
+    DROP_NEWEST =                      "drop_newest"  # Drop the new event.
+
+class UartSampleFormat(Enum):
+    # Values are lower case, so the format can also be given as string, like sampleFormat="numpy".
+    LIST =                             "list"   # List of ints.
+    ARRAY =                            "array"  # array.array of int16, 2 bytes per sample.
+    NUMPY =                            "numpy"  # numpy.ndarray of int16, requires numpy to be installed.
@@ -0,0 +1,286 @@
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+import serial
+
+from crownstone_uart.core.UartEventBus import UartEventBus
+from crownstone_uart.core.containerClasses.UartWriteRequest import UartWriteRequest
+from crownstone_uart.core.uart.UartTypes import UartWriteQueueFullPolicy, UartWritePriority
+from crownstone_uart.topics.SystemTopics import SystemTopics
+from crownstone_uart.Exceptions import UartBridgeError, UartException
+
+_LOGGER = logging.getLogger(__name__)
+
+# Number of times in a row that waiting bulk packets may be passed by packets with a higher priority.
+BULK_STARVATION_LIMIT = 4
+
+
+class UartWriteQueue(threading.Thread):
+    """
+    Writes to the serial port on its own thread, so that callers never wait for the serial port.
+
+    Data that is queued while a write is in progress is joined, and written with a single write call.
+    For each queued packet, SystemTopics.uartWriteSuccess or SystemTopics.uartWriteError is emitted
+    from this thread, and the future that was returned by write() is resolved.
+
+    The queue can be bounded, in which case the queueFullPolicy determines what happens when it is full.
+
+    Packets are written in order of priority. High and normal priority packets are all joined in one write,
+    but bulk packets are written one at a time, so that a high priority packet never has to wait for more than one of them.
+    Bulk packets are written anyway after they have been passed BULK_STARVATION_LIMIT times in a row.
+    """
+
+    def __init__(self, serialController, writeChunkMaxSize=0, maxQueueSize=0, queueFullPolicy=UartWriteQueueFullPolicy.BLOCK, rateLimiter=None, eventBus=UartEventBus):
+        """
+        :param maxQueueSize:    Max number of packets waiting to be written. 0 for no limit.
+        :param queueFullPolicy: UartWriteQueueFullPolicy, what to do when a packet is written while the queue is full.
+        :param rateLimiter:     UartRateLimiter that spaces the writes, or None.
+        :param eventBus:        EventBus to emit the write results on.
+        """
+        self.eventBus = eventBus
+        self.serialController = serialController
+        self.writeChunkMaxSize = writeChunkMaxSize
+        self.maxQueueSize = maxQueueSize
+        self.queueFullPolicy = queueFullPolicy
+        self.rateLimiter = rateLimiter
+
+        # For each priority, list of [data, future, idempotent, queuedTimestamp, priority, supersedeKey].
+        self.queues = [[] for priority in UartWritePriority]
+        self.queueSize = 0
+        self.bulkSkipCount = 0
+        self.condition = threading.Condition()
+        self.running = True
+
+        # Idempotent packets that were not written because the queue was stopped or the write failed, as UartWriteRequest.
+        # These can be written again on a new connection.
+        self.unsentIdempotent = []
+
+        # Metrics
+        self.maxQueueDepth = 0
+        self.writtenCount = 0
+        self.droppedCount = 0
+        self.rejectedCount = 0
+        self.totalWaitTime = 0.0
+        self.maxWaitTime = 0.0
+
+        threading.Thread.__init__(self, daemon=True)
+
+    def write(self, data, idempotent=False, priority=UartWritePriority.NORMAL, supersedeKey=None) -> Future:
+        """
+        Queue data to be written. Returns immediately, unless the queue is full and the policy is to block.
+
+        :param data:         list of uint8, bytes or bytearray.
+        :param idempotent:   whether this packet may be written again after reconnecting, see UartWriteRequest.
+        :param priority:     UartWritePriority of this packet.
+        :param supersedeKey: when the queue is full, a waiting idempotent packet with the same key may be dropped for this one. None for no key.
+        :return:             Future that is resolved with True once the data has been written, or with a UartException when it failed.
+        """
+        future = Future()
+        with self.condition:
+            while self.running and self._isFull():
+                if self.queueFullPolicy == UartWriteQueueFullPolicy.REJECT:
+                    self.rejectedCount += 1
+                    raise UartException(UartBridgeError.WRITE_QUEUE_FULL, f"Write queue is full: {self.queueSize} packets are waiting.")
+                if self.queueFullPolicy == UartWriteQueueFullPolicy.DROP_OLDEST and idempotent and self._dropSuperseded(supersedeKey):
+                    break
+                if threading.current_thread() is self:
+                    # Written from a write result subscriber: waiting for ourselves would never end.
+                    break
+                self.condition.wait()
+
+            if not self.running:
+                future.set_exception(UartException(UartBridgeError.WRITE_QUEUE_STOPPED, "Write queue has been stopped."))
+                return future
+            self.queues[priority].append([data, future, idempotent, time.monotonic(), priority, supersedeKey])
+            self.queueSize += 1
+            self.maxQueueDepth = max(self.maxQueueDepth, self.queueSize)
+            self.condition.notify_all()
+        return future
+
+    def stop(self):
+        """
+        Stop the thread. Data that has not been written yet will be failed.
+        """
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+    def get_metrics(self) -> dict:
+        """
+        :return: dict with the current queue depth (total, and per priority), the max queue depth so far, the number of written, dropped and rejected packets,
+                 the average and max time in seconds that packets waited in the queue before being written,
+                 and the rate that is currently allowed by the rate limiter (see UartRateLimiter.get_rate()), or None.
+        """
+        with self.condition:
+            return {
+                "queueDepth":      self.queueSize,
+                "queueDepthPerPriority": {priority.name: len(self.queues[priority]) for priority in UartWritePriority},
+                "maxQueueDepth":   self.maxQueueDepth,
+                "written":         self.writtenCount,
+                "dropped":         self.droppedCount,
+                "rejected":        self.rejectedCount,
+                "averageWaitTime": self.totalWaitTime / self.writtenCount if self.writtenCount > 0 else 0.0,
+                "maxWaitTime":     self.maxWaitTime,
+                "rate":            self.rateLimiter.get_rate() if self.rateLimiter is not None else None,
+            }
+
+    def _collectUnsent(self, item):
+        if item[2]:
+            self.unsentIdempotent.append(UartWriteRequest(item[0], idempotent=True, priority=item[4], supersedeKey=item[5]))
+
+    def _isFull(self):
+        return self.maxQueueSize > 0 and self.queueSize >= self.maxQueueSize
+
+    def _dropSuperseded(self, supersedeKey):
+        """
+        Remove the oldest idempotent packet with the given supersede key from the queue. Must be called while holding the condition.
+
+        :param supersedeKey: key of the newer packet. Packets without key are never superseded.
+        :return:             True when a packet was dropped.
+        """
+        if supersedeKey is None:
+            return False
+
+        oldest = None
+        for queue in self.queues:
+            for item in queue:
+                if item[2] and item[5] == supersedeKey:
+                    if oldest is None or item[3] < oldest[1][3]:
+                        oldest = [queue, item]
+                    # Only the first matching packet of each queue can be the oldest.
+                    break
+
+        if oldest is None:
+            return False
+
+        queue, item = oldest
+        queue.remove(item)
+        self.queueSize -= 1
+        self.droppedCount += 1
+        _LOGGER.debug(f"Write queue full, dropped {item[0]}, superseded by a newer packet with key {supersedeKey}")
+        item[1].set_exception(UartException(UartBridgeError.WRITE_DROPPED, "Dropped from a full write queue, superseded by a newer packet."))
+        return True
+
+    def _takeBatch(self, maxPackets=None):
+        """
+        Take the packets that should be written next from the queues. Must be called while holding the condition.
+
+        :param maxPackets: Max number of packets to take, None for no limit.
+        """
+        batch = []
+        bulkQueue = self.queues[UartWritePriority.BULK]
+        # Reserve a spot for a bulk packet that has waited long enough.
+        if bulkQueue and self.bulkSkipCount >= BULK_STARVATION_LIMIT and maxPackets is not None:
+            maxPackets -= 1
+
+        for priority in UartWritePriority:
+            if priority != UartWritePriority.BULK:
+                queue = self.queues[priority]
+                count = len(queue) if maxPackets is None else min(len(queue), maxPackets - len(batch))
+                batch += queue[:count]
+                del queue[:count]
+
+        if bulkQueue:
+            if not batch or self.bulkSkipCount >= BULK_STARVATION_LIMIT:
+                batch.append(bulkQueue.pop(0))
+                self.bulkSkipCount = 0
+            else:
+                self.bulkSkipCount += 1
+
+        self.queueSize -= len(batch)
+        return batch
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and self.queueSize == 0:
+                    self.condition.wait()
+                if not self.running:
+                    break
+                maxPackets = None
+                if self.rateLimiter is not None:
+                    delay = self.rateLimiter.get_delay()
+                    if delay > 0:
+                        # Packets with a higher priority may come in while waiting.
+                        self.condition.wait(delay)
+                        continue
+                    maxPackets = self.rateLimiter.get_packet_allowance()
+                batch = self._takeBatch(maxPackets)
+                # Room for blocked writers.
+                self.condition.notify_all()
+
+                now = time.monotonic()
+                for item in batch:
+                    waitTime = now - item[3]
+                    self.totalWaitTime += waitTime
+                    self.maxWaitTime = max(self.maxWaitTime, waitTime)
+                self.writtenCount += len(batch)
+
+            if self.rateLimiter is not None:
+                self.rateLimiter.consume(len(batch), sum(len(item[0]) for item in batch))
+            self._write(batch)
+
+        with self.condition:
+            batch = [item for queue in self.queues for item in queue]
+            self.queues = [[] for priority in UartWritePriority]
+            self.queueSize = 0
+        for item in batch:
+            self._collectUnsent(item)
+            item[1].set_exception(UartException(UartBridgeError.WRITE_QUEUE_STOPPED, "Write queue has been stopped."))
+
+    def _write(self, batch):
+        if len(batch) == 1:
+            joinedData = batch[0][0]
+        else:
+            joinedData = bytearray()
+            for item in batch:
+                joinedData += bytes(item[0])
+
+        error = None
+        try:
+            if self.writeChunkMaxSize == 0:
+                self.serialController.write(joinedData)
+            else:
+                # writing in chunks solves issues writing to certain JLink chips. A max chunkSize of 64 was found to work well for our case.
+                chunkSize = self.writeChunkMaxSize
+                index = 0
+                while (index*chunkSize) < len(joinedData):
+                    chunkedData = joinedData[index*chunkSize:chunkSize*(index+1)]
+                    index += 1
+                    self.serialController.write(chunkedData)
+        except serial.SerialTimeoutException as e:
+            error = {"message":"Timeout on uart write.", "error": e}
+        except serial.SerialException as e:
+            error = {"message":"SerialException occurred during uart write", "error": e}
+        except OSError as e:
+            error = {"message":"OSError occurred during uart write.", "error": e}
+        except Exception as e:
+            error = {"message": "Unknown Exception during uart write.", "error": e}
+        except:
+            e = sys.exc_info()[0]
+            error = {"message":"Unknown error during uart write.", "error": e}
+
+        if error is not None:
+            exception = UartException(UartBridgeError.WRITE_FAILED, error["message"])
+            if isinstance(error["error"], BaseException):
+                exception.__cause__ = error["error"]
+
+        for item in batch:
+            data, future = item[0], item[1]
+            # Exceptions raised by subscribers should not stop the writer.
+            try:
+                if error is None:
+                    self.eventBus.emit(SystemTopics.uartWriteSuccess, data)
+                else:
+                    self.eventBus.emit(SystemTopics.uartWriteError, {**error, "data": data})
+            except Exception as e:
+                _LOGGER.debug(f"Exception in write result subscriber: {e}")
+
+            if error is None:
+                future.set_result(True)
+            else:
+                self._collectUnsent(item)
+                future.set_exception(exception)
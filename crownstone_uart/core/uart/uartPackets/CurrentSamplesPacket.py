@@ -1,4 +1,8 @@
-from crownstone_core.util.Conversion import Conversion
+import struct
+import sys
+from array import array
+
+from crownstone_uart.core.uart.UartTypes import UartSampleFormat
 
 COUNTER_FREQUENCY = 1.0 / 32768.0
 
@@ -11,16 +15,41 @@ class CurrentSamplesPacket:
 
     typeDescription = 'current'
 
+    # Little endian uint32 timestamp, followed by the int16 samples.
+    packetFormat = struct.Struct(f"<I{amountOfSamples}h")
+
 
-    def __init__(self, payload):
+    def __init__(self, payload, sampleFormat=UartSampleFormat.LIST):
+        """
+        :param payload:      List of uint8, or a bytes-like object, like a memoryview.
+        :param sampleFormat: UartSampleFormat, or its value as string, the type of the samples.
+                             A list of ints by default, an array or numpy array keeps them as int16.
+        """
         if len(payload) < self.packetSize:
             print("ERROR: INVALID PAYLOAD LENGTH", len(payload), payload)
             return
-        
-        self.timestampCounter = Conversion.uint8_array_to_uint32(payload[0:4])
-        self.samples = []
-        for i in range(4, self.packetSize, self.sampleSize):
-            self.samples.append(Conversion.uint8_array_to_int16(payload[i:i+self.sampleSize]))
+
+        if isinstance(payload, list):
+            payload = bytes(payload)
+
+        sampleFormat = UartSampleFormat(sampleFormat)
+        if sampleFormat == UartSampleFormat.LIST:
+            values = self.packetFormat.unpack_from(payload)
+            self.timestampCounter = values[0]
+            self.samples = list(values[1:])
+            return
+
+        self.timestampCounter = struct.unpack_from("<I", payload)[0]
+        if sampleFormat == UartSampleFormat.NUMPY:
+            # numpy is an optional dependency, so it is only imported when used.
+            import numpy
+            # This is a read only view on the payload, use samples.copy() to modify it.
+            self.samples = numpy.frombuffer(payload, dtype="<i2", count=self.amountOfSamples, offset=self.timestampSize)
+        else:
+            self.samples = array("h")
+            self.samples.frombytes(payload[self.timestampSize : self.packetSize])
+            if sys.byteorder == "big":
+                self.samples.byteswap()
 
     def getDict(self):
         data = {}
@@ -30,4 +59,4 @@ class CurrentSamplesPacket:
         data["timestamp"] = self.timestampCounter
         data["data"] = self.samples
 
-        return data
\ No newline at end of file
+        return data
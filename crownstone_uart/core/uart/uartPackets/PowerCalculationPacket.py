@@ -1,4 +1,4 @@
-from crownstone_core.util.Conversion import Conversion
+import struct
 
 
 class PowerCalculationPacket:
@@ -6,6 +6,9 @@ class PowerCalculationPacket:
 	sampleSize = 4
 	packetSize = amountOfSamples * sampleSize
 
+	# Little endian int32 values.
+	packetFormat = struct.Struct(f"<{amountOfSamples}i")
+
 	def __init__(self, payload):
 		self.currentRmsMA = 0
 		self.currentRmsMedianMA = 0
@@ -21,32 +24,20 @@ class PowerCalculationPacket:
 			print("ERROR: INVALID PAYLOAD LENGTH", len(payload), payload)
 			return
 
-		i = 0
-		self.currentRmsMA 				= Conversion.uint8_array_to_int32(payload[i:i+self.sampleSize])
-		i += self.sampleSize
-
-		self.currentRmsMedianMA 		= Conversion.uint8_array_to_int32(payload[i:i+self.sampleSize])
-		i += self.sampleSize
-
-		self.filteredCurrentRmsMA 		= Conversion.uint8_array_to_int32(payload[i:i+self.sampleSize])
-		i += self.sampleSize
-
-		self.filteredCurrentRmsMedianMA = Conversion.uint8_array_to_int32(payload[i:i+self.sampleSize])
-		i += self.sampleSize
-
-		self.avgZeroVoltage 			= Conversion.uint8_array_to_int32(payload[i:i+self.sampleSize])
-		i += self.sampleSize
-
-		self.avgZeroCurrent 			= Conversion.uint8_array_to_int32(payload[i:i+self.sampleSize])
-		i += self.sampleSize
-
-		self.powerMilliWattApparent 	= Conversion.uint8_array_to_int32(payload[i:i+self.sampleSize])
-		i += self.sampleSize
-
-		self.powerMilliWattReal 		= Conversion.uint8_array_to_int32(payload[i:i+self.sampleSize])
-		i += self.sampleSize
-
-		self.avgPowerMilliWattReal 		= Conversion.uint8_array_to_int32(payload[i:i+self.sampleSize])
+		if isinstance(payload, list):
+			payload = bytes(payload)
+
+		(
+			self.currentRmsMA,
+			self.currentRmsMedianMA,
+			self.filteredCurrentRmsMA,
+			self.filteredCurrentRmsMedianMA,
+			self.avgZeroVoltage,
+			self.avgZeroCurrent,
+			self.powerMilliWattApparent,
+			self.powerMilliWattReal,
+			self.avgPowerMilliWattReal,
+		) = self.packetFormat.unpack_from(payload)
 
 	def getDict(self):
 		data = {}
@@ -0,0 +1,13 @@
+from crownstone_core.util.Conversion import Conversion
+
+
+class UartCommandHeartbeatPacket:
+    """
+    UART command heartbeat packet:
+    2B timeout in seconds
+    """
+    def __init__(self, timeout: int):
+        self.timeout = timeout
+
+    def serialize(self):
+        return Conversion.uint16_to_uint8_array(self.timeout)
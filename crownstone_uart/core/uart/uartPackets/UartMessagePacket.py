@@ -6,6 +6,9 @@ from crownstone_core.util.Conversion import Conversion
 
 from crownstone_uart.core.uart.UartTypes import UartTxType
 
+# Size of the opcode field.
+OPCODE_SIZE = 2
+
 _LOGGER = logging.getLogger(__name__)
 
 class UartMessagePacket:
@@ -26,12 +29,21 @@ class UartMessagePacket:
 		else:
 			self.payload = payload
 
-	def parse(self, data: list):
+	def parse(self, data: list or memoryview):
 		"""
 		Parses data.
+		When the data is a memoryview, the payload will be a memoryview on the same data, so nothing is copied.
 
 		:returns True on success.
 		"""
+		if isinstance(data, memoryview):
+			if len(data) < OPCODE_SIZE:
+				_LOGGER.warning(F"Parse error: data too short: {len(data)}")
+				return False
+			self.opCode = data[0] + (data[1] << 8)
+			self.payload = data[OPCODE_SIZE:]
+			return True
+
 		try:
 			reader = BufferReader(data)
 			self.opCode = reader.getUInt16()
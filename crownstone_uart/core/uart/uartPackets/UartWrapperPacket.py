@@ -2,9 +2,9 @@ import logging
 
 from crownstone_core.Exceptions import CrownstoneException
 from crownstone_core.util.BufferReader import BufferReader
-from crownstone_core.util.CRC import crc16ccitt
 from crownstone_core.util.Conversion import Conversion
 from crownstone_uart.core.uart.UartTypes import UartMessageType
+from crownstone_uart.util.CRC import crc16ccitt
 
 PROTOCOL_MAJOR = 1
 PROTOCOL_MINOR = 0
@@ -65,12 +65,23 @@ class UartWrapperPacket:
 
 		return escapedPayload
 
-	def parse(self, buffer: list):
+	def parse(self, buffer: list or memoryview):
 		"""
 		Parses data between size field and CRC.
+		When the buffer is a memoryview, the payload will be a memoryview on the same data, so nothing is copied.
 
 		:returns True on success.
 		"""
+		if isinstance(buffer, memoryview):
+			if len(buffer) < WRAPPER_HEADER_SIZE:
+				_LOGGER.warning(F"Parse error: buffer too short: {len(buffer)}")
+				return False
+			self.protocolMajor = buffer[0]
+			self.protocolMinor = buffer[1]
+			self.messageType   = buffer[2]
+			self.payload       = buffer[WRAPPER_HEADER_SIZE:]
+			return True
+
 		reader = BufferReader(buffer)
 		try:
 			self.protocolMajor = reader.getUInt8()
@@ -1,7 +1,8 @@
+from crownstone_uart.core.uart.UartTypes import UartSampleFormat
 from crownstone_uart.core.uart.uartPackets.CurrentSamplesPacket import CurrentSamplesPacket
 
 
 class VoltageSamplesPacket(CurrentSamplesPacket):
-	def __init__(self, payload):
-		super().__init__(payload)
+	def __init__(self, payload, sampleFormat=UartSampleFormat.LIST):
+		super().__init__(payload, sampleFormat)
 		self.type = 'voltage'
@@ -4,11 +4,15 @@ class SystemTopics:
     stateUpdate           = "stateUpdate"            # used to propagate verified state messages through the system
     uartNewPackage        = 'uartNewPackage'         # Sent when a UART packet is received. Data is a UartWrapperPacket.
     uartNewMessage        = 'uartNewMessage'         # Sent when a UART message is received. Data is a UartMessagePacket.
-    uartWriteData         = 'uartWriteData'          # used to write to the UART. Data is array of bytes.
+    uartNewPackageBatch   = 'uartNewPackageBatch'    # Sent instead of uartNewPackage when using batch delivery. Data is a list of UartWrapperPackets from one serial read.
+    uartNewMessageBatch   = 'uartNewMessageBatch'    # Sent instead of uartNewMessage when using batch delivery. Data is a list of UartMessagePackets from one serial read.
+    uartWriteData         = 'uartWriteData'          # used to write to the UART. Data is array of bytes, or a UartWriteRequest.
 
     uartWriteError        = 'uartWriteError'         # used to write to the UART. Data is array of bytes.
     uartWriteSuccess      = 'uartWriteSuccess'       # used to write to the UART. Data is array of bytes.
 
+    uartHeartbeat         = 'uartHeartbeat'          # Sent when a heartbeat reply is received.
+
     resultPacket          = 'resultPacket'           # data is a ResultPacket class instance
     meshResultPacket      = 'meshResultPacket'       # data is a list [CID, ResultPacket]
     meshResultFinalPacket = 'meshResultFinalPacket'  # data is a ResultPacket class instance
@@ -0,0 +1,8 @@
+from crownstone_uart.topics.SystemTopics import SystemTopics
+
+# Functions that get the value of a subscription key from the data of an event, for topics where the key is not an
+# attribute of the data. For all other topics, the key is an attribute, like the assetId of an AssetIdReport.
+TOPIC_KEY_GETTERS = {
+    SystemTopics.stateUpdate:      {"crownstoneId": lambda data: data[0]},  # Data is (crownstoneId, state).
+    SystemTopics.meshResultPacket: {"crownstoneId": lambda data: data[0]},  # Data is [crownstoneId, ResultPacket].
+}
@@ -0,0 +1,17 @@
+import binascii
+
+CRC16_CCITT_START_VALUE = 0xFFFF
+
+
+def crc16ccitt(data, startValue = CRC16_CCITT_START_VALUE) -> int:
+    """
+    CRC-16-CCITT (polynomial 0x1021, not reflected) as used by the Crownstone UART protocol.
+    Gives the same result as crownstone_core.util.CRC.crc16ccitt, but is computed in C by binascii.
+
+    :param data:        bytes, bytearray, memoryview or list of uint8.
+    :param startValue:  Initial value, or the CRC of the preceding data to continue a calculation.
+    :return:            uint16 CRC.
+    """
+    if isinstance(data, list):
+        data = bytes(data)
+    return binascii.crc_hqx(data, startValue)
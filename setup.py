@@ -14,6 +14,10 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/crownstone/crownstone-lib-python-uart",
     install_requires=list(package.strip() for package in open('requirements.txt')),
+    extras_require={
+        # Power log samples as numpy array, see set_sample_format().
+        'numpy': ['numpy'],
+    },
     classifiers=[
         'Programming Language :: Python :: 3.7'
     ],
@@ -0,0 +1,29 @@
+import random
+import unittest
+
+from crownstone_core.util.CRC import crc16ccitt as coreCrc16ccitt
+
+from crownstone_uart.util.CRC import crc16ccitt
+
+
+class TestCRC(unittest.TestCase):
+
+    def test_check_value(self):
+        self.assertEqual(crc16ccitt(b"123456789"), 0x29B1)
+
+    def test_same_as_crownstone_core(self):
+        randomGenerator = random.Random(1)
+        for size in [0, 1, 2, 7, 100]:
+            data = [randomGenerator.randrange(256) for i in range(size)]
+            expected = coreCrc16ccitt(data)
+            for dataType in [list, bytes, bytearray, lambda data: memoryview(bytes(data))]:
+                self.assertEqual(crc16ccitt(dataType(data)), expected, f"size={size} dataType={dataType}")
+
+    def test_continued(self):
+        data = bytes(range(50))
+        for split in [0, 1, 25, 50]:
+            self.assertEqual(crc16ccitt(data[split:], crc16ccitt(data[:split])), crc16ccitt(data))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import threading
+import unittest
+
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
+from crownstone_uart.topics.SystemTopics import SystemTopics
+
+
+class Subscriber:
+    """
+    Only referenced by its subscriptions, and unsubscribes when it is finalized, like the UartWriter.
+    """
+
+    def __init__(self, eventBus):
+        self.eventBus = eventBus
+        self.subscriptionId = eventBus.subscribe("topic", self.handle)
+
+    def __del__(self):
+        self.eventBus.unsubscribe(self.subscriptionId)
+
+    def handle(self, data):
+        pass
+
+
+class TestCopyOnWriteEventBus(unittest.TestCase):
+
+    def test_emit(self):
+        eventBus = CopyOnWriteEventBus()
+        events = []
+        subscriptionId = eventBus.subscribe("topic", events.append)
+        eventBus.emit("topic", 1)
+        eventBus.emit("other", 2)
+        eventBus.unsubscribe(subscriptionId)
+        eventBus.emit("topic", 3)
+        self.assertEqual(events, [1])
+        self.assertFalse(eventBus.has_subscribers("topic"))
+
+    def test_callback_error(self):
+        eventBus = CopyOnWriteEventBus()
+        events = []
+
+        def fail(data):
+            raise ValueError(data)
+
+        eventBus.subscribe("topic", fail)
+        eventBus.subscribe("topic", events.append)
+        with self.assertLogs("crownstone_uart.core.CopyOnWriteEventBus", "ERROR"):
+            eventBus.emit("topic", 1)
+        self.assertEqual(events, [1])
+
+    def test_once(self):
+        eventBus = CopyOnWriteEventBus()
+        events = []
+        eventBus.once("topic", events.append)
+        eventBus.emit("topic")
+        eventBus.emit("topic", 2)
+        self.assertEqual(events, [None])
+        self.assertFalse(eventBus.has_subscribers("topic"))
+
+    def test_keyed_emit(self):
+        eventBus = CopyOnWriteEventBus()
+        events = []
+        eventBus.subscribe(SystemTopics.stateUpdate, events.append, crownstoneId=1)
+        eventBus.emit(SystemTopics.stateUpdate, (1, "state"))
+        eventBus.emit(SystemTopics.stateUpdate, (2, "state"))
+        self.assertEqual(events, [(1, "state")])
+        self.assertEqual(eventBus.get_subscriber_count(SystemTopics.stateUpdate), 1)
+
+    def test_subscription_ids(self):
+        eventBus = CopyOnWriteEventBus()
+        subscriptionIds = [eventBus.subscribe("topic", print), eventBus.subscribe("topic", print, crownstoneId=1), eventBus.subscribe("topic", print)]
+        eventBus.subscribe("other", print)
+        eventBus.unsubscribe(subscriptionIds.pop())
+        self.assertEqual(eventBus.get_subscription_ids("topic"), set(subscriptionIds))
+        self.assertEqual(eventBus.get_subscriber_count("topic"), 2)
+        self.assertEqual(eventBus.get_subscription_ids("none"), set())
+
+    def test_unsubscribe_from_finalizer(self):
+        eventBus = CopyOnWriteEventBus()
+        otherIds = [eventBus.subscribe("topic", print) for i in range(3)]
+        subscriber = Subscriber(eventBus)
+        # Only marked as removed, so the tuple of subscribers still refers to it.
+        eventBus.unsubscribe(subscriber.subscriptionId)
+        del subscriber
+
+        # Rebuilding the tuple drops the last reference to the Subscriber, which then unsubscribes again.
+        thread = threading.Thread(target=eventBus.unsubscribe, args=(otherIds[0],), daemon=True)
+        thread.start()
+        thread.join(2)
+        self.assertFalse(thread.is_alive(), "Deadlock in unsubscribe")
+        self.assertEqual(eventBus.get_subscriber_count("topic"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from crownstone_uart import CrownstoneUart, CopyOnWriteEventBus, UartEventBus, UartConnectionOptions
+from crownstone_uart.topics.SystemTopics import SystemTopics
+
+
+class TestCrownstoneUart(unittest.TestCase):
+
+    def test_own_event_bus(self):
+        uarts = [CrownstoneUart(CopyOnWriteEventBus()), CrownstoneUart(CopyOnWriteEventBus())]
+        for uart in uarts:
+            self.addCleanup(uart.stop)
+        globalEvents = []
+        subscriptionId = UartEventBus.subscribe(SystemTopics.newCrownstoneFound, globalEvents.append)
+        self.addCleanup(UartEventBus.unsubscribe, subscriptionId)
+
+        uarts[0].eventBus.emit(SystemTopics.newCrownstoneFound, 5)
+        uarts[1].eventBus.emit(SystemTopics.newCrownstoneFound, 6)
+        self.assertEqual(uarts[0].get_crownstone_ids(), [5])
+        self.assertEqual(uarts[1].get_crownstone_ids(), [6])
+        self.assertEqual(globalEvents, [])
+
+    def test_sync_rejects_loop_options(self):
+        uart = CrownstoneUart(CopyOnWriteEventBus())
+        self.addCleanup(uart.stop)
+        for options in [UartConnectionOptions(asyncTransport=True), UartConnectionOptions(dispatchToLoop=True)]:
+            with self.assertRaises(ValueError):
+                uart.initialize_usb_sync("/dev/missing", options=options)
+        self.assertFalse(uart.uartManager.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
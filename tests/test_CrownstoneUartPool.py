@@ -0,0 +1,74 @@
+import unittest
+
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
+from crownstone_uart.core.CrownstoneUartPool import CrownstoneUartPool
+from crownstone_uart.topics.SystemTopics import SystemTopics
+from crownstone_uart.topics.UartTopics import UartTopics
+
+
+class State:
+    def __init__(self, timestamp=None):
+        if timestamp is not None:
+            self.timestamp = timestamp
+
+
+class AssetIdReport:
+    def __init__(self, assetId, rssi):
+        self.assetId = assetId
+        self.rssi = rssi
+
+
+class TestCrownstoneUartPool(unittest.TestCase):
+
+    def setUp(self):
+        self.eventBus = CopyOnWriteEventBus()
+        self.pool = CrownstoneUartPool(self.eventBus)
+        self.uarts = [self.pool._addUart(), self.pool._addUart()]
+
+    def tearDown(self):
+        self.pool.stop()
+
+    def getEvents(self, topic, eventsPerUart):
+        """
+        Emit the events on the event bus of each Crownstone USB, and return the events that the pool emitted.
+        """
+        events = []
+        self.eventBus.subscribe(topic, events.append)
+        for uartEvents, uart in zip(eventsPerUart, self.uarts):
+            for event in uartEvents:
+                uart.eventBus.emit(topic, event)
+        return events
+
+    def test_state_update_deduplication(self):
+        state = State(timestamp=100)
+        newerState = State(timestamp=101)
+        events = self.getEvents(SystemTopics.stateUpdate, [
+            [(1, state), (2, state)],
+            [(1, state), (1, newerState)],
+        ])
+        self.assertEqual(events, [(1, state), (2, state), (1, newerState)])
+
+    def test_state_update_without_timestamp(self):
+        state = State()
+        events = self.getEvents(SystemTopics.stateUpdate, [[(1, state)], [(1, state)]])
+        self.assertEqual(events, [(1, state), (1, state)])
+
+    def test_asset_report_deduplication(self):
+        report = AssetIdReport([1, 2, 3], -60)
+        otherReport = AssetIdReport([1, 2, 3], -70)
+        events = self.getEvents(UartTopics.assetIdReport, [
+            [report],
+            [AssetIdReport([1, 2, 3], -60), otherReport],
+        ])
+        self.assertEqual(events, [report, otherReport])
+
+    def test_stop_unsubscribes(self):
+        self.pool.stop()
+        report = AssetIdReport([1, 2, 3], -60)
+        events = self.getEvents(UartTopics.assetIdReport, [[report], [report]])
+        self.assertEqual(events, [])
+        self.assertFalse(self.uarts[0].eventBus.has_subscribers(UartTopics.assetIdReport))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import asyncio
+import threading
+import unittest
+
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
+from crownstone_uart.core.dataFlowManagers.EventStream import EventStream
+from crownstone_uart.core.uart.UartTypes import UartStreamOverflowPolicy
+
+
+class TestEventStream(unittest.TestCase):
+
+    def setUp(self):
+        self.eventBus = CopyOnWriteEventBus()
+
+    def test_events_from_other_thread(self):
+        async def collect():
+            events = []
+            async with EventStream("topic", eventBus=self.eventBus) as stream:
+                emitter = threading.Thread(target=lambda: [self.eventBus.emit("topic", i) for i in range(3)])
+                emitter.start()
+                async for event in stream:
+                    events.append(event)
+                    if len(events) == 3:
+                        break
+                emitter.join()
+            return events
+
+        self.assertEqual(asyncio.run(asyncio.wait_for(collect(), 2)), [0, 1, 2])
+        self.assertFalse(self.eventBus.has_subscribers("topic"))
+
+    def test_overflow(self):
+        async def collect(overflow):
+            stream = EventStream("topic", maxsize=2, overflow=overflow, eventBus=self.eventBus)
+            for i in range(4):
+                self.eventBus.emit("topic", i)
+            stream.close()
+            return [event async for event in stream], stream.get_metrics()
+
+        self.assertEqual(asyncio.run(collect(UartStreamOverflowPolicy.DROP_OLDEST)), ([2, 3], {"received": 4, "dropped": 2, "bufferDepth": 0}))
+        self.assertEqual(asyncio.run(collect("drop_newest")), ([0, 1], {"received": 4, "dropped": 2, "bufferDepth": 0}))
+
+    def test_without_running_loop(self):
+        with self.assertRaises(RuntimeError):
+            EventStream("topic", eventBus=self.eventBus)
+        self.assertFalse(self.eventBus.has_subscribers("topic"))
+
+
+if __name__ == "__main__":
+    unittest.main()
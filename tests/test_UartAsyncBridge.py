@@ -0,0 +1,129 @@
+import asyncio
+import os
+import queue
+import select
+import unittest
+
+try:
+    import pty
+    import tty
+except ImportError:
+    # Not available on Windows, where the UartAsyncBridge can't be used either.
+    pty = None
+
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
+from crownstone_uart.core.uart.UartAsyncBridge import UartAsyncBridge
+from crownstone_uart.core.uart.UartTypes import UartRxType, UartTxType
+from crownstone_uart.core.uart.uartPackets.UartMessagePacket import UartMessagePacket
+from crownstone_uart.core.uart.uartPackets.UartWrapperPacket import UartWrapperPacket
+from crownstone_uart.topics.SystemTopics import SystemTopics
+from crownstone_uart.Exceptions import UartBridgeError
+
+TIMEOUT = 2
+
+
+def getFrame(opCode, payload):
+    messagePacket = UartMessagePacket(opCode, list(payload)).serialize()
+    return bytes(UartWrapperPacket(payload=messagePacket).serialize())
+
+
+@unittest.skipIf(pty is None, "Requires a pseudo terminal")
+class TestUartAsyncBridge(unittest.TestCase):
+    """
+    The bridge is connected to one end of a pseudo terminal pair, the test plays the dongle on the other end.
+    """
+
+    def setUp(self):
+        self.eventBus = CopyOnWriteEventBus()
+        self.exceptionQueue = queue.Queue()
+        self.dongleFd, self.portFd = pty.openpty()
+        tty.setraw(self.dongleFd)
+        self.port = os.ttyname(self.portFd)
+
+    def tearDown(self):
+        for fd in [self.dongleFd, self.portFd]:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def readDongle(self, size):
+        data = b""
+        while len(data) < size and select.select([self.dongleFd], [], [], TIMEOUT)[0]:
+            data += os.read(self.dongleFd, size - len(data))
+        return data
+
+    async def startBridge(self, port):
+        loop = asyncio.get_running_loop()
+        bridge = UartAsyncBridge(loop, self.exceptionQueue, port, 230400, eventBus=self.eventBus)
+        bridge.start()
+        self.assertTrue(await loop.run_in_executor(None, bridge.startedEvent.wait, TIMEOUT))
+        return bridge
+
+    async def stopBridge(self, bridge):
+        bridge.stop()
+        await asyncio.get_running_loop().run_in_executor(None, bridge.join, TIMEOUT)
+        self.assertTrue(bridge.closedEvent.is_set())
+
+    async def waitFor(self, condition):
+        for i in range(int(TIMEOUT / 0.01)):
+            if condition():
+                return
+            await asyncio.sleep(0.01)
+        self.fail("Timed out")
+
+    def test_read_and_write(self):
+        async def run():
+            messages = []
+            self.eventBus.subscribe(SystemTopics.uartNewMessage, lambda message: messages.append(bytes(message.payload)))
+            bridge = await self.startBridge(self.port)
+            self.assertTrue(bridge.started)
+
+            # Read: the frames are emitted on the event loop.
+            frame = getFrame(UartRxType.UART_MESSAGE, b"hello")
+            os.write(self.dongleFd, frame + frame[:5])
+            await self.waitFor(lambda: len(messages) == 1)
+            os.write(self.dongleFd, frame[5:])
+            await self.waitFor(lambda: len(messages) == 2)
+            self.assertEqual(messages, [b"hello", b"hello"])
+
+            # Write: via the write queue of the bridge.
+            frame = getFrame(UartTxType.HELLO, [])
+            self.assertTrue(await asyncio.wrap_future(bridge.write_to_uart(frame)))
+            self.assertEqual(await asyncio.get_running_loop().run_in_executor(None, self.readDongle, len(frame)), frame)
+
+            await self.stopBridge(bridge)
+            self.assertTrue(self.exceptionQueue.empty())
+
+        asyncio.run(asyncio.wait_for(run(), 2 * TIMEOUT))
+
+    def test_unplugged(self):
+        async def run():
+            closed = []
+            self.eventBus.subscribe(SystemTopics.connectionClosed, closed.append)
+            bridge = await self.startBridge(self.port)
+
+            # The read fails once the other end is closed.
+            os.close(self.dongleFd)
+            await asyncio.get_running_loop().run_in_executor(None, bridge.join, TIMEOUT)
+            self.assertTrue(bridge.closedEvent.is_set())
+            self.assertEqual(closed, [True])
+            self.assertIsNone(bridge.serialController)
+            await self.stopBridge(bridge)
+
+        asyncio.run(asyncio.wait_for(run(), 2 * TIMEOUT))
+
+    def test_open_fails(self):
+        async def run():
+            bridge = await self.startBridge(self.port + "-missing")
+            self.assertFalse(bridge.started)
+            await self.stopBridge(bridge)
+
+            exception, exceptionValue, trace = self.exceptionQueue.get(block=False)
+            self.assertEqual(exceptionValue.args[0], UartBridgeError.CANNOT_OPEN_SERIAL_CONTROLLER)
+
+        asyncio.run(asyncio.wait_for(run(), 2 * TIMEOUT))
+
+
+if __name__ == "__main__":
+    unittest.main()
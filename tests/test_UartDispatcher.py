@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
+from crownstone_uart.core.uart.UartDispatcher import UartDispatcher
+
+TIMEOUT = 2
+
+
+class TestUartDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.eventBus = CopyOnWriteEventBus()
+        self.events = []
+        self.eventBus.subscribe("topic", lambda data: self.events.append((data, threading.current_thread())))
+
+    def test_thread(self):
+        dispatcher = UartDispatcher(10, eventBus=self.eventBus)
+        dispatcher.start()
+        for i in range(3):
+            dispatcher.emit("topic", i)
+        dispatcher.stop()
+        dispatcher.thread.join(TIMEOUT)
+
+        self.assertEqual([data for data, thread in self.events], [0, 1, 2])
+        self.assertTrue(all(thread is dispatcher.thread for data, thread in self.events))
+        self.assertEqual(dispatcher.get_metrics()["dispatched"], 3)
+
+    def test_loop(self):
+        async def run():
+            dispatcher = UartDispatcher(10, asyncio.get_running_loop(), self.eventBus)
+            dispatcher.start()
+            # Emitted by the reader thread.
+            reader = threading.Thread(target=lambda: [dispatcher.emit("topic", i) for i in range(3)])
+            reader.start()
+            reader.join()
+            while len(self.events) < 3:
+                await asyncio.sleep(0.01)
+
+        asyncio.run(asyncio.wait_for(run(), TIMEOUT))
+        self.assertEqual([data for data, thread in self.events], [0, 1, 2])
+        self.assertTrue(all(thread is threading.main_thread() for data, thread in self.events))
+
+    def test_full(self):
+        # A slow subscriber blocks the dispatcher, while the reader goes on.
+        gate = threading.Event()
+        self.eventBus.subscribe("slow", lambda data: gate.wait(TIMEOUT))
+        dispatcher = UartDispatcher(2, eventBus=self.eventBus)
+        dispatcher.start()
+        dispatcher.emit("slow")
+        while dispatcher.get_metrics()["queueDepth"] > 0:
+            time.sleep(0.001)
+        for i in range(5):
+            dispatcher.emit("topic", i)
+        gate.set()
+        dispatcher.stop()
+        dispatcher.thread.join(TIMEOUT)
+
+        self.assertEqual([data for data, thread in self.events], [0, 1])
+        self.assertEqual(dispatcher.get_metrics(), {"queueDepth": 0, "maxQueueDepth": 2, "maxQueueSize": 2, "dispatched": 3, "dropped": 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
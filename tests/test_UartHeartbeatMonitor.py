@@ -0,0 +1,69 @@
+import threading
+import unittest
+
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
+from crownstone_uart.core.uart.UartHeartbeatMonitor import UartHeartbeatMonitor
+from crownstone_uart.core.uart.UartTypes import UartWritePriority
+from crownstone_uart.topics.SystemTopics import SystemTopics
+
+INTERVAL = 0.02
+TIMEOUT = 2
+
+
+class TestUartHeartbeatMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.eventBus = CopyOnWriteEventBus()
+        self.writeRequests = []
+        self.replying = True
+        self.repliedEvent = threading.Event()
+        # Like the dongle: reply to each heartbeat right away.
+        self.eventBus.subscribe(SystemTopics.uartWriteData, self.handleWrite)
+        self.failedEvent = threading.Event()
+        self.monitor = UartHeartbeatMonitor(INTERVAL, maxMissed=2, onFailure=self.failedEvent.set, eventBus=self.eventBus)
+
+    def tearDown(self):
+        self.monitor.stop()
+        self.monitor.join(TIMEOUT)
+
+    def handleWrite(self, writeRequest):
+        self.writeRequests.append(writeRequest)
+        if self.replying:
+            self.eventBus.emit(SystemTopics.uartHeartbeat)
+            self.repliedEvent.set()
+
+    def test_replies(self):
+        self.monitor.start()
+        self.assertTrue(self.repliedEvent.wait(TIMEOUT))
+        self.monitor.stop()
+        self.monitor.join(TIMEOUT)
+
+        metrics = self.monitor.get_metrics()
+        self.assertGreater(metrics["sent"], 0)
+        self.assertEqual(metrics["missed"], 0)
+        self.assertIsNotNone(metrics["averageRoundTripTime"])
+        self.assertEqual(sum(metrics["histogram"].values()), metrics["sent"])
+        self.assertFalse(self.failedEvent.is_set())
+
+        # Heartbeats may replace each other in a full write queue.
+        writeRequest = self.writeRequests[0]
+        self.assertTrue(writeRequest.idempotent)
+        self.assertEqual(writeRequest.priority, UartWritePriority.HIGH)
+        self.assertEqual(writeRequest.supersedeKey, "heartbeat")
+
+    def test_failure(self):
+        self.replying = False
+        self.monitor.start()
+        self.assertTrue(self.failedEvent.wait(TIMEOUT))
+        self.monitor.join(TIMEOUT)
+        self.assertFalse(self.monitor.is_alive())
+
+        metrics = self.monitor.get_metrics()
+        self.assertEqual(metrics["missed"], 2)
+        self.assertEqual(metrics["consecutiveMissed"], 2)
+        self.assertIsNone(metrics["lastRoundTripTime"])
+        self.assertFalse(self.eventBus.has_subscribers(SystemTopics.uartHeartbeat))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import os
+import select
+import tempfile
+import threading
+import time
+import unittest
+
+try:
+    import pty
+    import tty
+except ImportError:
+    pty = None
+
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
+from crownstone_uart.core.containerClasses.UartConnectionOptions import UartConnectionOptions
+from crownstone_uart.core.uart.UartManager import UartManager
+from crownstone_uart.core.uart.UartTypes import UartRxType
+from crownstone_uart.core.uart.uartPackets.UartMessagePacket import UartMessagePacket
+from crownstone_uart.core.uart.uartPackets.UartWrapperPacket import UartWrapperPacket
+from crownstone_uart.topics.SystemTopics import SystemTopics
+from crownstone_uart.Exceptions import UartBridgeError, UartException
+
+TIMEOUT = 3
+
+
+def getFrame(opCode, payload):
+    messagePacket = UartMessagePacket(opCode, list(payload)).serialize()
+    return bytes(UartWrapperPacket(payload=messagePacket).serialize())
+
+
+class FakeDongle:
+    """
+    Pseudo terminal pair, of which the port is linked at a fixed path, so it can be unplugged and plugged in again.
+    While replying, it replies to everything it receives with a hello and a heartbeat.
+    """
+
+    def __init__(self, link):
+        self.fd, self.portFd = pty.openpty()
+        tty.setraw(self.fd)
+        if os.path.lexists(link):
+            os.remove(link)
+        os.symlink(os.ttyname(self.portFd), link)
+        self.replying = True
+        self.running = True
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def unplug(self):
+        self.running = False
+        self.thread.join()
+        os.close(self.portFd)
+        os.close(self.fd)
+
+    def _serve(self):
+        while self.running:
+            if not select.select([self.fd], [], [], 0.01)[0]:
+                continue
+            try:
+                os.read(self.fd, 1000)
+            except OSError:
+                return
+            if self.replying:
+                os.write(self.fd, getFrame(UartRxType.HELLO, [1, 0]) + getFrame(UartRxType.HEARTBEAT, []))
+
+
+@unittest.skipIf(pty is None, "Requires a pseudo terminal")
+class TestUartManager(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.port = os.path.join(directory.name, "dongle")
+        self.dongle = FakeDongle(self.port)
+
+        self.eventBus = CopyOnWriteEventBus()
+        self.established = []
+        self.eventBus.subscribe(SystemTopics.connectionEstablished, self.established.append)
+        self.uartManager = UartManager(self.eventBus)
+
+    def tearDown(self):
+        self.uartManager.stop()
+        if self.uartManager.ident is not None:
+            self.uartManager.join(TIMEOUT)
+            self.assertFalse(self.uartManager.is_alive())
+        if self.dongle is not None:
+            self.dongle.unplug()
+
+    def startManager(self, **kwargs):
+        # Keep reconnecting to the same port, instead of scanning the ports of this machine.
+        self.uartManager.config(self.port, options=UartConnectionOptions(reconnectAttempts=1000, **kwargs))
+        self.uartManager.start()
+        self.assertTrue(self.uartManager.setupFuture.result(TIMEOUT))
+        self.assertTrue(self.uartManager.is_ready())
+
+    def waitReady(self, ready):
+        deadline = time.monotonic() + TIMEOUT
+        while self.uartManager.is_ready() != ready:
+            self.assertLess(time.monotonic(), deadline, f"Timed out waiting for ready={ready}")
+            time.sleep(0.01)
+
+    def test_reconnect_after_unplug(self):
+        self.startManager()
+
+        self.dongle.unplug()
+        self.dongle = None
+        self.waitReady(False)
+
+        self.dongle = FakeDongle(self.port)
+        self.waitReady(True)
+        self.assertEqual(len(self.established), 2)
+
+    def test_reconnect_after_missed_heartbeats(self):
+        self.startManager(heartbeatInterval=0.05, heartbeatMaxMissed=2)
+
+        # The port stays open, only the heartbeats tell that the dongle is stuck.
+        self.dongle.replying = False
+        self.waitReady(False)
+
+        self.dongle.replying = True
+        self.waitReady(True)
+        self.assertEqual(len(self.established), 2)
+        self.assertEqual(self.uartManager.get_heartbeat_metrics()["consecutiveMissed"], 0)
+
+    def test_setup_fails(self):
+        self.uartManager.config(self.port + "-missing")
+        self.uartManager.start()
+        with self.assertRaises(UartException) as context:
+            self.uartManager.setupFuture.result(TIMEOUT)
+        self.assertEqual(context.exception.args[0], UartBridgeError.CANNOT_OPEN_SERIAL_CONTROLLER)
+        self.assertFalse(self.uartManager.is_ready())
+
+    def test_setup_stopped(self):
+        self.uartManager.stop()
+        self.assertFalse(self.uartManager.setupFuture.result(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
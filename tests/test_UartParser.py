@@ -0,0 +1,66 @@
+import unittest
+
+import crownstone_uart.core.uart.UartParser as parserModule
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
+from crownstone_uart.core.uart.UartParser import UartParser, register_opcode_handler
+from crownstone_uart.core.uart.UartTypes import UartMessageType, UartRxType
+from crownstone_uart.core.uart.uartPackets.UartMessagePacket import UartMessagePacket
+from crownstone_uart.topics.SystemTopics import SystemTopics
+from crownstone_uart.topics.UartTopics import UartTopics
+
+
+class TestUartParser(unittest.TestCase):
+
+    def setUp(self):
+        self.eventBus = CopyOnWriteEventBus()
+        self.parser = UartParser(self.eventBus)
+
+    def tearDown(self):
+        self.parser.stop()
+
+    def isLogConsumed(self):
+        return self.parser.isFrameConsumed(UartMessageType.UART_MESSAGE, UartRxType.LOG)
+
+    def test_frame_consumed(self):
+        self.assertFalse(self.isLogConsumed())
+
+        subscriptionId = self.eventBus.subscribe(UartTopics.log, print)
+        self.assertTrue(self.isLogConsumed())
+        self.eventBus.unsubscribe(subscriptionId)
+        self.assertFalse(self.isLogConsumed())
+
+        # Raw messages consume every frame.
+        subscriptionId = self.eventBus.subscribe(SystemTopics.uartNewMessage, print)
+        self.assertTrue(self.isLogConsumed())
+        self.eventBus.unsubscribe(subscriptionId)
+        self.assertFalse(self.isLogConsumed())
+
+    def test_encrypted_frame_consumed(self):
+        self.assertTrue(self.parser.isFrameConsumed(UartMessageType.ENCRYPTED_UART_MESSAGE, UartRxType.LOG))
+
+    def registerHandler(self, opCode, decoder, topic=None, acceptsBuffer=False):
+        originalHandler = parserModule.OPCODE_HANDLERS[opCode]
+        self.addCleanup(register_opcode_handler, opCode, *originalHandler)
+        register_opcode_handler(opCode, decoder, topic, acceptsBuffer)
+
+    def test_register_opcode_handler(self):
+        self.registerHandler(UartRxType.PRESENCE_CHANGE, lambda payload: payload, "presence")
+        events = []
+        self.eventBus.subscribe("presence", events.append)
+        for payload in [[1, 2], memoryview(bytes([3, 4]))]:
+            self.eventBus.emit(SystemTopics.uartNewMessage, UartMessagePacket(UartRxType.PRESENCE_CHANGE, payload))
+        # Without acceptsBuffer, the decoder gets a list.
+        self.assertEqual(events, [[1, 2], [3, 4]])
+
+    def test_decoder_error(self):
+        def fail(payload):
+            raise ValueError("Invalid payload")
+
+        self.registerHandler(UartRxType.PRESENCE_CHANGE, fail, "presence")
+        self.eventBus.subscribe("presence", print)
+        with self.assertLogs("crownstone_uart.core.uart.UartParser", "ERROR"):
+            self.eventBus.emit(SystemTopics.uartNewMessage, UartMessagePacket(UartRxType.PRESENCE_CHANGE, [1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
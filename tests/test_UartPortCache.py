@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from serial.tools.list_ports_common import ListPortInfo
+
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
+from crownstone_uart.core.containerClasses.UartConnectionOptions import UartConnectionOptions
+from crownstone_uart.core.uart.UartManager import UartManager
+from crownstone_uart.core.uart.UartPortCache import UartPortCache
+
+CROWNSTONE_VID = 0x10C4
+
+
+def getPortInfo(device, vid=None, pid=None, serialNumber=None):
+    portInfo = ListPortInfo(device)
+    portInfo.vid = vid
+    portInfo.pid = pid
+    portInfo.serial_number = serialNumber
+    return portInfo
+
+
+class TestUartPortCache(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "port.json")
+
+    def test_store_and_load(self):
+        cache = UartPortCache(self.path)
+        self.assertIsNone(cache.load())
+        cache.store(getPortInfo("/dev/ttyUSB1", CROWNSTONE_VID, 0xEA60, "0001"))
+        self.assertEqual(UartPortCache(self.path).load(), {"device": "/dev/ttyUSB1", "serialNumber": "0001", "vid": CROWNSTONE_VID, "pid": 0xEA60})
+
+    def test_invalid_file(self):
+        for content in ["", "not json", "[]", "{}"]:
+            with open(self.path, "w") as file:
+                file.write(content)
+            self.assertIsNone(UartPortCache(self.path).load(), content)
+
+    def test_matches(self):
+        # The serial number is leading, as the device can change.
+        cachedPort = {"device": "/dev/ttyUSB1", "serialNumber": "0001", "vid": CROWNSTONE_VID, "pid": 0xEA60}
+        self.assertTrue(UartPortCache.matches(cachedPort, getPortInfo("/dev/ttyUSB0", CROWNSTONE_VID, 0xEA60, "0001")))
+        self.assertFalse(UartPortCache.matches(cachedPort, getPortInfo("/dev/ttyUSB1", CROWNSTONE_VID, 0xEA60, "0002")))
+
+        # Without serial number, the device has to match.
+        cachedPort = {"device": "/dev/ttyACM0", "serialNumber": None, "vid": None, "pid": None}
+        self.assertTrue(UartPortCache.matches(cachedPort, getPortInfo("/dev/ttyACM0")))
+        self.assertFalse(UartPortCache.matches(cachedPort, getPortInfo("/dev/ttyACM1")))
+
+    def test_available_ports(self):
+        ports = [
+            getPortInfo("/dev/ttyS0"),
+            getPortInfo("/dev/ttyUSB0", 0x1234, 1, "other"),
+            getPortInfo("/dev/ttyUSB1", CROWNSTONE_VID, 0xEA60, "0001"),
+            getPortInfo("/dev/ttyUSB2", CROWNSTONE_VID, 0xEA60, "0002"),
+        ]
+        UartPortCache(self.path).store(ports[3])
+
+        uartManager = UartManager(CopyOnWriteEventBus())
+        self.addCleanup(uartManager.stop)
+        with mock.patch("crownstone_uart.core.uart.UartManager.list_ports.comports", lambda: list(ports)):
+            # Without cache and vendor filter, all ports are tried in order.
+            uartManager.config(None)
+            self.assertEqual(uartManager._getAvailablePorts(), ports)
+
+            # The cached port first, ports with another vendor ID skipped.
+            uartManager.config(None, options=UartConnectionOptions(portCacheFile=self.path, usbVendorIds=[CROWNSTONE_VID]))
+            self.assertEqual([port.device for port in uartManager._getAvailablePorts()], ["/dev/ttyUSB2", "/dev/ttyS0", "/dev/ttyUSB1"])
+            self.assertTrue(uartManager._cachedPortAvailable)
+
+        usbPorts = ports[1:]
+        with mock.patch("crownstone_uart.core.uart.UartManager.list_ports.comports", lambda: list(usbPorts)):
+            # The vendor filter is ignored when it leaves no ports.
+            uartManager.config(None, options=UartConnectionOptions(usbVendorIds=[0x4321]))
+            self.assertEqual(uartManager._getAvailablePorts(), usbPorts)
+
+
+if __name__ == "__main__":
+    unittest.main()
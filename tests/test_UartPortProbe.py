@@ -0,0 +1,85 @@
+import os
+import select
+import threading
+import unittest
+
+try:
+    import pty
+    import tty
+except ImportError:
+    pty = None
+
+from crownstone_uart.core.uart.UartPortProbe import UartPortProbe
+from crownstone_uart.core.uart.UartTypes import UartRxType
+from crownstone_uart.core.uart.uartPackets.UartMessagePacket import UartMessagePacket
+from crownstone_uart.core.uart.uartPackets.UartWrapperPacket import UartWrapperPacket
+
+TIMEOUT = 2
+
+
+def getFrame(opCode, payload):
+    messagePacket = UartMessagePacket(opCode, list(payload)).serialize()
+    return bytes(UartWrapperPacket(payload=messagePacket).serialize())
+
+
+class FakePort:
+    """
+    Pseudo terminal pair. When it has a reply, it is written back on the first data that is received, like a dongle replying to the hello.
+    """
+
+    def __init__(self, reply=None):
+        self.fd, self.portFd = pty.openpty()
+        tty.setraw(self.fd)
+        self.port = os.ttyname(self.portFd)
+        self.reply = reply
+        self.received = b""
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        os.close(self.portFd)
+        os.close(self.fd)
+
+    def _serve(self):
+        while select.select([self.fd], [], [], TIMEOUT)[0]:
+            try:
+                data = os.read(self.fd, 1000)
+            except OSError:
+                return
+            if self.reply is not None and not self.received:
+                os.write(self.fd, self.reply)
+            self.received += data
+
+
+@unittest.skipIf(pty is None, "Requires a pseudo terminal")
+class TestUartPortProbe(unittest.TestCase):
+
+    def setUp(self):
+        self.ports = []
+
+    def tearDown(self):
+        for port in self.ports:
+            port.close()
+
+    def addPort(self, reply=None):
+        port = FakePort(reply)
+        self.ports.append(port)
+        return port.port
+
+    def test_found(self):
+        silentPort = self.addPort()
+        otherPort = self.addPort(reply=getFrame(UartRxType.UART_MESSAGE, b"not a hello"))
+        donglePort = self.addPort(reply=getFrame(UartRxType.HELLO, [1, 0]))
+        self.assertEqual(UartPortProbe([silentPort, "/dev/missing", otherPort, donglePort]).probe(), donglePort)
+        # A hello was sent to every port that could be opened.
+        self.assertTrue(all(port.received for port in self.ports))
+
+    def test_not_found(self):
+        silentPort = self.addPort()
+        otherPort = self.addPort(reply=getFrame(UartRxType.UART_MESSAGE, b"not a hello"))
+        self.assertIsNone(UartPortProbe([silentPort, otherPort, "/dev/missing"], timeout=0.1).probe())
+        self.assertIsNone(UartPortProbe([]).probe())
+
+
+if __name__ == "__main__":
+    unittest.main()
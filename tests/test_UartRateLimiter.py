@@ -0,0 +1,67 @@
+import unittest
+from unittest import mock
+
+from crownstone_core.protocol.BluenetTypes import ResultValue
+
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
+from crownstone_uart.core.uart.UartRateLimiter import UartRateLimiter, DECREASE_FACTOR, INCREASE_STEP
+from crownstone_uart.topics.SystemTopics import SystemTopics
+
+
+class ResultPacket:
+    def __init__(self, resultCode):
+        self.resultCode = resultCode
+
+
+class TestUartRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.eventBus = CopyOnWriteEventBus()
+        self.now = 100.0
+        patcher = mock.patch("crownstone_uart.core.uart.UartRateLimiter.time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_packets(self):
+        rateLimiter = UartRateLimiter(maxPacketsPerSecond=100, eventBus=self.eventBus)
+        # A burst of BURST_TIME seconds.
+        self.assertEqual(rateLimiter.get_packet_allowance(), 10)
+        self.assertEqual(rateLimiter.get_delay(), 0)
+
+        rateLimiter.consume(10, 1000)
+        self.assertEqual(rateLimiter.get_packet_allowance(), 0)
+        self.assertAlmostEqual(rateLimiter.get_delay(), 0.01)
+
+        self.now += 0.055
+        self.assertEqual(rateLimiter.get_packet_allowance(), 5)
+        self.assertEqual(rateLimiter.get_delay(), 0)
+
+    def test_bytes(self):
+        rateLimiter = UartRateLimiter(maxBytesPerSecond=1000, eventBus=self.eventBus)
+        self.assertIsNone(rateLimiter.get_packet_allowance())
+
+        # A large write goes into debt, which is paid by waiting.
+        rateLimiter.consume(1, 300)
+        self.assertAlmostEqual(rateLimiter.get_delay(), 0.2)
+        self.now += 0.2
+        self.assertAlmostEqual(rateLimiter.get_delay(), 0)
+
+    def test_adaptive(self):
+        rateLimiter = UartRateLimiter(maxPacketsPerSecond=100, maxBytesPerSecond=1000, adaptive=True, eventBus=self.eventBus)
+        self.eventBus.emit(SystemTopics.resultPacket, ResultPacket(ResultValue.BUSY))
+        self.assertEqual(rateLimiter.get_rate(), {"packetsPerSecond": 100 * DECREASE_FACTOR, "bytesPerSecond": 1000 * DECREASE_FACTOR, "busyCount": 1})
+
+        self.eventBus.emit(SystemTopics.resultPacket, ResultPacket(ResultValue.SUCCESS))
+        self.assertAlmostEqual(rateLimiter.get_rate()["packetsPerSecond"], 100 * (DECREASE_FACTOR + INCREASE_STEP))
+
+        rateLimiter.stop()
+        self.assertFalse(self.eventBus.has_subscribers(SystemTopics.resultPacket))
+
+    def test_not_adaptive(self):
+        rateLimiter = UartRateLimiter(maxPacketsPerSecond=100, eventBus=self.eventBus)
+        self.eventBus.emit(SystemTopics.resultPacket, ResultPacket(ResultValue.BUSY))
+        self.assertEqual(rateLimiter.get_rate(), {"packetsPerSecond": 100, "bytesPerSecond": None, "busyCount": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
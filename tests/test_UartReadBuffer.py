@@ -0,0 +1,185 @@
+import logging
+import struct
+import unittest
+
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
+from crownstone_uart.core.uart.UartParser import UartParser, OPCODE_HANDLERS
+from crownstone_uart.core.uart.UartReadBuffer import UartReadBuffer
+from crownstone_uart.core.uart.UartTypes import UartRxType
+from crownstone_uart.core.uart.uartPackets.UartMessagePacket import UartMessagePacket
+from crownstone_uart.core.uart.uartPackets.UartWrapperPacket import UartWrapperPacket
+from crownstone_uart.topics.DevTopics import DevTopics
+from crownstone_uart.topics.SystemTopics import SystemTopics
+
+LOG_HEADER = [1, 2, 3, 4, 10, 0, 1, 1]
+
+# A valid payload for every opcode that is decoded.
+PAYLOADS = {
+    UartRxType.HELLO:                      [1, 0],
+    UartRxType.HEARTBEAT:                  [],
+    UartRxType.RESULT_PACKET:              [1, 0, 0, 0, 0, 0],
+    UartRxType.UART_MESSAGE:               list(b"hello"),
+    UartRxType.OWN_SERVICE_DATA:           [0] * 17,
+    UartRxType.MESH_SERVICE_DATA:          [0] * 16,
+    UartRxType.MESH_RESULT:                [5, 1, 0, 0, 0, 0, 0],
+    UartRxType.MESH_ACK_ALL_RESULT:        [1, 0, 0, 0, 0, 0],
+    UartRxType.LOG:                        LOG_HEADER + [1, 2, 7, 0],
+    UartRxType.LOG_ARRAY:                  LOG_HEADER + [1, 2, 7, 0, 8, 0],
+    UartRxType.ASSET_MAC_RSSI_REPORT:      [1, 2, 3, 4, 5, 6, 7, 200, 37],
+    UartRxType.ASSET_ID_RSSI_REPORT:       [1, 2, 3, 7, 3, 200, 37],
+    UartRxType.CROWNSTONE_ID:              [7],
+    UartRxType.MAC_ADDRESS:                [1, 2, 3, 4, 5, 6],
+    UartRxType.ADC_CONFIG:                 [2] + [1, 0, 0, 1, 0, 2] * 2 + [100, 0, 0, 0],
+    UartRxType.ADC_RESTART:                [],
+    UartRxType.POWER_LOG_CURRENT:          list(struct.pack("<I100h", 1000, *range(-50, 50))),
+    UartRxType.POWER_LOG_VOLTAGE:          list(struct.pack("<I100h", 1000, *range(-50, 50))),
+    UartRxType.POWER_LOG_FILTERED_CURRENT: list(struct.pack("<I100h", 1000, *range(-50, 50))),
+    UartRxType.POWER_LOG_FILTERED_VOLTAGE: list(struct.pack("<I100h", 1000, *range(-50, 50))),
+    UartRxType.POWER_LOG_POWER:            list(struct.pack("<9i", *range(9))),
+}
+
+# Opcodes of which the payload is parsed by crownstone_core, and may not be valid.
+UNCHECKED_OPCODES = [UartRxType.OWN_SERVICE_DATA, UartRxType.MESH_SERVICE_DATA]
+
+
+def getFrame(opCode, payload):
+    messagePacket = UartMessagePacket(opCode, list(payload)).serialize()
+    return bytes(UartWrapperPacket(payload=messagePacket).serialize())
+
+
+class LogRecorder(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestUartReadBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.eventBus = CopyOnWriteEventBus()
+        self.parser = UartParser(self.eventBus)
+        self.logRecorder = LogRecorder()
+        logging.getLogger("crownstone_uart").addHandler(self.logRecorder)
+
+    def tearDown(self):
+        self.parser.stop()
+        logging.getLogger("crownstone_uart").removeHandler(self.logRecorder)
+
+    def getEvents(self, topic, zeroCopy, data):
+        events = []
+        subscriptionId = self.eventBus.subscribe(topic, events.append)
+        readBuffer = UartReadBuffer(zeroCopy=zeroCopy, eventBus=self.eventBus, frameFilter=self.parser.isFrameConsumed)
+        readBuffer.addByteArray(data)
+        self.eventBus.unsubscribe(subscriptionId)
+        return events
+
+    def test_framing(self):
+        frames = getFrame(UartRxType.UART_MESSAGE, b"one") + getFrame(UartRxType.UART_MESSAGE, b"two")
+        for zeroCopy in [False, True]:
+            # Feed the data in chunks of every size, so frames are split at every position.
+            for chunkSize in range(1, len(frames) + 1):
+                events = []
+                subscriptionId = self.eventBus.subscribe(SystemTopics.uartNewMessage, lambda message: events.append(bytes(message.payload)))
+                readBuffer = UartReadBuffer(zeroCopy=zeroCopy, eventBus=self.eventBus)
+                for i in range(0, len(frames), chunkSize):
+                    readBuffer.addByteArray(frames[i : i + chunkSize])
+                self.eventBus.unsubscribe(subscriptionId)
+                self.assertEqual(events, [b"one", b"two"], f"zeroCopy={zeroCopy} chunkSize={chunkSize}")
+
+    def test_escaped_bytes(self):
+        payload = bytes([0x7e, 0x5c, 0x40, 0x7e])
+        for zeroCopy in [False, True]:
+            events = self.getEvents(SystemTopics.uartNewMessage, zeroCopy, getFrame(UartRxType.UART_MESSAGE, payload))
+            self.assertEqual([bytes(message.payload) for message in events], [payload])
+
+    def test_crc(self):
+        # Every chunk size, so the CRC is continued at every position, also in the middle of an escaped byte.
+        payload = bytes([0x7e, 0x5c, 0x40, 0x7e])
+        frame = getFrame(UartRxType.UART_MESSAGE, payload)
+        for zeroCopy in [False, True]:
+            for chunkSize in range(1, len(frame) + 1):
+                events = []
+                subscriptionId = self.eventBus.subscribe(SystemTopics.uartNewMessage, lambda message: events.append(bytes(message.payload)))
+                readBuffer = UartReadBuffer(zeroCopy=zeroCopy, eventBus=self.eventBus)
+                for i in range(0, len(frame), chunkSize):
+                    readBuffer.addByteArray(frame[i : i + chunkSize])
+                self.eventBus.unsubscribe(subscriptionId)
+                self.assertEqual(events, [payload], f"zeroCopy={zeroCopy} chunkSize={chunkSize}")
+
+    def test_crc_mismatch(self):
+        frame = bytearray(getFrame(UartRxType.UART_MESSAGE, b"valid"))
+        frame[-3] ^= 1
+        noise = []
+        self.eventBus.subscribe(DevTopics.uartNoise, noise.append)
+        for zeroCopy in [False, True]:
+            self.assertEqual(self.getEvents(SystemTopics.uartNewMessage, zeroCopy, bytes(frame)), [])
+        self.assertEqual(noise, ["crc mismatch", "crc mismatch"])
+
+    def test_batch_delivery(self):
+        frame = getFrame(UartRxType.UART_MESSAGE, b"one")
+        frames = frame + getFrame(UartRxType.UART_MESSAGE, b"two")
+        batches = []
+        messages = []
+        self.eventBus.subscribe(SystemTopics.uartNewMessageBatch, lambda batch: batches.append([bytes(message.payload) for message in batch]))
+        self.eventBus.subscribe(SystemTopics.uartNewMessage, messages.append)
+        readBuffer = UartReadBuffer(batchDelivery=True, eventBus=self.eventBus)
+        readBuffer.addByteArray(frames)
+        # Split in the second frame.
+        readBuffer.addByteArray(frames[:len(frame) + 2])
+        readBuffer.addByteArray(frames[len(frame) + 2:])
+        self.assertEqual(batches, [[b"one", b"two"], [b"one"], [b"two"]])
+        self.assertEqual(messages, [])
+
+    def getRecoveredFrames(self, data, maxFrameSize=100):
+        events = []
+        subscriptionId = self.eventBus.subscribe(SystemTopics.uartNewMessage, events.append)
+        readBuffer = UartReadBuffer(maxFrameSize=maxFrameSize, eventBus=self.eventBus)
+        readBuffer.addByteArray(data)
+        self.eventBus.unsubscribe(subscriptionId)
+        return len(events), readBuffer.recoveredFrames
+
+    def test_recovery_after_corrupt_size(self):
+        frame = getFrame(UartRxType.UART_MESSAGE, b"valid")
+        # Start token with a size field that is too large, followed by part of the corrupted frame.
+        corrupted = bytes([0x7e, 0xff, 0xf0, 1, 2, 3])
+        self.assertEqual(self.getRecoveredFrames(frame + frame), (2, 0))
+        self.assertEqual(self.getRecoveredFrames(corrupted + frame + frame), (2, 1))
+
+    def test_recovery_after_interrupted_frame(self):
+        frame = getFrame(UartRxType.UART_MESSAGE, b"valid")
+        self.assertEqual(self.getRecoveredFrames(frame[:6] + frame + frame), (2, 1))
+        # Escape token followed by a start token.
+        self.assertEqual(self.getRecoveredFrames(frame[:6] + bytes([0x5c]) + frame), (1, 1))
+        self.assertEqual(self.getRecoveredFrames(frame[:6] + bytes([0x5c]) + frame, maxFrameSize=None), (0, 0))
+        # Escape token followed by an escape token.
+        self.assertEqual(self.getRecoveredFrames(frame[:6] + bytes([0x5c, 0x5c]) + frame, maxFrameSize=None), (1, 1))
+
+    def test_zero_copy_decoding(self):
+        for opCode, (decoder, topic, acceptsBuffer) in OPCODE_HANDLERS.items():
+            if topic is None:
+                continue
+            with self.subTest(opCode=opCode):
+                self.logRecorder.records.clear()
+                self.assertTrue(opCode in PAYLOADS, "Add a payload for this opcode")
+                frame = getFrame(opCode, PAYLOADS[opCode])
+
+                events = self.getEvents(topic, False, frame)
+                zeroCopyEvents = self.getEvents(topic, True, frame)
+
+                self.assertEqual([type(event) for event in zeroCopyEvents], [type(event) for event in events])
+                if opCode not in UNCHECKED_OPCODES:
+                    self.assertEqual(len(zeroCopyEvents), 1)
+                    self.assertEqual(self.logRecorder.records, [])
+
+    def test_decoder_error_does_not_raise(self):
+        # Too short for the header of a log packet.
+        for zeroCopy in [False, True]:
+            events = self.getEvents(SystemTopics.uartNewMessage, zeroCopy, getFrame(UartRxType.LOG, [1, 2]))
+            self.assertEqual(len(events), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
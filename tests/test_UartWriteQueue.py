@@ -0,0 +1,156 @@
+import threading
+import unittest
+
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
+from crownstone_uart.core.uart.UartTypes import UartWriteQueueFullPolicy, UartWritePriority
+from crownstone_uart.core.uart.UartWriteQueue import UartWriteQueue, BULK_STARVATION_LIMIT
+from crownstone_uart.Exceptions import UartBridgeError, UartException
+
+TIMEOUT = 2
+
+
+class FakeSerial:
+    """
+    Records the writes. Each write waits until the gate is opened, so the test can fill the queue meanwhile.
+    """
+
+    def __init__(self):
+        self.writes = []
+        self.writing = threading.Event()
+        self.gate = threading.Event()
+        # Raised by the writes after the current one, when set.
+        self.error = None
+
+    def write(self, data):
+        error = self.error
+        self.writing.set()
+        if not self.gate.wait(TIMEOUT):
+            raise RuntimeError("Gate was not opened")
+        if error is not None:
+            raise error
+        self.writes.append(bytes(data))
+
+
+class TestUartWriteQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.serial = FakeSerial()
+        self.writeQueue = None
+
+    def tearDown(self):
+        self.serial.gate.set()
+        if self.writeQueue is not None:
+            self.writeQueue.stop()
+            self.writeQueue.join(TIMEOUT)
+
+    def startQueue(self, maxQueueSize=0, queueFullPolicy=UartWriteQueueFullPolicy.BLOCK):
+        self.writeQueue = UartWriteQueue(self.serial, maxQueueSize=maxQueueSize, queueFullPolicy=queueFullPolicy, eventBus=CopyOnWriteEventBus())
+        self.writeQueue.start()
+        # Keep the writer busy with a first packet, so the next ones wait in the queue.
+        first = self.writeQueue.write(b"first")
+        self.assertTrue(self.serial.writing.wait(TIMEOUT))
+        return first
+
+    def test_result(self):
+        first = self.startQueue()
+        second = self.writeQueue.write(b"second")
+        self.serial.gate.set()
+        self.assertTrue(first.result(TIMEOUT))
+        self.assertTrue(second.result(TIMEOUT))
+        self.assertEqual(self.serial.writes, [b"first", b"second"])
+
+    def test_write_failed(self):
+        first = self.startQueue()
+        self.serial.error = OSError("Device disconnected")
+        second = self.writeQueue.write(b"second")
+        self.serial.gate.set()
+        self.assertTrue(first.result(TIMEOUT))
+        with self.assertRaises(UartException) as context:
+            second.result(TIMEOUT)
+        self.assertEqual(context.exception.args[0], UartBridgeError.WRITE_FAILED)
+        self.assertIs(context.exception.__cause__, self.serial.error)
+
+    def test_priority(self):
+        self.startQueue()
+        futures = [
+            self.writeQueue.write(b"normal", priority=UartWritePriority.NORMAL),
+            self.writeQueue.write(b"bulk", priority=UartWritePriority.BULK),
+            self.writeQueue.write(b"high", priority=UartWritePriority.HIGH),
+        ]
+        self.serial.gate.set()
+        for future in futures:
+            future.result(TIMEOUT)
+        # High and normal packets are joined in one write, bulk packets are written on their own.
+        self.assertEqual(self.serial.writes, [b"first", b"highnormal", b"bulk"])
+
+    def test_bulk_starvation(self):
+        self.startQueue()
+        bulk = self.writeQueue.write(b"bulk", priority=UartWritePriority.BULK)
+        self.writeQueue.bulkSkipCount = BULK_STARVATION_LIMIT
+        normal = self.writeQueue.write(b"normal")
+        self.serial.gate.set()
+        bulk.result(TIMEOUT)
+        normal.result(TIMEOUT)
+        self.assertEqual(self.serial.writes, [b"first", b"normalbulk"])
+
+    def test_reject(self):
+        self.startQueue(maxQueueSize=1, queueFullPolicy=UartWriteQueueFullPolicy.REJECT)
+        self.writeQueue.write(b"queued")
+        with self.assertRaises(UartException) as context:
+            self.writeQueue.write(b"rejected")
+        self.assertEqual(context.exception.args[0], UartBridgeError.WRITE_QUEUE_FULL)
+        self.assertEqual(self.writeQueue.get_metrics()["rejected"], 1)
+
+    def test_drop_superseded(self):
+        self.startQueue(maxQueueSize=2, queueFullPolicy=UartWriteQueueFullPolicy.DROP_OLDEST)
+        switch1 = self.writeQueue.write(b"switch1 on", idempotent=True, supersedeKey=("switch", 1))
+        switch2 = self.writeQueue.write(b"switch2 on", idempotent=True, supersedeKey=("switch", 2))
+        switch1Off = self.writeQueue.write(b"switch1 off", idempotent=True, supersedeKey=("switch", 1))
+
+        with self.assertRaises(UartException) as context:
+            switch1.result(TIMEOUT)
+        self.assertEqual(context.exception.args[0], UartBridgeError.WRITE_DROPPED)
+
+        self.serial.gate.set()
+        switch2.result(TIMEOUT)
+        switch1Off.result(TIMEOUT)
+        self.assertEqual(self.serial.writes, [b"first", b"switch2 onswitch1 off"])
+        self.assertEqual(self.writeQueue.get_metrics()["dropped"], 1)
+
+    def test_drop_oldest_blocks_without_superseded(self):
+        # Another key, no key, or not idempotent: the waiting packet is not dropped.
+        for kwargs in [dict(idempotent=True, supersedeKey=("switch", 2)), dict(idempotent=True), dict(supersedeKey=("switch", 1))]:
+            with self.subTest(**kwargs):
+                self.tearDown()
+                self.setUp()
+                self.startQueue(maxQueueSize=1, queueFullPolicy=UartWriteQueueFullPolicy.DROP_OLDEST)
+                switch1 = self.writeQueue.write(b"switch1", idempotent=True, supersedeKey=("switch", 1))
+
+                writer = threading.Thread(target=self.writeQueue.write, args=(b"blocked",), kwargs=kwargs)
+                writer.start()
+                writer.join(0.1)
+                self.assertTrue(writer.is_alive())
+
+                self.serial.gate.set()
+                writer.join(TIMEOUT)
+                self.assertFalse(writer.is_alive())
+                self.assertTrue(switch1.result(TIMEOUT))
+                self.assertEqual(self.writeQueue.get_metrics()["dropped"], 0)
+
+    def test_stop(self):
+        self.startQueue()
+        idempotent = self.writeQueue.write(b"idempotent", idempotent=True, supersedeKey="key")
+        other = self.writeQueue.write(b"other")
+        self.writeQueue.stop()
+        self.serial.gate.set()
+        self.writeQueue.join(TIMEOUT)
+
+        for future in [idempotent, other]:
+            with self.assertRaises(UartException) as context:
+                future.result(TIMEOUT)
+            self.assertEqual(context.exception.args[0], UartBridgeError.WRITE_QUEUE_STOPPED)
+        self.assertEqual([(request.data, request.supersedeKey) for request in self.writeQueue.unsentIdempotent], [(b"idempotent", "key")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import unittest
+
+from crownstone_uart.Constants import UART_WRITE_TIMEOUT
+from crownstone_uart.core.CopyOnWriteEventBus import CopyOnWriteEventBus
+from crownstone_uart.core.dataFlowManagers.UartWriter import UartWriter
+from crownstone_uart.core.uart.UartWriteQueue import UartWriteQueue
+from crownstone_uart.topics.SystemTopics import SystemTopics
+from crownstone_uart.Exceptions import UartBridgeError, UartException
+
+
+class FakeSerial:
+    """
+    Only writes once the gate is opened.
+    """
+
+    def __init__(self):
+        self.gate = threading.Event()
+
+    def write(self, data):
+        self.gate.wait()
+
+
+class TestUartWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.eventBus = CopyOnWriteEventBus()
+        self.serial = FakeSerial()
+        self.writeQueue = UartWriteQueue(self.serial, eventBus=self.eventBus)
+        self.writeQueue.start()
+        # Like the UartBridge.
+        self.eventBus.subscribe(SystemTopics.uartWriteData, self.writeToUart)
+
+    def tearDown(self):
+        self.serial.gate.set()
+        self.writeQueue.stop()
+        self.writeQueue.join()
+
+    def writeToUart(self, writeRequest):
+        writeRequest.future = self.writeQueue.write(writeRequest.data, writeRequest.idempotent, writeRequest.priority)
+
+    def test_write_waits_for_queue(self):
+        # The packet is written later than the write timeout after it was queued.
+        threading.Timer(3 * UART_WRITE_TIMEOUT, self.serial.gate.set).start()
+        self.assertTrue(UartWriter([1, 2, 3], eventBus=self.eventBus).write_sync())
+
+    def test_async_write_waits_for_queue(self):
+        threading.Timer(3 * UART_WRITE_TIMEOUT, self.serial.gate.set).start()
+        self.assertTrue(asyncio.run(UartWriter([1, 2, 3], eventBus=self.eventBus).write()))
+
+    def test_write_fails(self):
+        self.writeQueue.stop()
+        self.writeQueue.join()
+        with self.assertRaises(UartException) as context:
+            UartWriter([1, 2, 3], eventBus=self.eventBus).write_sync()
+        self.assertEqual(context.exception.args[0], UartBridgeError.WRITE_QUEUE_STOPPED)
+
+    def test_not_connected(self):
+        with self.assertRaises(UartException) as context:
+            UartWriter([1, 2, 3], eventBus=CopyOnWriteEventBus()).write_sync()
+        self.assertEqual(context.exception.args[0], UartBridgeError.WRITE_QUEUE_STOPPED)
+
+
+if __name__ == "__main__":
+    unittest.main()